@@ -3,6 +3,7 @@ import streamlit_authenticator as stauth
 import base64
 import os
 import copy
+from utils.utils import precalentar_reportes, iniciar_precalentado
 
 st.set_page_config(
     layout='wide',
@@ -45,6 +46,9 @@ username = st.session_state.get("username")
 
 # Control de acceso
 if authentication_status:
+
+    # Recien con un usuario autenticado vigilo la carpeta compartida de extractos, para dejar la cache armada antes de que alguien abra un reporte (se inicia una sola vez por servidor)
+    iniciar_precalentado(precalentar_reportes)
     
     st.sidebar.title(f'CGD Tool Box - {username}')
     st.sidebar.success(f"Bienvenido, {name} 👋")
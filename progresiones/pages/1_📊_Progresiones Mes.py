@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import progresiones_mmaa, proteger_pagina
+from utils.utils import progresiones_mmaa, proteger_pagina, elegir_padron_guardado, HOJAS_MMAA, MOTORES, elegir_extractos, EXTENSIONES_COMPRIMIDAS
 import pandas as pd
 
 st.set_page_config(layout='wide')
@@ -18,7 +18,9 @@ with col1:
     with st.container(border=True):
         st.markdown('**1- PRIMER PASO**: Carga porfavor el archivo de **Ventas y Volumen** en formato CSV de MicroStrategy', help='Listar informacion de Micro de Ventas y Volumen utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Sector, Seccion, Grupo de Familia, Estructura Comercial = Listar Sectores, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = El mes a analizar 2025 y 2024.')
 
-        ventas_y_volumen = st.file_uploader('Colocar aqui archivo CSV de Ventas y Volumen', type=['csv'], accept_multiple_files=False)
+        ventas_y_volumen = st.file_uploader('Colocar aqui archivo CSV de Ventas y Volumen (uno o varios, por ejemplo uno por mes)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not ventas_y_volumen:
+            ventas_y_volumen = elegir_extractos('extractos_ventas_y_volumen')
 
         if ventas_y_volumen:
             st.success(f'Archivo Ventas y Volumen cargado Correctamente')
@@ -29,7 +31,9 @@ with col2:
     with st.container(border=True):
         st.markdown('**2- SEGUNDO PASO**: Carga porfavor el archivo de **Debitos** en formato CSV de MicroStrategy', help='Listar informacion de Micro de Debitos utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Sector, Seccion, Grupo de Familia, Estructura Comercial = Listar Sectores, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = El mes a analizar 2025 y 2024.')
 
-        debitos = st.file_uploader('Colocar aqui archivo CSV de Debitos', type=['csv', 'parquet'], accept_multiple_files=False)
+        debitos = st.file_uploader('Colocar aqui archivo CSV de Debitos (uno o varios, por ejemplo uno por mes)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not debitos:
+            debitos = elegir_extractos('extractos_debitos')
 
         if debitos:
             st.success(f'Archivo Debitos cargado Correctamente')
@@ -40,7 +44,9 @@ with col3:
     with st.container(border=True):
         st.markdown('**3- TERCER PASO**: Carga porfavor la ultima version del **Padron** en formato XLSX desde Drive', help='Listar informacion de Micro de Debitos utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = El mes a analizar 2025 y 2024.')
 
-        padron = st.file_uploader('Colocar aqui el Padron en formato Excel', type=['xlsx','parquet'], accept_multiple_files=False)
+        padron = st.file_uploader('Colocar aqui el Padron en formato Excel', type=['xlsx', 'parquet', 'arrow'], accept_multiple_files=False)
+        if not padron:
+            padron = elegir_padron_guardado()
 
         if padron:
             st.success(f'Archivo Padron cargado Correctamente')
@@ -59,11 +65,17 @@ if ventas_y_volumen and debitos and padron:
     #Corregir para los proximos meses para que el place holder siempre sea el mes anterior al actual
     mes = st.selectbox('Elegir un mes para realizar la comparabilidad de calculos para las progresiones.', meses, index=meses.index(mes_actual))
 
-    calculate = st.button('¡¡¡Calcular Progresiones MMAA!!!', type='primary', use_container_width=True)
+    # Solo se calculan las hojas elegidas. Las hojas por Tienda y el Aperturado son las mas pesadas
+    hojas = st.multiselect('Hojas a generar', options=list(HOJAS_MMAA), default=list(HOJAS_MMAA))
+
+    # Arrow evita las columnas object de pandas y DuckDB usa todos los nucleos y baja a disco lo que no entra en memoria. Convienen para los extractos mas grandes
+    motor = st.segmented_control('Motor de calculo', options=MOTORES, default='pandas', help='Arrow y DuckDB se recomiendan para los extractos mas grandes (por ejemplo Proximidad)')
+
+    calculate = st.button('¡¡¡Calcular Progresiones MMAA!!!', type='primary', use_container_width=True, disabled=not hojas)
 
     if calculate:
         with st.spinner("🔄 Calculando progresiones y generando archivo Excel (Tiempo Estimado 1 min)"):
-            excel_file = progresiones_mmaa(ventas_y_volumen, debitos, padron, mes)
+            excel_file = progresiones_mmaa(ventas_y_volumen, debitos, padron, mes, hojas, motor or 'pandas')
 
             if excel_file is not None:
                 st.download_button("📥 Descargar Excel", data=excel_file, file_name=f"Progresiones MMAA - {mes}.xlsx", use_container_width=True,  mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import progresiones_acumulado, proteger_pagina, progresiones_acumulado_csv
+from utils.utils import progresiones_acumulado, proteger_pagina, progresiones_acumulado_csv, elegir_padron_guardado, HOJAS_ACUMULADO, MOTORES, elegir_extractos, EXTENSIONES_COMPRIMIDAS
 st.set_page_config(layout='wide')
 proteger_pagina()
 
@@ -16,7 +16,9 @@ with col1:
     with st.container(border=True):
         st.markdown('**1- PRIMER PASO**: Carga porfavor el archivo de **Ventas y Volumen** en formato CSV de MicroStrategy', help='Listar informacion de Micro de Ventas y Volumen utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Sector, Seccion, Grupo de Familia, Estructura Comercial = Listar Sectores, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = Del 2024 al 2025 completo.')
 
-        ventas_y_volumen = st.file_uploader('Colocar aqui archivo CSV de Ventas y Volumen', type=['csv'], accept_multiple_files=False)
+        ventas_y_volumen = st.file_uploader('Colocar aqui archivo CSV de Ventas y Volumen (uno o varios, por ejemplo uno por mes)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not ventas_y_volumen:
+            ventas_y_volumen = elegir_extractos('extractos_ventas_y_volumen')
 
         if ventas_y_volumen:
             st.success(f'Archivo Ventas y Volumen cargado Correctamente')
@@ -27,7 +29,9 @@ with col2:
     with st.container(border=True):
         st.markdown('**2- SEGUNDO PASO**: Carga porfavor el archivo de **Debitos** en formato CSV de MicroStrategy', help='Listar informacion de Micro de Debitos utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Sector, Seccion, Grupo de Familia, Estructura Comercial = Listar Sectores, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = Del 2024 al 2025 completo.')
 
-        debitos = st.file_uploader('Colocar aqui archivo CSV de Debitos', type=['csv'], accept_multiple_files=False)
+        debitos = st.file_uploader('Colocar aqui archivo CSV de Debitos (uno o varios, por ejemplo uno por mes)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not debitos:
+            debitos = elegir_extractos('extractos_debitos')
 
         if debitos:
             st.success(f'Archivo Debitos cargado Correctamente')
@@ -38,7 +42,9 @@ with col3:
     with st.container(border=True):
         st.markdown('**3- TERCER PASO**: Carga porfavor la ultima version del **Padron** en formato XLSX desde Drive', help='Listar informacion de Micro de Debitos utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = Del 2024 al 2025 completo.')
 
-        padron = st.file_uploader('Colocar aqui el Padron en formato Excel', type=['xlsx'], accept_multiple_files=False)
+        padron = st.file_uploader('Colocar aqui el Padron en formato Excel', type=['xlsx', 'parquet', 'arrow'], accept_multiple_files=False)
+        if not padron:
+            padron = elegir_padron_guardado()
 
         if padron:
             st.success(f'Archivo Padron cargado Correctamente')
@@ -62,11 +68,20 @@ if ventas_y_volumen and debitos and padron:
     with col2:
         formato = st.segmented_control('Formato de Descarga', help='Se recomienda utilizar csv para Express', options=['XLSX', 'CSV'], width='stretch', default='XLSX')
 
-    calculate = st.button('¡¡¡Calcular Progresiones Acumuladas!!!', type='primary', use_container_width=True)
+    # Solo se calculan las hojas elegidas y con el motor elegido (en XLSX). Las hojas por Tienda son las mas pesadas
+    hojas = list(HOJAS_ACUMULADO)
+    motor = 'pandas'
+    if formato == 'XLSX':
+        hojas = st.multiselect('Hojas a generar', options=list(HOJAS_ACUMULADO), default=list(HOJAS_ACUMULADO))
+
+        # Arrow evita las columnas object de pandas y DuckDB usa todos los nucleos y baja a disco lo que no entra en memoria. Convienen para los extractos mas grandes
+        motor = st.segmented_control('Motor de calculo', options=MOTORES, default='pandas', help='Arrow y DuckDB se recomiendan para los extractos mas grandes (por ejemplo Proximidad)')
+
+    calculate = st.button('¡¡¡Calcular Progresiones Acumuladas!!!', type='primary', use_container_width=True, disabled=not hojas)
 
     if calculate and formato == 'XLSX':
         with st.spinner("🔄 Calculando progresiones y generando archivo Excel (Tiempo Estimado 1 min)"):
-            excel_file = progresiones_acumulado(ventas_y_volumen, debitos, padron, mes)
+            excel_file = progresiones_acumulado(ventas_y_volumen, debitos, padron, mes, hojas, motor or 'pandas')
 
             if isinstance(excel_file, str):
                 st.error(excel_file)
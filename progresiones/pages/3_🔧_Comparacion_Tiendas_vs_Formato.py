@@ -1,15 +1,15 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import genero_df_comparacion, actualizo_df_comparacion, proteger_pagina
+from utils.utils import genero_df_comparacion, actualizo_df_comparacion, proteger_pagina, elegir_padron_guardado, elegir_extractos, hash_contenido, EXTENSIONES_COMPRIMIDAS
 
 st.set_page_config(layout='wide')
 proteger_pagina()
 
 @st.cache_data(show_spinner="Procesando datos y consolidando información...")
-def get_df_final(ventas, debitos, padron, mes_comparable: str):
+def get_df_final(ventas, debitos, padron, mes_comparable: str, version: str = None):
     '''
     Helper cacheado para consolidar la información de progresiones.
-    Si los archivos o el mes cambian, recalcula.
+    Si los archivos o el mes cambian, recalcula. `version` es el hash del contenido de los insumos: un extracto de la carpeta compartida que se reemplaza conserva la ruta.
     '''
     df_final = genero_df_comparacion(
         ventas=ventas,
@@ -30,7 +30,9 @@ col1, col2, col3 = st.columns(3)
 with col1:
     with st.container(border=True):
         st.markdown('**1- PRIMER PASO**: Cargá el archivo de **Ventas y Volumen** (CSV de MicroStrategy)')
-        ventas_y_volumen = st.file_uploader('Archivo CSV Ventas y Volumen', type=['csv'])
+        ventas_y_volumen = st.file_uploader('Archivo CSV Ventas y Volumen (uno o varios)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not ventas_y_volumen:
+            ventas_y_volumen = elegir_extractos('extractos_ventas_y_volumen')
         if ventas_y_volumen:
             st.success('Archivo Ventas y Volumen cargado correctamente')
         else:
@@ -39,7 +41,9 @@ with col1:
 with col2:
     with st.container(border=True):
         st.markdown('**2- SEGUNDO PASO**: Cargá el archivo de **Débitos** (CSV de MicroStrategy)')
-        debitos = st.file_uploader('Archivo CSV Débitos', type=['csv'])
+        debitos = st.file_uploader('Archivo CSV Débitos (uno o varios)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not debitos:
+            debitos = elegir_extractos('extractos_debitos')
         if debitos:
             st.success('Archivo Débitos cargado correctamente')
         else:
@@ -48,7 +52,9 @@ with col2:
 with col3:
     with st.container(border=True):
         st.markdown('**3- TERCER PASO**: Cargá el archivo del **Padrón** (Excel desde Drive)')
-        padron = st.file_uploader('Archivo Excel Padrón', type=['xlsx'])
+        padron = st.file_uploader('Archivo Excel Padrón', type=['xlsx', 'parquet', 'arrow'])
+        if not padron:
+            padron = elegir_padron_guardado()
         if padron:
             st.success('Archivo Padrón cargado correctamente')
         else:
@@ -72,7 +78,8 @@ if ventas_y_volumen and debitos and padron:
             ventas=ventas_y_volumen,
             debitos=debitos,
             padron=padron,
-            mes_comparable=mes
+            mes_comparable=mes,
+            version=hash_contenido([ventas_y_volumen, debitos])
         )
 
         if not isinstance(df_final, Exception) and not df_final.empty:
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import proteger_pagina, obtener_join_comparable, obtener_join_no_comparable
+from utils.utils import proteger_pagina, obtener_join_comparable, obtener_join_no_comparable, elegir_padron_guardado, elegir_extractos, EXTENSIONES_COMPRIMIDAS
 st.set_page_config(layout='wide')
 
 proteger_pagina()
@@ -17,7 +17,9 @@ with col1:
     with st.container(border=True):
         st.markdown('**1- PRIMER PASO**: Carga porfavor el archivo de **Ventas y Volumen** en formato CSV de MicroStrategy', help='Listar informacion de Micro de Ventas y Volumen utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Sector, Seccion, Grupo de Familia, Estructura Comercial = Listar Sectores, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = Del 2024 al 2025 completo.')
 
-        ventas_y_volumen = st.file_uploader('Colocar aqui archivo CSV de Ventas y Volumen', type=['csv'], accept_multiple_files=False)
+        ventas_y_volumen = st.file_uploader('Colocar aqui archivo CSV de Ventas y Volumen (uno o varios, por ejemplo uno por mes)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not ventas_y_volumen:
+            ventas_y_volumen = elegir_extractos('extractos_ventas_y_volumen')
 
         if ventas_y_volumen:
             st.success(f'Archivo Ventas y Volumen cargado Correctamente')
@@ -28,7 +30,9 @@ with col2:
     with st.container(border=True):
         st.markdown('**2- SEGUNDO PASO**: Carga porfavor el archivo de **Debitos** en formato CSV de MicroStrategy', help='Listar informacion de Micro de Debitos utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Sector, Seccion, Grupo de Familia, Estructura Comercial = Listar Sectores, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = Del 2024 al 2025 completo.')
 
-        debitos = st.file_uploader('Colocar aqui archivo CSV de Debitos', type=['csv'], accept_multiple_files=False)
+        debitos = st.file_uploader('Colocar aqui archivo CSV de Debitos (uno o varios, por ejemplo uno por mes)', type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not debitos:
+            debitos = elegir_extractos('extractos_debitos')
 
         if debitos:
             st.success(f'Archivo Debitos cargado Correctamente')
@@ -39,7 +43,9 @@ with col3:
     with st.container(border=True):
         st.markdown('**3- TERCER PASO**: Carga porfavor la ultima version del **Padron** en formato XLSX desde Drive', help='Listar informacion de Micro de Debitos utilizando los siguiente filtros: Año, Mes, Direccion, Punto Operacional, Empresa = Todos los formatos, incluidos E-commerce y No Informado, Periodo = Del 2024 al 2025 completo.')
 
-        padron = st.file_uploader('Colocar aqui el Padron en formato Excel', type=['xlsx'], accept_multiple_files=False)
+        padron = st.file_uploader('Colocar aqui el Padron en formato Excel', type=['xlsx', 'parquet', 'arrow'], accept_multiple_files=False)
+        if not padron:
+            padron = elegir_padron_guardado()
 
         if padron:
             st.success(f'Archivo Padron cargado Correctamente')
@@ -3,6 +3,8 @@ from datetime import datetime
 import pandas as pd
 import os
 from utils.utils import exporto_parquet, proteger_pagina
+from utils.lectura import leer_csv_micro, leer_excel, fila_encabezado_excel, NUMERICAS_MICRO, EXTENSIONES_COMPRIMIDAS
+from utils.esquemas import CATEGORICAS_MICRO
 
 st.set_page_config(layout='wide')
 proteger_pagina()
@@ -24,7 +26,7 @@ st.subheader('Primeros Pasos', divider='rainbow')
 with st.container(border=True):
     st.markdown('**1- PRIMER PASO**: Carga porfavor el archivo que quieras convertir en formato Parquet', help='Esta funcionalidad convierte archivos xlsx y csv a parquet, reduciendo su peso y optimizando las lecturas del mismo en las demas herramientas')
 
-    archivo_a_convertir = st.file_uploader('Colocar aqui archivo CSV o XLSX', type=['csv', 'xlsx'], accept_multiple_files=False)
+    archivo_a_convertir = st.file_uploader('Colocar aqui archivo CSV o XLSX', type=['csv', 'xlsx', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=False)
 
     if archivo_a_convertir:
         st.success(f'Archivo Cargado Correctamente')
@@ -36,17 +38,24 @@ with st.container(border=True):
 
     if archivo_a_convertir and archivo_a_convertir is not None:
         nombre = archivo_a_convertir.name #type:ignore
-        extension = os.path.splitext(nombre)[1]
+        nombre_base, extension = os.path.splitext(nombre)
+
+        # Un CSV comprimido (ventas.csv.gz, ventas.zip) se lee descomprimiendolo al vuelo, igual que el CSV
+        if extension[1:] in EXTENSIONES_COMPRIMIDAS:
+            nombre, extension = nombre_base, '.csv'
 
         if extension == '.csv':
-            archivo_a_convertir = pd.read_csv(archivo_a_convertir, encoding='utf-16', header=1, sep=',') #type:ignore
+            # El Parquet queda normalizado: valores ya convertidos a numero y dimensiones con dictionary encoding, asi los pipelines lo cargan sin parsear
+            archivo_a_convertir = leer_csv_micro(archivo_a_convertir, numericas=NUMERICAS_MICRO, categoricas=CATEGORICAS_MICRO)
 
-            st.dataframe(archivo_a_convertir.sample(20))
+            st.dataframe(archivo_a_convertir.sample(min(20, len(archivo_a_convertir))))
 
         elif extension == '.xlsx':
-            archivo_a_convertir = pd.read_excel(archivo_a_convertir, header=1)
+            # Si es el padron, busco su fila de encabezado para que los pipelines lo puedan leer desde el Parquet
+            header = fila_encabezado_excel(archivo_a_convertir, ['GSX'])
+            archivo_a_convertir = leer_excel(archivo_a_convertir, header=header if header is not None else 1)
 
-            st.dataframe(archivo_a_convertir.sample(20))
+            st.dataframe(archivo_a_convertir.sample(min(20, len(archivo_a_convertir))))
     else:
         st.info('Falta cargar archivo para poder cargar los datos')
 
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import briefing, proteger_pagina
+from utils.utils import briefing, proteger_pagina, elegir_padron_guardado, elegir_extractos, EXTENSIONES_COMPRIMIDAS
 import pandas as pd
 import io
 
@@ -19,7 +19,9 @@ col1, col2 = st.columns(2)
 with col1:
     with st.container(border=True):
         st.markdown('**1. Ventas y Volumen por Tienda (CSV)**')
-        ventas_y_volumen = st.file_uploader("📁 Subí archivo de Ventas y Volumen", type=["csv"])
+        ventas_y_volumen = st.file_uploader("📁 Subí archivo de Ventas y Volumen (uno o varios)", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not ventas_y_volumen:
+            ventas_y_volumen = elegir_extractos('extractos_ventas_y_volumen')
 
         if ventas_y_volumen:
             st.success("Archivo cargado correctamente")
@@ -29,7 +31,9 @@ with col1:
 
     with st.container(border=True):
         st.markdown('**3. Padrón (XLSX)**')
-        padron = st.file_uploader("📁 Subí el Padrón actualizado", type=["xlsx"])
+        padron = st.file_uploader("📁 Subí el Padrón actualizado", type=["xlsx", "parquet", "arrow"])
+        if not padron:
+            padron = elegir_padron_guardado()
 
         if padron:
             st.success("Archivo cargado correctamente")
@@ -38,7 +42,9 @@ with col1:
 
     with st.container(border=True):
         st.markdown('**5. Histórico Ventas (CSV)**')
-        historico_ventas = st.file_uploader("📁 Subí archivo de Histórico de Ventas", type=["csv"])
+        historico_ventas = st.file_uploader("📁 Subí archivo de Histórico de Ventas (uno o varios)", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not historico_ventas:
+            historico_ventas = elegir_extractos('extractos_historico_ventas')
 
         if historico_ventas:
             st.success("Archivo cargado correctamente")
@@ -49,7 +55,9 @@ with col2:
 
     with st.container(border=True):
         st.markdown('**2. Débitos por Tienda (CSV)**')
-        debitos_por_tienda = st.file_uploader("📁 Subí archivo de Débitos por Tienda", type=["csv"])
+        debitos_por_tienda = st.file_uploader("📁 Subí archivo de Débitos por Tienda (uno o varios)", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not debitos_por_tienda:
+            debitos_por_tienda = elegir_extractos('extractos_debitos_por_tienda')
 
         if debitos_por_tienda:
             st.success("Archivo cargado correctamente")
@@ -58,7 +66,9 @@ with col2:
 
     with st.container(border=True):
         st.markdown('**4. Débitos por Sector (CSV)**')
-        debitos_por_sector = st.file_uploader("📁 Subí archivo de Débitos por Sector", type=["csv"])
+        debitos_por_sector = st.file_uploader("📁 Subí archivo de Débitos por Sector (uno o varios)", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not debitos_por_sector:
+            debitos_por_sector = elegir_extractos('extractos_debitos_por_sector')
 
         if debitos_por_sector:
             st.success("Archivo cargado correctamente")
@@ -67,7 +77,9 @@ with col2:
 
     with st.container(border=True):
         st.markdown('**6. Histórico Débitos (CSV)**')
-        historico_debitos = st.file_uploader("📁 Subí archivo de Histórico de Débitos", type=["csv"])
+        historico_debitos = st.file_uploader("📁 Subí archivo de Histórico de Débitos (uno o varios)", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+        if not historico_debitos:
+            historico_debitos = elegir_extractos('extractos_historico_debitos')
 
         if historico_debitos:
             st.success("Archivo cargado correctamente")
@@ -76,7 +88,9 @@ with col2:
 
 with st.container(border=True):
     st.markdown('**7. Histórico Volumen sin Envases (CSV)**')
-    historico_volumen = st.file_uploader("📁 Subí archivo de Volumen sin Envases", type=["csv"])
+    historico_volumen = st.file_uploader("📁 Subí archivo de Volumen sin Envases (uno o varios)", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=True)
+    if not historico_volumen:
+        historico_volumen = elegir_extractos('extractos_historico_volumen')
 
     if historico_volumen:
         st.success("Archivo cargado correctamente")
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import analisis_horario_extendido, proteger_pagina
+from utils.utils import analisis_horario_extendido, proteger_pagina, elegir_extractos, EXTENSIONES_COMPRIMIDAS
 import io
 
 # Configuración inicial
@@ -47,8 +47,10 @@ with col1:
                          'Debe contener datos desde abril hasta la fecha, únicamente de tiendas Express.')
         ventas_por_media_hora = st.file_uploader(
             'Colocar aquí archivo CSV de Ventas por Media Hora', 
-            type=['csv'], accept_multiple_files=False
+            type=['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS], accept_multiple_files=False
         )
+        if not ventas_por_media_hora:
+            ventas_por_media_hora = elegir_extractos('extractos_ventas_por_media_hora', multiple=False)
         if ventas_por_media_hora:
             st.success('✅ Archivo de Ventas por Media Hora cargado correctamente.')
         else:
@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from utils.utils import proteger_pagina, dia_de_semana
+from utils.utils import proteger_pagina, dia_de_semana, elegir_padron_guardado, elegir_extractos, EXTENSIONES_COMPRIMIDAS
 import pandas as pd
 import io
 
@@ -19,7 +19,9 @@ col1, col2 = st.columns(2)
 with col1:
     with st.container(border=True):
         st.markdown('**1. Archivo que se desea verificar el dia de semana**')
-        archivo = st.file_uploader("📁 Subí el archivo Deseado", type=["csv"])
+        archivo = st.file_uploader("📁 Subí el archivo Deseado", type=["csv", "parquet", "arrow", *EXTENSIONES_COMPRIMIDAS])
+        if not archivo:
+            archivo = elegir_extractos('extractos_archivo', multiple=False)
 
         if archivo:
             st.success("Archivo cargado correctamente")
@@ -30,7 +32,9 @@ with col2:
 
     with st.container(border=True):
         st.markdown('**3. Padrón (XLSX)**')
-        padron = st.file_uploader("📁 Subí el Padrón actualizado", type=["xlsx"])
+        padron = st.file_uploader("📁 Subí el Padrón actualizado", type=["xlsx", "parquet", "arrow"])
+        if not padron:
+            padron = elegir_padron_guardado()
 
         if padron:
             st.success("Archivo cargado correctamente")
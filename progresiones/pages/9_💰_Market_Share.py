@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from utils.utils import (
+    elegir_padron_guardado,
     proteger_pagina,
     marketshare,
     padron_marketshare,
@@ -65,6 +66,8 @@ with col2:
     with st.container(border=True):
         st.markdown("📁 **Archivo del Padrón (Excel)**")
         padron_data = st.file_uploader("Subí el padrón actualizado", type=["xlsx"])
+        if not padron_data:
+            padron_data = elegir_padron_guardado()
         if padron_data:
             st.success("✅ Archivo del padrón cargado correctamente.")
         else:
@@ -0,0 +1,77 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Los modulos de la app se importan como utils.*, desde la carpeta progresiones
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.esquemas import MESES_PADRON  # noqa: E402
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+# Tiendas del padron de prueba: (GSX, nombre, direccion, provincia, marcas de SC de ENE a DIC)
+TIENDAS = [
+    (1, '1 - HIP TIENDA 1', 'HIPERMERCADO', 'BUENOS AIRES', ['SC'] * 12),
+    (2, '2 - HIP TIENDA 2', 'HIPERMERCADO', 'SANTA FE', ['SC', 'NC', 'SC'] * 4),
+    (3, '3 - MAX TIENDA 3', 'MAXI', 'CORDOBA', ['NC', 'SC'] * 6),
+    (4, '4 - MAX TIENDA 4', 'MAXI', 'BUENOS AIRES', ['SC'] * 12),
+]
+
+
+def numero_ar(valor: float) -> str:
+    # Formato de Micro: punto de miles y coma decimal
+    return f'{valor:,.2f}'.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def csv_micro(titulo: str, encabezado: list, filas: list) -> bytes:
+    lineas = [titulo, ','.join(encabezado)] + [','.join(f'"{c}"' if ',' in str(c) else str(c) for c in fila) for fila in filas]
+    return ('\n'.join(lineas) + '\n').encode('utf-16')
+
+
+@pytest.fixture
+def ventas_micro() -> bytes:
+    filas = []
+    for año in (2023, 2024):
+        for posicion, mes in enumerate(MESES[:4]):
+            for gsx, nombre, direccion, _, _ in TIENDAS:
+                for sector, seccion, grupo, base in [('P.G.C.', 'ALMACEN', 'ACEITES', 1000), ('P.G.C.', 'BEBIDAS', 'ENVASES BEBIDAS', 50), ('P.F.T.', 'CARNES', 'VACUNO', 700)]:
+                    valor = base * gsx + 37.25 * posicion + (113.5 if año == 2024 else 0)
+                    filas.append([año, f'{mes} {año}', direccion, nombre, sector, seccion, grupo, numero_ar(valor), numero_ar(valor / 10)])
+    return csv_micro('Ventas y Volumen', ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades'], filas)
+
+
+@pytest.fixture
+def debitos_micro() -> bytes:
+    filas = []
+    for año in (2023, 2024):
+        for posicion, mes in enumerate(MESES[:4]):
+            for gsx, nombre, direccion, _, _ in TIENDAS:
+                filas.append([año, f'{mes} {año}', direccion, nombre, 'Cant. Tickets', f'{100 * gsx + posicion + (7 if año == 2024 else 0)}'])
+    return csv_micro('Debitos', ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Indicadores', 'Cant. Tickets por Local'], filas)
+
+
+def padron_parquet(tiendas: list) -> io.BytesIO:
+    '''
+    Padron con los encabezados originales del Excel, guardado como Parquet (como lo deja la pagina de conversion).
+    '''
+    filas = []
+    for gsx, nombre, direccion, provincia, marcas in tiendas:
+        fila = {'GSX': gsx, 'NOMBRE': nombre, 'Fecha apertura': pd.Timestamp('2010-01-01'), 'BANDERA': 'CARREFOUR', 'ORGANIZACIÓN ': direccion, 'PROVINCIA': provincia, 'FIN DE CIERRE': '-'}
+        fila.update({c: 1.0 for c in ['M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'M² Parcking']})
+        fila.update(dict(zip(MESES_PADRON, marcas)))
+        filas.append(fila)
+
+    output = io.BytesIO()
+    pd.DataFrame(filas).to_parquet(output, index=False)
+    output.seek(0)
+    return output
+
+
+@pytest.fixture
+def en_carpeta_temporal(tmp_path, monkeypatch):
+    # Las versiones del padron y los temporales de DuckDB se guardan relativos a la carpeta de trabajo
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
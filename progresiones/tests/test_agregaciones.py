@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from utils.agregaciones import agregar_niveles, calcular_progresiones
+from utils.hechos import comparable_por_mes
+
+# Hechos en formato long: el debito (sin sector) cuenta en los totales por tienda pero no en el nivel por sector
+HECHOS = pd.DataFrame({
+    'año': [2023, 2023, 2023, 2024, 2024, 2024, 2024, 2023, 2024],
+    'tienda': ['A', 'A', 'B', 'A', 'A', 'B', 'B', 'A', 'A'],
+    'sector': ['PGC', 'PFT', 'PGC', 'PGC', 'PFT', 'PGC', 'PGC', None, None],
+    'categoria': ['VCT', 'VCT', 'VCT', 'VCT', 'VCT', 'VCT', 'VCT', 'DEB', 'DEB'],
+    'valores': [100.0, 50.0, 80.0, 110.0, 40.0, 30.0, 70.0, 10.0, 12.0],
+})
+
+
+def test_calcular_progresiones_suma_por_grupo_y_año():
+    resultado = calcular_progresiones(HECHOS, ['tienda', 'categoria'])
+
+    esperado = pd.DataFrame({
+        'tienda': ['A', 'A', 'B'],
+        'categoria': ['DEB', 'VCT', 'VCT'],
+        2023: [10.0, 150.0, 80.0],
+        2024: [12.0, 150.0, 100.0],
+        'progresion': [20.0, 0.0, 25.0],
+    })
+    pd.testing.assert_frame_equal(resultado, esperado)
+
+
+def test_calcular_progresiones_sin_año_anterior_o_con_cero():
+    df = pd.DataFrame({'tienda': ['A', 'B', 'B', 'C', 'C'], 'año': [2024, 2023, 2024, 2023, 2024], 'valores': [5.0, 0.0, 3.0, 8.0, 4.0]})
+
+    resultado = calcular_progresiones(df, 'tienda', escala=1, decimales=3)
+
+    # A no tiene 2023 y B suma cero en 2023: en los dos casos no hay progresion
+    pd.testing.assert_series_equal(resultado[2023], pd.Series([np.nan, 0.0, 8.0], name=2023))
+    pd.testing.assert_series_equal(resultado['progresion'], pd.Series([np.nan, np.nan, -0.5], name='progresion'))
+
+
+def test_calcular_progresiones_por_año_y_contra_base():
+    df = pd.DataFrame({'tienda': ['A'] * 3, 'año': [2022, 2023, 2024], 'valores': [100.0, 110.0, 121.0]})
+
+    resultado = calcular_progresiones(df, 'tienda', por_año=True, base=2022)
+
+    assert resultado[['progresion 2023', 'progresion 2024', 'progresion 2023 vs 2022', 'progresion 2024 vs 2022']].iloc[0].tolist() == [10.0, 10.0, 10.0, 21.0]
+
+
+def test_agregar_niveles_igual_a_un_groupby_por_nivel():
+    niveles = {
+        'sector': ['año', 'tienda', 'sector', 'categoria'],
+        'tienda': ['año', 'tienda', 'categoria'],
+        'total': ['año', 'categoria'],
+        'por_año': ['año'],
+    }
+
+    resultado = agregar_niveles(HECHOS, niveles)
+
+    assert list(resultado) == list(niveles)
+    for nombre, columnas in niveles.items():
+        esperado = HECHOS.groupby(columnas)[['valores']].sum().reset_index()
+        pd.testing.assert_frame_equal(resultado[nombre], esperado, obj=nombre)
+
+    # Los debitos sin sector no aparecen por sector pero si en el total de la tienda
+    assert 'DEB' not in set(resultado['sector']['categoria'])
+    assert resultado['tienda'].query("tienda == 'A' and categoria == 'DEB'")['valores'].tolist() == [10.0, 12.0]
+
+
+def test_comparable_por_mes_usa_la_marca_de_cada_mes():
+    tiendas = pd.Index([1, 2], dtype='int64')
+    comparables = np.zeros((2, 12), dtype=bool)
+    comparables[0, :] = True
+    comparables[1, [0, 2]] = True
+
+    numeros = pd.Series([1, 2, 2, 2, 3, 1])
+    fechas = pd.Series(['Enero 2024', 'Enero 2024', 'Febrero 2024', 'Marzo 2025', 'Enero 2024', 'Total'])
+
+    resultado = comparable_por_mes(numeros, fechas, (tiendas, comparables))
+
+    # La tienda 3 no esta en el padron y "Total" no es un mes: no son comparables
+    assert resultado.tolist() == [True, True, False, True, False, False]
@@ -0,0 +1,74 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from conftest import MESES, TIENDAS, csv_micro, padron_parquet
+from utils.padron import registrar_padron
+from utils.utils import briefing
+
+# Tienda 2 repetida con otra provincia y SC en todos los meses
+REPETIDAS = [(2, '2 - HIP TIENDA 2', 'HIPERMERCADO', 'SALTA', ['SC'] * 12)]
+
+
+def _historicos():
+    volumen, sectores = [], []
+    for año in (2023, 2024):
+        for posicion, mes in enumerate(MESES[:4]):
+            for gsx, nombre, direccion, _, _ in TIENDAS:
+                volumen.append([año, f'{mes} {año}', direccion, nombre, f'{10 * gsx + posicion}'])
+                sectores += [[año, f'{mes} {año}', direccion, nombre, sector, f'{gsx * base + posicion}'] for sector, base in [('P.G.C.', 40), ('P.F.T.', 30)]]
+    return (
+        csv_micro('Volumen', ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'VOLUMEN'], volumen),
+        csv_micro('Debitos por Sector', ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Cantidad de Tickets'], sectores),
+    )
+
+
+def _contenido(resultado) -> dict:
+    assert not isinstance(resultado, str), resultado
+    contenido = {}
+    with zipfile.ZipFile(resultado) as zf:
+        for nombre in zf.namelist():
+            datos = io.BytesIO(zf.read(nombre))
+            contenido[nombre] = pd.read_excel(datos, sheet_name=None) if nombre.endswith('.xlsx') else pd.read_csv(datos)
+    return contenido
+
+
+def test_briefing_usa_el_mismo_padron_sin_repetidas_en_todas_las_tablas(ventas_micro, debitos_micro, en_carpeta_temporal):
+    volumen, debitos_sector = _historicos()
+
+    def generar(padron):
+        return _contenido(briefing(io.BytesIO(ventas_micro), io.BytesIO(debitos_micro), padron, io.BytesIO(debitos_sector), io.BytesIO(ventas_micro), io.BytesIO(volumen), io.BytesIO(debitos_micro), 'Marzo'))
+
+    esperado = generar(registrar_padron(padron_parquet(TIENDAS)))
+    obtenido = generar(registrar_padron(padron_parquet(TIENDAS + REPETIDAS)))
+
+    assert sorted(esperado) == sorted(obtenido)
+    for nombre in esperado:
+        if isinstance(esperado[nombre], dict):
+            for hoja in esperado[nombre]:
+                pd.testing.assert_frame_equal(esperado[nombre][hoja], obtenido[nombre][hoja], obj=f'{nombre} / {hoja}')
+        else:
+            pd.testing.assert_frame_equal(esperado[nombre], obtenido[nombre], obj=nombre)
+
+
+def test_base_giratorio_ordena_las_tiendas_una_sola_vez(debitos_micro, en_carpeta_temporal):
+    # Todas las tiendas crecen 10%: la progresion empata entre direcciones y el orden lo decide el sort sobre todas juntas
+    filas = []
+    for año in (2023, 2024):
+        for mes in MESES[:4]:
+            for gsx, nombre, direccion, _, _ in TIENDAS:
+                for sector, seccion, grupo in [('P.G.C.', 'ALMACEN', 'ACEITES'), ('P.F.T.', 'CARNES', 'VACUNO')]:
+                    valor = 1000 * (1.1 if año == 2024 else 1)
+                    filas.append([año, f'{mes} {año}', direccion, nombre, sector, seccion, grupo, f'{valor:.0f}', '10'])
+    ventas = csv_micro('Ventas y Volumen', ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades'], filas)
+    volumen, debitos_sector = _historicos()
+
+    resultado = briefing(io.BytesIO(ventas), io.BytesIO(debitos_micro), registrar_padron(padron_parquet(TIENDAS)), io.BytesIO(debitos_sector), io.BytesIO(ventas), io.BytesIO(volumen), io.BytesIO(debitos_micro), 'Marzo')
+    giratorio = _contenido(resultado)['Base Giratorio.xlsx']['Base Giratorio']
+    tiendas = giratorio[giratorio['aux'] == 'tienda'].reset_index(drop=True)
+
+    # Como el calculo conjunto: las tiendas en el orden de sus claves y un solo sort por progresion
+    esperado = tiendas.sort_values(['direccion', 'numero_operacional', 'punto_operacional', 'categoria']).sort_values(by='progresion', ascending=False).reset_index(drop=True)
+    assert tiendas['progresion'].nunique() < len(tiendas)
+    pd.testing.assert_frame_equal(tiendas, esperado)
@@ -0,0 +1,81 @@
+import io
+import re
+import zipfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import utils.exportar as exportar
+from utils.exportar import _hoja_xlsx, exportar_excel, se_pueden_unir, unir_hojas
+
+
+def _tablas() -> dict:
+    # Textos repetidos entre hojas, columnas MultiIndex (como las de formato_ancho), indice con nombre y nulos
+    ancho = pd.DataFrame(
+        [[1.5, 2.0, 0.1], [3.25, np.nan, -0.2]],
+        index=pd.Index(['HIPERMERCADO', 'MAXI'], name='direccion'),
+        columns=pd.MultiIndex.from_tuples([('2024', 'VCT'), ('2024', 'VOL'), ('progresion', 'VCT')]),
+    )
+    tiendas = pd.DataFrame({'direccion': ['HIPERMERCADO', 'MAXI', 'HIPERMERCADO'], 'punto_operacional': ['1 - A', '2 - B', '3 - C'], 'valores': [10, 20, 30]})
+    totales = pd.DataFrame({'categoria': ['VCT', 'VOL', 'DEB'], 'progresion': [1.1, -2.2, 0.0]}).set_index('categoria')
+    return {'Prog x Formatos': (ancho, True), 'Tiendas': (tiendas, False), 'Total': (totales, True)}
+
+
+def _celdas(contenido) -> dict:
+    libro = openpyxl.load_workbook(io.BytesIO(contenido.getvalue() if hasattr(contenido, 'getvalue') else contenido))
+    return {hoja.title: ([[celda.value for celda in fila] for fila in hoja.iter_rows()], sorted(map(str, hoja.merged_cells.ranges))) for hoja in libro.worksheets}
+
+
+def _serie(tablas: dict) -> io.BytesIO:
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        for hoja, (tabla, index) in tablas.items():
+            tabla.to_excel(writer, sheet_name=hoja, index=index)
+    return output
+
+
+def _unido(tablas: dict) -> bytes:
+    return unir_hojas(list(tablas), [_hoja_xlsx(tabla, hoja, index) for hoja, (tabla, index) in tablas.items()])
+
+
+def test_unir_hojas_igual_a_exportar_en_serie():
+    tablas = _tablas()
+
+    unido = _celdas(_unido(tablas))
+
+    assert list(unido) == list(tablas)
+    assert unido == _celdas(_serie(tablas))
+
+
+def test_unir_hojas_no_repite_textos_compartidos():
+    with zipfile.ZipFile(io.BytesIO(_unido(_tablas()))) as zf:
+        tabla_textos = zf.read('xl/sharedStrings.xml')
+
+    textos = re.findall(rb'<si>.*?</si>', tabla_textos, flags=re.S)
+    assert len(textos) == len(set(textos))
+    assert int(re.search(rb' uniqueCount="(\d+)"', tabla_textos).group(1)) == len(textos)
+    # count sigue contando cada celda de texto: "HIPERMERCADO" aparece en dos hojas
+    assert int(re.search(rb' count="(\d+)"', tabla_textos).group(1)) > len(textos)
+
+
+def test_se_pueden_unir_detecta_fechas_antes_de_exportar():
+    tablas = _tablas()
+    assert se_pueden_unir(tablas)
+
+    tablas['Fechas'] = (pd.DataFrame({'fecha': pd.to_datetime(['2024-01-31', '2024-02-29'])}), False)
+    assert not se_pueden_unir(tablas)
+
+
+def test_exportar_con_fechas_no_reparte_las_hojas(monkeypatch):
+    tablas = _tablas()
+    tablas['Fechas'] = (pd.DataFrame({'fecha': pd.to_datetime(['2024-01-31', '2024-02-29'])}), False)
+
+    def no_usar_procesos(*argumentos):
+        raise AssertionError('Las hojas no se pueden unir: no deberian repartirse en procesos')
+
+    monkeypatch.setattr(exportar, 'MINIMO_CELDAS_PARALELO', 0)
+    monkeypatch.setattr(exportar, 'procesos_disponibles', lambda: 4)
+    monkeypatch.setattr(exportar, 'en_procesos', no_usar_procesos)
+
+    assert _celdas(exportar_excel(tablas)) == _celdas(_serie(tablas))
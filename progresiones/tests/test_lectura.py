@@ -0,0 +1,82 @@
+import hashlib
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import numero_ar
+
+from utils import lectura
+from utils.lectura import leer_csv_micro, hash_contenido, partes_csv_micro, detectar_formato
+
+
+def _csv_micro(texto: str) -> io.BytesIO:
+    # Como exporta Micro: UTF-16 con una fila de titulo antes del encabezado
+    return io.BytesIO(texto.encode('utf-16'))
+
+
+def test_encabezado_repetido_y_vacio_como_pandas():
+    # Crosstab con una tienda repetida, una columna sin nombre y un nombre que choca con el sufijo de pandas
+    texto = 'Reporte\nDireccion,100 - T,100 - T,200 - U,100 - T.1,,100 - T\nHIPER,"1.234,5",2,3,4,5,6\nMAXI,7,8,9,10,11,12\n'
+
+    esperado = pd.read_csv(_csv_micro(texto), encoding='utf-16', header=1, dtype=str)
+    df = leer_csv_micro(_csv_micro(texto))
+
+    assert list(df.columns) == list(esperado.columns) == ['Direccion', '100 - T', '100 - T.2', '200 - U', '100 - T.1', 'Unnamed: 5', '100 - T.3']
+    pd.testing.assert_frame_equal(df.astype(str), esperado.astype(str))
+
+
+def test_encabezado_repetido_con_usecols():
+    texto = 'Reporte\nA,B,B\n1,2,3\n'
+
+    df = leer_csv_micro(_csv_micro(texto), usecols=['B', 'B.1'])
+
+    assert list(df.columns) == ['B', 'B.1']
+    assert df.iloc[0].tolist() == ['2', '3']
+
+
+def test_cache_de_hashes_acotada_y_atenta_a_cambios(tmp_path, monkeypatch):
+    monkeypatch.setattr(lectura, 'MAXIMO_CACHE_HASHES', 3)
+    monkeypatch.setattr(lectura, '_cache_hashes', type(lectura._cache_hashes)())
+
+    rutas = []
+    for i in range(5):
+        ruta = tmp_path / f'extracto_{i}.csv'
+        ruta.write_bytes(f'contenido {i}'.encode())
+        rutas.append(ruta)
+        assert hash_contenido(ruta) == hashlib.sha256(ruta.read_bytes()).hexdigest()
+
+    # Solo quedan los ultimos MAXIMO_CACHE_HASHES archivos hasheados
+    assert [clave[0] for clave in lectura._cache_hashes] == [os.path.abspath(r) for r in rutas[-3:]]
+
+    # Un archivo reemplazado (otro tamaño) se vuelve a hashear
+    rutas[-1].write_bytes(b'contenido nuevo y mas largo')
+    assert hash_contenido(rutas[-1]) == hashlib.sha256(b'contenido nuevo y mas largo').hexdigest()
+    assert len(lectura._cache_hashes) == 3
+
+
+
+# Titulo y encabezado de un extracto de ventas, y filas con la tienda y el importe entre comillas (llevan coma)
+ENCABEZADO_VENTAS = 'Ventas y Volumen\nDireccion,Punto Operacional,Ventas c/impuesto\n'
+FILAS_VENTAS = ''.join(f'HIPER,"{i} - TIENDA, {i}","{numero_ar(i * 1234.5)}"\n' for i in range(40))
+
+
+@pytest.mark.parametrize('encoding, bom', [('utf-16-le', b'\xff\xfe'), ('utf-16-be', b'\xfe\xff'), ('utf-8', b'\xef\xbb\xbf')])
+def test_partes_csv_micro_igual_a_leer_de_una_vez(encoding, bom):
+    prefijo = bom + ENCABEZADO_VENTAS.encode(encoding)
+    datos = prefijo + FILAS_VENTAS.encode(encoding)
+    formato = detectar_formato(io.BytesIO(datos))
+    completo = leer_csv_micro(io.BytesIO(datos))
+    assert completo['Punto Operacional'].iloc[1] == '1 - TIENDA, 1'
+
+    # Con tantas cantidades de partes algun corte cae en medio de un campo entre comillas (y en UTF-16 en un byte impar)
+    for partes in range(2, 30):
+        resultado = partes_csv_micro(datos, partes, formato['encoding'], formato['header'])
+
+        # Cada parte repite el BOM, el titulo y el encabezado, y las filas no se pierden ni se repiten
+        assert all(parte.startswith(prefijo) for parte in resultado)
+        assert sum(len(parte) - len(prefijo) for parte in resultado) == len(datos) - len(prefijo)
+
+        unidas = pd.concat([leer_csv_micro(io.BytesIO(parte)) for parte in resultado], ignore_index=True)
+        pd.testing.assert_frame_equal(unidas, completo, obj=f'{partes} partes')
@@ -0,0 +1,35 @@
+import io
+
+import pandas as pd
+import pytest
+
+from conftest import TIENDAS, padron_parquet
+from utils.padron import registrar_padron
+from utils.utils import progresiones_mmaa, progresiones_acumulado, MOTORES
+
+# Tiendas 1 y 2 repetidas mas abajo, con otra provincia y sin SC: si no se descartan cambian los totales y las provincias
+REPETIDAS = [(1, '1 - HIP TIENDA 1', 'HIPERMERCADO', 'MENDOZA', ['NC'] * 12), (2, '2 - HIP TIENDA 2', 'HIPERMERCADO', 'SALTA', ['SC'] * 12)]
+
+
+def _hojas(resultado) -> dict:
+    assert not isinstance(resultado, str), resultado
+    return pd.read_excel(resultado, sheet_name=None)
+
+
+def _comparar(a: dict, b: dict):
+    assert list(a) == list(b)
+    for hoja in a:
+        pd.testing.assert_frame_equal(a[hoja], b[hoja], check_dtype=False, rtol=1e-9, obj=hoja)
+
+
+@pytest.mark.parametrize('reporte', [progresiones_mmaa, progresiones_acumulado])
+def test_motores_iguales_con_tiendas_repetidas_en_el_padron(reporte, ventas_micro, debitos_micro, en_carpeta_temporal):
+    padron = registrar_padron(padron_parquet(TIENDAS + REPETIDAS))
+    limpio = registrar_padron(padron_parquet(TIENDAS))
+
+    resultados = {motor: _hojas(reporte(io.BytesIO(ventas_micro), io.BytesIO(debitos_micro), padron, 'Marzo', motor=motor)) for motor in MOTORES}
+
+    # Todos los motores se quedan con la primera fila de cada tienda, igual que un padron sin repetidas
+    esperado = _hojas(reporte(io.BytesIO(ventas_micro), io.BytesIO(debitos_micro), limpio, 'Marzo'))
+    for motor, hojas in resultados.items():
+        _comparar(esperado, hojas)
@@ -0,0 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import TIENDAS, padron_parquet
+from utils.padron import registrar_padron, versiones_padron, BLOQUEO_REGISTRO
+
+
+def test_registros_a_la_vez_no_pierden_versiones(en_carpeta_temporal):
+    # Cada padron tiene otra provincia en la primera tienda, asi el contenido (y el hash) es distinto
+    padrones = [padron_parquet([(1, '1 - HIP TIENDA 1', 'HIPERMERCADO', f'PROVINCIA {i}', ['SC'] * 12)] + TIENDAS[1:]) for i in range(6)]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        hashes = list(pool.map(registrar_padron, padrones))
+
+    assert sorted(v['hash'] for v in versiones_padron()) == sorted(set(hashes))
+    assert len(set(hashes)) == 6
+    assert not BLOQUEO_REGISTRO.exists()
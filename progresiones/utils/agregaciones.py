@@ -0,0 +1,147 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def agregar_niveles(df: pd.DataFrame, niveles: dict, valores='valores') -> dict:
+    '''
+    Calcula de una sola pasada varios niveles de agregacion (grouping sets) sobre un mismo df en formato long.
+
+    `niveles` es un dict nombre -> columnas por las que se agrupa, por ejemplo {'formato': ['año', 'direccion', 'categoria'], 'tienda': ['año', 'punto_operacional', 'categoria']}. Devuelve un dict nombre -> df con las columnas del nivel y la suma de `valores` (una columna o una lista), igual que un groupby(...).sum().reset_index().
+
+    Solo se recorre una vez el df original, agrupando por la union de todas las columnas (el grano mas fino que se necesita). Cada nivel se arma sumando el nivel ya calculado mas chico que lo contiene, de los mas finos a los mas gruesos, asi los niveles gruesos no vuelven a recorrer las filas originales.
+
+    Como en un groupby comun se descartan las filas con nulos en las columnas del nivel, pero solo en el resultado: los niveles intermedios conservan los nulos para que un nivel que no agrupa por esa columna los siga sumando (por ejemplo los debitos, que no tienen sector, cuentan en el total por tienda pero no aparecen en el nivel por sector).
+    '''
+    columnas_valores = [valores] if isinstance(valores, str) else list(valores)
+    grano = list(dict.fromkeys(c for columnas in niveles.values() for c in columnas))
+
+    base = df.groupby(grano, observed=True, dropna=False)[columnas_valores].sum()
+    logger.debug(f'Grano base de {len(niveles)} niveles {grano}: {len(df)} -> {len(base)} filas')
+
+    # Niveles ya calculados (con nulos) de los que se puede partir: columnas -> df agrupado
+    calculados = {tuple(grano): base}
+    resultado = {}
+
+    for nombre, columnas in sorted(niveles.items(), key=lambda nivel: len(nivel[1]), reverse=True):
+        clave = tuple(columnas)
+        if clave not in calculados:
+            # Parto del nivel calculado mas chico que tenga todas las columnas de este
+            origen = min((agrupado for columnas_origen, agrupado in calculados.items() if set(columnas) <= set(columnas_origen)), key=len)
+            calculados[clave] = origen.groupby(list(columnas), observed=True, dropna=False)[columnas_valores].sum()
+
+        resultado[nombre] = calculados[clave].reset_index().dropna(subset=list(columnas)).reset_index(drop=True)
+
+    # Devuelvo los niveles en el orden en que se pidieron
+    return {nombre: resultado[nombre] for nombre in niveles}
+
+
+def calcular_progresiones(df: pd.DataFrame, claves, años=None, valores='valores', escala=100, decimales=1, por_año=False, base=None) -> pd.DataFrame:
+    '''
+    Calcula las progresiones interanuales de un df en formato long (claves, año y valores) sin pasar por pivot_table.
+
+    Las claves se codifican como enteros (un codigo por grupo) y todos los años se suman juntos con un solo np.bincount sobre (grupo, año), asi se obtiene directamente la matriz grupos x años y las progresiones salen de dividir columnas de esa matriz. Devuelve un df con las `claves`, una columna por año (por defecto todos los que aparecen, siempre incluyendo el anterior al ultimo) y la columna 'progresion' del ultimo año contra el anterior: ((actual / anterior) - 1) * `escala`, redondeada a `decimales` (None para no redondear).
+
+    Con `por_año` en vez de 'progresion' se agrega una columna 'progresion {año}' por cada año contra el anterior, y con `base` (un año) una columna 'progresion {año} vs {base}' por cada año posterior contra ese año base.
+
+    Un año sin filas para un grupo queda nulo, y la progresion queda nula si falta alguno de los dos años o si el año anterior suma cero.
+    '''
+    claves = [claves] if isinstance(claves, str) else list(claves)
+    años = list(años) if años is not None else años_progresion(df, base)
+
+    grupos = df.groupby(claves, observed=True, sort=True)
+    codigos = grupos.ngroup().fillna(-1).to_numpy(dtype='int64')
+    cantidad = grupos.ngroups
+
+    # Claves de cada grupo, en el mismo orden que sus codigos
+    resultado = grupos.size().index.to_frame(index=False)
+
+    # Posicion de cada fila en el eje de años (-1 si su año no se pidio)
+    posicion = pd.Index(años).get_indexer(df['año'].to_numpy())
+    valor = df[valores].to_numpy(dtype='float64')
+    validas = (codigos >= 0) & (posicion >= 0) & ~np.isnan(valor)
+    celdas = codigos[validas] * len(años) + posicion[validas]
+
+    # Matriz grupos x años: suma y cantidad de filas de cada celda (una celda sin filas queda nula)
+    forma = (cantidad, len(años))
+    suma = np.bincount(celdas, weights=valor[validas], minlength=cantidad * len(años)).reshape(forma)
+    filas = np.bincount(celdas, minlength=cantidad * len(años)).reshape(forma)
+    matriz = np.where(filas > 0, suma, np.nan)
+
+    for indice, a in enumerate(años):
+        resultado[a] = matriz[:, indice]
+
+    # Pares (columna, anterior, actual) a calcular. Todos se resuelven con una sola division de matrices
+    if por_año:
+        pares = [(f'progresion {actual}', anterior, actual) for anterior, actual in zip(años[:-1], años[1:])]
+    else:
+        pares = [('progresion', años[-1] - 1, años[-1])]
+    if base is not None:
+        pares += [(f'progresion {actual} vs {base}', base, actual) for actual in años if actual > base]
+
+    if pares:
+        anteriores = matriz[:, [años.index(anterior) for _, anterior, _ in pares]]
+        actuales = matriz[:, [años.index(actual) for _, _, actual in pares]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            progresiones = (actuales / anteriores - 1) * escala
+        # Sin año anterior (o con el anterior en cero) no hay progresion
+        progresiones = np.where(np.isfinite(progresiones), progresiones, np.nan)
+        if decimales is not None:
+            progresiones = np.round(progresiones, decimales)
+
+        for indice, (columna, _, _) in enumerate(pares):
+            resultado[columna] = progresiones[:, indice]
+
+    return resultado
+
+
+def años_progresion(df: pd.DataFrame, base=None) -> list:
+    '''
+    Años que usa por defecto calcular_progresiones: todos los que aparecen en `df`, siempre incluyendo el anterior al ultimo (y el año `base` si se pide).
+    '''
+    presentes = [int(a) for a in df['año'].dropna().unique()]
+
+    return sorted(set(presentes) | {max(presentes) - 1} | ({base} if base is not None else set()))
+
+
+def columnas_años(df: pd.DataFrame) -> list:
+    '''
+    Devuelve, ordenadas, las columnas de años (enteros) de un df en formato wide.
+    '''
+    return sorted(c for c in df.columns if isinstance(c, (int, np.integer)))
+
+
+def reagregar_progresiones(df: pd.DataFrame, claves, años=None, escala=100, decimales=1) -> pd.DataFrame:
+    '''
+    Suma por `claves` las columnas de años (por defecto todas) de un df que ya salio de calcular_progresiones (por ejemplo de tienda a formato) y recalcula la 'progresion' del ultimo año contra el anterior.
+    '''
+    claves = [claves] if isinstance(claves, str) else list(claves)
+    años = list(años) if años is not None else columnas_años(df)
+    anterior, actual = años[-1] - 1, años[-1]
+
+    resultado = df.groupby(claves, observed=True)[años].sum().reset_index()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        progresion = (resultado[actual].to_numpy() / resultado[anterior].to_numpy() - 1) * escala
+    progresion = np.where(np.isfinite(progresion), progresion, np.nan)
+    resultado['progresion'] = progresion if decimales is None else np.round(progresion, decimales)
+
+    return resultado
+
+
+def formato_ancho(df: pd.DataFrame, indice, columnas='categoria', medidas=None) -> pd.DataFrame:
+    '''
+    Arma la vista wide para exportar: cada medida (por defecto los dos ultimos años y la progresion) abierta por los valores de `columnas`, con `indice` como index. Es la presentacion [año anterior, año actual, 'progresion'] x categoria de los reportes.
+    '''
+    indice = [indice] if isinstance(indice, str) else list(indice)
+    if medidas is None:
+        años = columnas_años(df)
+        medidas = [*años[-2:], *[c for c in df.columns if isinstance(c, str) and c.startswith('progresion')]]
+
+    ancho = df.set_index([*indice, columnas])[medidas].unstack(columnas)
+    ancho.columns.names = ['año', columnas]
+
+    # Las categorias que no aparecen en el nivel (por ejemplo DEB en los niveles por sector) no generan columnas vacias
+    return ancho.dropna(axis=1, how='all')
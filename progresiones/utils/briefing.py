@@ -0,0 +1,233 @@
+import collections
+import logging
+import threading
+
+import pandas as pd
+
+from utils.lectura import hash_contenido
+from utils.esquemas import leer_insumo
+from utils.dimensiones import concat_dimensiones, numero_operacional, parte_de_fecha
+from utils.agregaciones import agregar_niveles, calcular_progresiones, reagregar_progresiones, años_progresion
+from utils.procesos import en_procesos
+from utils.exportar import exportar_excel
+
+logger = logging.getLogger(__name__)
+
+# Claves de cada uno de los df en formato long del briefing
+CLAVES_TIENDA = ['direccion', 'numero_operacional', 'punto_operacional', 'categoria']
+CLAVES_SECTOR = ['direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector']
+CLAVES_GF = ['direccion', 'grupo_de_familia', 'seccion', 'categoria']
+CLAVES_HISTORICO = ['direccion', 'mes', 'categoria', 'aux']
+
+# Categorias que tienen su propia hoja en el workbook de cada direccion
+CATEGORIAS_BRIEFING = ['vct', 'deb', 'vol']
+
+# Niveles de las ventas y el volumen que usa el briefing: por tienda (el sector, seccion y grupo de familia no son necesarios para calular las progresiones POR TIENDA), por tienda y sector, y el volumen por grupo de familia
+NIVELES_VENTAS = {
+    'tienda': ['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'],
+    'sector': ['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector'],
+    'grupo_de_familia': ['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', 'seccion', 'grupo_de_familia'],
+}
+
+# Cantidad de extractos de ventas cuyos niveles se mantienen en memoria
+MAXIMO_CACHE_NIVELES = 4
+
+_cache_niveles = collections.OrderedDict()
+
+# La cache la usan a la vez las sesiones y el hilo de precalentado: el lock se toma solo para leerla o modificarla, no mientras se lee el CSV
+_lock_cache = threading.Lock()
+
+
+def niveles_ventas(ventas_y_volumen) -> dict:
+    '''
+    Lee las ventas y el volumen del briefing y devuelve sus NIVELES_VENTAS en formato long (categoria vct y vol, el volumen sin envases), con el mes y el numero operacional de cada tienda.
+
+    Los niveles se calculan una sola vez por contenido del archivo (o de la lista de archivos) y se devuelven copias, asi los briefings siguientes sobre el mismo extracto, o uno que ya se precalento, no vuelven a leer el CSV.
+    '''
+    clave = hash_contenido(ventas_y_volumen)
+    with _lock_cache:
+        niveles = _cache_niveles.get(clave)
+        if niveles is not None:
+            _cache_niveles.move_to_end(clave)
+
+    if niveles is None:
+        # Solo las columnas que uso, ya renombradas: mes -> fecha, ventas -> vct y volumen -> vol
+        df_ventas_vol = leer_insumo(ventas_y_volumen, 'ventas', 'briefing')
+
+        # Genero una columna para obtener el valor del MES solo y otra con el NUMERO operacional de la tienda
+        df_ventas_vol['mes'] = parte_de_fecha(df_ventas_vol['fecha'])
+        df_ventas_vol['numero_operacional'] = numero_operacional(df_ventas_vol['punto_operacional'], ' ', errors='raise')
+
+        # Divido el df de Ventas y Volumen en uno solo de Ventas, y otro solo de Volumen, con los valores en "valores" para poder concatenarlos
+        columnas = ['año', 'fecha', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'mes', 'numero_operacional']
+        df_ventas = df_ventas_vol[columnas + ['vct']].rename(columns={'vct': 'valores'})
+        df_volumen = df_ventas_vol[columnas + ['vol']].rename(columns={'vol': 'valores'})
+        df_ventas['categoria'] = 'vct'
+        df_volumen['categoria'] = 'vol'
+
+        # Le quito los envases al volumen
+        df_volumen = df_volumen[~df_volumen['grupo_de_familia'].isin(['ENVASES BEBIDAS', 'ENVASES PAGADOS'])]
+
+        niveles = agregar_niveles(concat_dimensiones([df_ventas, df_volumen]), NIVELES_VENTAS)
+        with _lock_cache:
+            _cache_niveles[clave] = niveles
+            while len(_cache_niveles) > MAXIMO_CACHE_NIVELES:
+                _cache_niveles.popitem(last=False)
+    else:
+        logger.debug('Niveles de ventas del briefing reutilizados')
+
+    return {nombre: nivel.copy() for nombre, nivel in niveles.items()}
+
+
+def briefing_direccion(direccion: str, partes: dict, años: dict, columnas: dict, fecha: str):
+    '''
+    Calcula las progresiones del briefing de una sola direccion y arma su workbook.
+
+    `partes` son los df en formato long del briefing (tienda_sc, tienda_total, sector_sc, gf_sc, historico_sc, historico_total) ya filtrados a la direccion. `años` y `columnas` son los años y las columnas de sectores de todo el briefing, asi cada workbook sale igual que si se calculara todo junto.
+
+    Devuelve (nombre del archivo, contenido del xlsx) y las partes de la Base Giratorio de la direccion. Si la direccion no tiene tiendas comparables no se arma el workbook (nombre y contenido quedan en None).
+    '''
+    años_comparados = años['comparados']
+    año_anterior, año_actual = años_comparados
+
+    # Progresiones por tienda, con los valores comparables y con la superficie total
+    df_tienda_comparable = calcular_progresiones(partes['tienda_sc'], CLAVES_TIENDA, años=años['tienda_sc'], escala=1, decimales=3).sort_values(by='progresion', ascending=False)
+    df_tienda_no_comparable = calcular_progresiones(partes['tienda_total'], CLAVES_TIENDA, años=años['tienda_total'], escala=1, decimales=3).sort_values(by='progresion', ascending=False)
+
+    # Sumo las tiendas y recalculo las progresiones por formato
+    df_formato_comparable = reagregar_progresiones(df_tienda_comparable, ['direccion', 'categoria'], años=años_comparados, escala=1, decimales=3)
+    df_formato_comparable_final = df_formato_comparable.sort_values(['categoria'])
+
+    df_formato_no_comparable = reagregar_progresiones(df_tienda_no_comparable, ['direccion', 'categoria'], años=años_comparados, escala=1, decimales=3)
+    df_formato_no_comparable_final = df_formato_no_comparable.sort_values(['categoria'])
+
+    # Progresiones por tienda y sector (siempre comparables). Los pivots usan los sectores de todo el briefing, asi una direccion sin algun sector igual tiene su columna
+    df_sector_comparable = calcular_progresiones(partes['sector_sc'], CLAVES_SECTOR, años=años['sector_sc'], escala=1, decimales=3)
+    df_progresiones_categoria_sectores = df_sector_comparable.pivot_table(values='progresion', index=['numero_operacional', 'punto_operacional', 'categoria'], columns='sector', aggfunc='sum', observed=True)
+    df_progresiones_categoria_sectores = df_progresiones_categoria_sectores.reindex(columns=columnas['sectores']).reset_index()
+
+    df_tienda_total = df_tienda_comparable.rename(columns={'progresion':'total_tienda'})
+
+    # Progresiones por sector a nivel formato cerrado
+    df_formato_sector = reagregar_progresiones(df_sector_comparable, ['direccion', 'categoria', 'sector'], años=años_comparados, escala=1, decimales=3)
+    df_formato_sector_comparable = df_formato_sector.pivot_table(values='progresion', index=['direccion', 'categoria'], columns='sector', aggfunc='sum', observed=True)
+    df_formato_sector_comparable = df_formato_sector_comparable.reindex(columns=columnas['sectores']).reset_index()
+    df_formato_sector_comparable = df_formato_sector_comparable.fillna({c: 0 for c in df_formato_sector_comparable.select_dtypes('number').columns})
+
+    # Uno las progresiones por sector con el total de cada tienda, lo limpio, ordeno y presento
+    df_progresiones_join_sector_tienda = pd.merge(df_progresiones_categoria_sectores, df_tienda_total[['direccion', 'numero_operacional', 'categoria', 'total_tienda']], on=['numero_operacional', 'categoria'], how='left')
+    df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.fillna({c: 0 for c in df_progresiones_join_sector_tienda.select_dtypes('number').columns})
+    df_progresiones_join_sector_tienda.columns = df_progresiones_join_sector_tienda.columns.str.capitalize().str.strip().str.replace('_', ' ')
+    df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.drop(columns=['Numero operacional'])
+    df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.rename(columns={'Total tienda': 'Total tienda', 'P.g.c.': 'PGC'})
+    df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.sort_values(by='Total tienda', ascending=False)
+
+    # Vista consolidada: progresiones por VCT, DEB y VOL aperturadas por sector, con el total de la tienda de cada categoria
+    df_final_consolidado_tienda = df_tienda_total.drop(columns=años_comparados).rename(columns={'total_tienda':'progresion'})
+    df_final_consolidado_tienda['sector'] = 'Total'
+    df_final_consolidado_sector = df_sector_comparable.drop(columns=años_comparados)
+
+    df_final_consolidado_total = pd.concat([df_final_consolidado_sector, df_final_consolidado_tienda])
+    df_final_consolidado_total = df_final_consolidado_total.pivot_table(values='progresion', index=['direccion', 'punto_operacional'], columns=['categoria', 'sector'], aggfunc='sum', observed=True)
+    df_final_consolidado_total = df_final_consolidado_total.reindex(columns=columnas['consolidado']).reset_index()
+    # La hoja se exporta con index: numero las filas a continuacion de las de las direcciones anteriores
+    df_final_consolidado_total.index += columnas['inicio_consolidado'].get(direccion, 0)
+
+    # Volumen comparable por grupo de familia: progresiones, GAP y CMG. Los GF sin año anterior quedan con progresion 0
+    df_volumen_grupo_de_familia_comparable = calcular_progresiones(partes['gf_sc'], CLAVES_GF, años=años['gf_sc'], escala=1, decimales=None)
+    df_volumen_grupo_de_familia_comparable[año_anterior] = df_volumen_grupo_de_familia_comparable[año_anterior].fillna(0)
+    df_volumen_grupo_de_familia_comparable['GAP'] = df_volumen_grupo_de_familia_comparable[año_actual] - df_volumen_grupo_de_familia_comparable[año_anterior]
+    df_volumen_grupo_de_familia_comparable['progresion'] = df_volumen_grupo_de_familia_comparable.pop('progresion').fillna(0)
+
+    df_volumen_grupo_de_familia_comparable['total_anterior_direccion'] = df_volumen_grupo_de_familia_comparable.groupby('direccion', observed=True)[año_anterior].transform('sum')
+    df_volumen_grupo_de_familia_comparable['Cmg'] = df_volumen_grupo_de_familia_comparable['GAP'] / df_volumen_grupo_de_familia_comparable['total_anterior_direccion']
+    df_volumen_grupo_de_familia_comparable['Cmg'] = df_volumen_grupo_de_familia_comparable['Cmg'].fillna(0)
+    df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.sort_values('Cmg', ascending=False)
+    df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.rename(columns={'direccion':'Direccion','grupo_de_familia':'Grupo de familia', 'seccion':'Seccion', 'categoria':'Categoria', 'progresion':'Progresion'})
+    df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.drop(columns=['total_anterior_direccion'])
+
+    # Progresiones historicas de cada año contra el anterior, comparables y sup total
+    historicos = {}
+    for nombre in ['historico_sc', 'historico_total']:
+        historico = calcular_progresiones(partes[nombre], CLAVES_HISTORICO, años=años[nombre], escala=1, decimales=3, por_año=True)
+        historicos[nombre] = historico.sort_values(by=['direccion', 'categoria' ,'aux'], ascending=[True, True, True]).drop(columns=['aux'])
+
+    # Partes de la Base Giratorio de la direccion: tiendas, formato, tienda x sector y formato x sector. Las tiendas van en el orden de sus claves (sin ordenar por progresion), las ordena una sola vez briefing_por_direccion
+    df_tienda_comparable_aux = df_tienda_comparable.sort_index().assign(sector='')[['direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', *años_comparados, 'progresion']]
+    df_tienda_comparable_aux['aux'] = 'tienda'
+
+    df_formato_comparable_aux = df_formato_comparable.copy()
+    df_formato_comparable_aux['sector'] = ''
+    df_formato_comparable_aux['numero_operacional'] = ''
+    df_formato_comparable_aux['punto_operacional'] = ''
+    df_formato_comparable_aux = df_formato_comparable_aux[['direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', *años_comparados, 'progresion']]
+    df_formato_comparable_aux['aux'] = 'formato'
+
+    df_tienda_sector_aux = df_sector_comparable.assign(aux='tienda_sector')
+
+    df_formato_sector_aux = df_formato_sector.assign(aux='formato_sector')
+    df_formato_sector_aux['numero_operacional'] = ''
+    df_formato_sector_aux['punto_operacional'] = ''
+
+    giratorio = [df_tienda_comparable_aux, df_formato_comparable_aux, df_tienda_sector_aux, df_formato_sector_aux]
+
+    if df_tienda_comparable.empty:
+        return None, None, giratorio
+
+    # Armo el workbook de la direccion en memoria
+    tablas = {
+        f'Total Categoria - {direccion[0:3]}': (df_formato_comparable_final, False),
+        f'Total Categoria (Sup Total) - {direccion[0:3]}'[0:31]: (df_formato_no_comparable_final, False),
+        f'Total Categoria x Sector - {direccion[0:3]}': (df_formato_sector_comparable, False),
+    }
+    for categoria in CATEGORIAS_BRIEFING:
+        df_filtrado = df_progresiones_join_sector_tienda[df_progresiones_join_sector_tienda['Categoria'] == categoria]
+        tablas[f'{categoria} - {direccion[0:3]}'] = (df_filtrado.drop(columns=['Direccion']), False)
+    tablas[f'Info Consolidada - {direccion[0:3]}'] = (df_final_consolidado_total, True)
+    tablas[f'GF Consolidada - {direccion[0:3]}'] = (df_volumen_grupo_de_familia_comparable, False)
+    tablas[f'Progresiones comp - {direccion[0:3]}'] = (historicos['historico_sc'], False)
+    tablas[f'Progresiones total - {direccion[0:3]}'] = (historicos['historico_total'], False)
+
+    file_name = f"Resultados Briefing {direccion.upper()} ({fecha}).xlsx"
+
+    return file_name, exportar_excel(tablas).getvalue(), giratorio
+
+
+def briefing_por_direccion(largos: dict, años_comparados: list, fecha: str):
+    '''
+    Arma los workbooks del briefing en paralelo, uno por direccion (HIPERMERCADO, MAXI, MARKET, PROXIMIDAD, E-COMMERCE).
+
+    `largos` son los df en formato long de todo el briefing (tienda_sc, tienda_total, sector_sc, gf_sc, historico_sc, historico_total). Antes de repartirlos por direccion se fijan los años y las columnas de sectores de todo el briefing, y cada direccion se calcula y se exporta en su propio proceso con briefing_direccion. Las direcciones son independientes entre si, salvo por la Base Giratorio, que se arma al final con las partes de todas.
+
+    Devuelve la lista de (nombre del archivo, contenido del xlsx) de cada direccion y el df de la Base Giratorio.
+    '''
+    años = {nombre: años_progresion(df) for nombre, df in largos.items()}
+    años['comparados'] = list(años_comparados)
+
+    # Columnas de los pivots por sector, iguales en todos los workbooks
+    sectores = largos['sector_sc'].dropna(subset=CLAVES_SECTOR)
+    tiendas = largos['tienda_sc'].dropna(subset=CLAVES_TIENDA)
+    columnas = {
+        'sectores': sectores.groupby('sector', observed=True).size().index.tolist(),
+        'consolidado': pd.concat([sectores[['categoria', 'sector']], tiendas[['categoria']].assign(sector='Total')]).groupby(['categoria', 'sector'], observed=True).size().index,
+    }
+
+    # Filas de la vista consolidada (una por tienda) de las direcciones anteriores a cada una
+    filas_consolidado = pd.concat([sectores[['direccion', 'punto_operacional']], tiendas[['direccion', 'punto_operacional']]]).drop_duplicates().groupby('direccion', observed=True).size()
+    columnas['inicio_consolidado'] = (filas_consolidado.cumsum() - filas_consolidado).to_dict()
+
+    # Reparto cada df por direccion. Una direccion sin filas en alguno de ellos recibe ese df vacio
+    particiones = {nombre: dict(list(df.groupby('direccion', observed=True))) for nombre, df in largos.items()}
+    direcciones = sorted(set(tiendas['direccion']) | set(sectores['direccion']))
+    partes = [{nombre: particiones[nombre].get(direccion, df.iloc[0:0]) for nombre, df in largos.items()} for direccion in direcciones]
+
+    resultados = en_procesos(briefing_direccion, direcciones, partes, [años] * len(direcciones), [columnas] * len(direcciones), [fecha] * len(direcciones))
+
+    archivos = [(nombre, contenido) for nombre, contenido, _ in resultados if nombre is not None]
+
+    # Base Giratorio: cada parte con las filas de todas las direcciones. Las tiendas se ordenan por progresion una sola vez sobre todas las direcciones, asi las empatadas quedan como en el calculo conjunto
+    partes_giratorio = [pd.concat([giratorio[indice] for _, _, giratorio in resultados], ignore_index=True) for indice in range(4)]
+    partes_giratorio[0] = partes_giratorio[0].sort_values(by='progresion', ascending=False)
+    df_bajada_consolidada = pd.concat(partes_giratorio)
+
+    return archivos, df_bajada_consolidada
@@ -0,0 +1,139 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+logger = logging.getLogger(__name__)
+
+# Dimensiones que viajan por los pipelines como category en vez de texto
+DIMENSIONES = ['direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'mes', 'fecha', 'provincia', 'categoria']
+
+
+def ordenar_categorias(df: pd.DataFrame, columnas=None) -> pd.DataFrame:
+    '''
+    Ordena alfabeticamente las categorias de las columnas category, para que sort_values, groupby y pivot_table devuelvan el mismo orden que con texto.
+    '''
+    for columna in columnas if columnas is not None else df.columns:
+        if columna in df.columns and isinstance(df[columna].dtype, CategoricalDtype):
+            categorias = df[columna].cat.categories
+            if not categorias.is_monotonic_increasing:
+                df[columna] = df[columna].cat.reorder_categories(categorias.sort_values())
+
+    return df
+
+
+def compactar_medidas(df: pd.DataFrame, columnas) -> pd.DataFrame:
+    '''
+    Baja las columnas enteras al tipo mas chico que soporte sus valores (int64 -> int32/int16).
+
+    Las columnas float se dejan en float64: las ventas llegan a miles de millones con centavos y float32 pierde precision en las sumas.
+    '''
+    for columna in columnas:
+        if columna in df.columns and pd.api.types.is_integer_dtype(df[columna]):
+            df[columna] = pd.to_numeric(df[columna], downcast='integer')
+
+    return df
+
+
+def concat_dimensiones(dfs, **kwargs) -> pd.DataFrame:
+    '''
+    pd.concat que conserva las dimensiones como category.
+
+    pandas convierte a object las columnas category cuyas categorias no coinciden entre los df. Antes de concatenar se unifican las categorias de cada dimension (incluida la columna 'categoria', que se genera como texto en cada pipeline).
+    '''
+    dfs = [df.copy(deep=False) for df in dfs]
+    columnas = [c for c in dfs[0].columns if all(c in df.columns for df in dfs[1:])] if dfs else []
+
+    for columna in columnas:
+        series = [df[columna] for df in dfs]
+        es_categoria = [isinstance(serie.dtype, CategoricalDtype) for serie in series]
+        if not any(es_categoria) and columna not in DIMENSIONES:
+            continue
+        if not all(es_cat or pd.api.types.is_object_dtype(serie) for es_cat, serie in zip(es_categoria, series)):
+            continue
+
+        categorias = pd.Index([], dtype=object)
+        for serie, es_cat in zip(series, es_categoria):
+            categorias = categorias.union(serie.cat.categories if es_cat else pd.Index(serie.dropna().unique()), sort=False)
+        tipo = CategoricalDtype(categorias.sort_values())
+
+        for df in dfs:
+            df[columna] = df[columna].astype(tipo)
+
+    return pd.concat(dfs, **kwargs)
+
+
+def concat_particiones(dfs, claves: list, origenes=None) -> pd.DataFrame:
+    '''
+    Concatena con concat_dimensiones las partes de un insumo que llego en varios archivos (por ejemplo un extracto por mes o por direccion) y quita las filas cuya clave (`claves`) ya vino en un archivo anterior, por si dos extractos se superponen.
+
+    `origenes` indica de que archivo sale cada df (por defecto uno distinto por df): las filas que se repiten dentro de un mismo archivo se conservan, solo se descartan las que se repiten entre archivos.
+    '''
+    dfs = list(dfs)
+    origenes = list(range(len(dfs))) if origenes is None else list(origenes)
+    df = concat_dimensiones(dfs, ignore_index=True)
+    if len(set(origenes)) < 2 or df.empty:
+        return df
+
+    # Para cada clave me quedo con el primer archivo en que aparece
+    origen = pd.Series(np.repeat(origenes, [len(parte) for parte in dfs]))
+    primero = origen.groupby([df[c] for c in claves], observed=True, dropna=False).transform('min')
+    repetidas = (origen != primero).to_numpy()
+    if repetidas.any():
+        logger.warning(f'{repetidas.sum()} filas repetidas entre archivos se descartan (clave {claves})')
+        df = df[~repetidas].reset_index(drop=True)
+
+    return df
+
+
+def derivar_por_unicos(valores, funcion):
+    '''
+    Calcula una columna derivada una sola vez por cada valor distinto y la expande a todas las filas a traves de los codigos.
+
+    `valores` puede ser una Series (se factoriza, o se usan directamente las categorias si es category) o un DataFrame (se factoriza cada combinacion de filas). `funcion` recibe los valores unicos y devuelve una Series o un DataFrame alineado con ellos.
+    Con ~1.500 tiendas y 36 meses contra decenas de millones de filas, el trabajo sobre strings pasa de O(filas) a O(unicos).
+    '''
+    if isinstance(valores, pd.DataFrame):
+        codigos, unicos = pd.MultiIndex.from_frame(valores).factorize()
+        unicos = unicos.to_frame(index=False, name=list(valores.columns))
+    elif isinstance(valores.dtype, CategoricalDtype):
+        codigos, unicos = valores.cat.codes.to_numpy(), pd.Series(valores.cat.categories)
+    else:
+        codigos, unicos = pd.factorize(valores)
+        unicos = pd.Series(unicos)
+
+    derivado = funcion(unicos)
+    hay_nulos = bool((codigos == -1).any())
+
+    def expandir(serie):
+        return pd.Series(serie.reset_index(drop=True).array.take(codigos, allow_fill=hay_nulos), index=valores.index, name=serie.name)
+
+    if isinstance(derivado, pd.DataFrame):
+        return pd.DataFrame({columna: expandir(derivado[columna]) for columna in derivado.columns}, index=valores.index)
+
+    return expandir(derivado)
+
+
+def numero_operacional(punto_operacional: pd.Series, separador: str = '-', errors=None) -> pd.Series:
+    '''
+    Obtiene el ID de tienda a partir del punto operacional ("123 - NOMBRE") trabajando solo sobre los valores unicos.
+
+    Sin `errors` devuelve el texto tal cual queda luego del split. Con errors='raise' lo convierte a int y con errors='coerce' usa pd.to_numeric dejando nulos los que no son numeros.
+    '''
+    def derivar(unicos):
+        numero = unicos.str.split(separador).str[0]
+        if errors == 'raise':
+            return numero.astype(int)
+        if errors == 'coerce':
+            return pd.to_numeric(numero, errors='coerce')
+        return numero
+
+    return derivar_por_unicos(punto_operacional, derivar)
+
+
+def parte_de_fecha(fecha: pd.Series, posicion: int = 0) -> pd.Series:
+    '''
+    Devuelve la palabra `posicion` de una fecha de Micro ("Enero 2025" -> "Enero") calculandola una vez por fecha distinta.
+    '''
+    return derivar_por_unicos(fecha, lambda unicos: unicos.str.split(' ').str[posicion])
@@ -0,0 +1,365 @@
+import logging
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.lectura import leer_csv_micro, leer_csv_micro_arrow, lotes_csv_micro, archivo_transportable, tamano_descomprimido, leer_columnar, leer_columnar_arrow, leer_excel, columnas_columnar, convertir_numero_ar, detectar_formato, TIPOS_MICRO, TAMANO_BLOQUE
+from utils.dimensiones import ordenar_categorias, compactar_medidas, concat_particiones
+from utils.procesos import en_procesos
+
+logger = logging.getLogger(__name__)
+
+# Nombres normalizados de las dimensiones que comparten todos los reportes de Micro
+DIMENSIONES_MICRO = {
+    'Año': 'año',
+    'Mes': 'mes',
+    'Direccion': 'direccion',
+    'Punto Operacional': 'punto_operacional',
+    'Sector': 'sector',
+    'Seccion': 'seccion',
+    'Grupo de Familia': 'grupo_de_familia',
+}
+
+# Dimensiones de Micro que se leen como category
+CATEGORICAS_MICRO = [c for c in DIMENSIONES_MICRO if c != 'Año']
+
+# Columnas de comparabilidad del padron (una por mes, con el sufijo que agrega pandas al estar repetidas en el Excel)
+MESES_PADRON = {
+    'ENE.2': 'ene',
+    'FEB.2': 'feb',
+    'MAR.2': 'mar',
+    'ABR.2': 'abr',
+    'MAY.2': 'may',
+    'JUN.2': 'jun',
+    'JUL.2': 'jul',
+    'AGO.2': 'ago',
+    'SEP.2': 'sep',
+    'OCT.2': 'oct',
+    'NOV.2': 'nov',
+    'DIC.2': 'dic',
+}
+
+# Por debajo de este tamaño (sumando todas las partes) un insumo se lee en un solo proceso: repartirlo cuesta mas que parsearlo
+MINIMO_BYTES_PARALELO = 32 * 1024 ** 2
+
+# Registro de esquemas de los archivos de entrada.
+# Para cada tipo de insumo se declara como se lee, el tipo de sus columnas, como se renombran y que columnas necesita cada pipeline.
+# Los lectores proyectan y tipan al parsear, asi ningun pipeline carga columnas que despues descarta ni vuelve a normalizar encabezados.
+#   - formato: 'micro' (CSV exportado de MicroStrategy) o 'excel', el formato con el que llega normalmente. El lector se elige con detectar_formato segun el archivo real
+#   - tipos / numericas: tipos forzados al leer y columnas con numeros en formato argentino (solo Micro)
+#   - categoricas: dimensiones que se leen como category (dictionary encoding en Micro)
+#   - renombrar: encabezado original -> nombre normalizado
+#   - pipelines: columnas originales que usa cada pipeline y renombres propios del pipeline, que pisan a los generales
+ESQUEMAS = {
+    'ventas': {
+        'formato': 'micro',
+        'tipos': TIPOS_MICRO,
+        'numericas': {'Ventas c/impuesto': 'float64', 'Venta en Unidades': 'float64'},
+        'categoricas': CATEGORICAS_MICRO,
+        'renombrar': {**DIMENSIONES_MICRO, 'Ventas c/impuesto': 'venta', 'Venta en Unidades': 'volumen'},
+        'pipelines': {
+            'progresiones': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades'],
+            },
+            'comparacion': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades'],
+            },
+            'briefing': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades'],
+                'renombrar': {'Mes': 'fecha', 'Ventas c/impuesto': 'vct', 'Venta en Unidades': 'vol'},
+            },
+            'historico': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Ventas c/impuesto'],
+                'renombrar': {'Ventas c/impuesto': 'valores'},
+            },
+        },
+    },
+    'volumen': {
+        'formato': 'micro',
+        'tipos': TIPOS_MICRO,
+        'numericas': {'VOLUMEN': 'float64'},
+        'categoricas': CATEGORICAS_MICRO,
+        'renombrar': {**DIMENSIONES_MICRO, 'VOLUMEN': 'valores'},
+        'pipelines': {
+            'historico': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'VOLUMEN'],
+            },
+        },
+    },
+    'debitos': {
+        'formato': 'micro',
+        'tipos': TIPOS_MICRO,
+        'numericas': {'Cant. Tickets por Local': 'int64'},
+        'categoricas': CATEGORICAS_MICRO,
+        'renombrar': {**DIMENSIONES_MICRO, 'Cant. Tickets por Local': 'valores'},
+        'pipelines': {
+            'progresiones': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Cant. Tickets por Local'],
+            },
+            'comparacion': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Cant. Tickets por Local'],
+            },
+            'briefing': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Cant. Tickets por Local'],
+                'renombrar': {'Mes': 'fecha'},
+            },
+            'historico': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Cant. Tickets por Local'],
+            },
+        },
+    },
+    'debitos_sector': {
+        'formato': 'micro',
+        'tipos': TIPOS_MICRO,
+        'numericas': {'Cantidad de Tickets': 'int64'},
+        'categoricas': CATEGORICAS_MICRO,
+        'renombrar': {**DIMENSIONES_MICRO, 'Cantidad de Tickets': 'valores'},
+        'pipelines': {
+            'briefing': {
+                'columnas': ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Cantidad de Tickets'],
+                'renombrar': {'Mes': 'fecha'},
+            },
+        },
+    },
+    'padron': {
+        'formato': 'excel',
+        # Fila de encabezado habitual del padron, se usa si no se encuentra buscando las columnas
+        'header': 17,
+        'categoricas': ['PROVINCIA'],
+        'renombrar': {
+            'GSX': 'numero_operacional',
+            'NOMBRE': 'nombre',
+            'Fecha apertura': 'fecha_apertura',
+            'BANDERA': 'bandera',
+            'ORGANIZACIÓN ': 'organización',
+            'PROVINCIA': 'provincia',
+            'FIN DE CIERRE': 'fin_de_cierre',
+            'M² SALÓN': 'm_salón',
+            'M² PGC': 'm_pgc',
+            'M² PFT': 'm_pft',
+            'M² BAZAR': 'm_bazar',
+            'M² Electro': 'm_electro',
+            'M² Textil': 'm_textil',
+            'M² Pls': 'm_pls',
+            'M² GALERIAS': 'm_galerias',
+            'M² Parcking': 'm_parcking',
+            **MESES_PADRON,
+        },
+        'pipelines': {
+            'progresiones': {
+                'columnas': ['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', *MESES_PADRON],
+            },
+            'briefing': {
+                'columnas': ['GSX', 'NOMBRE', 'Fecha apertura', 'BANDERA', 'ORGANIZACIÓN ', 'PROVINCIA', 'FIN DE CIERRE', *MESES_PADRON],
+            },
+            'dia_de_semana': {
+                'columnas': ['GSX', 'NOMBRE', 'Fecha apertura', 'BANDERA', 'ORGANIZACIÓN ', 'PROVINCIA', 'FIN DE CIERRE', *MESES_PADRON],
+                'renombrar': {'GSX': 'no'},
+            },
+        },
+    },
+}
+
+
+def leer_insumo(archivo, insumo: str, pipeline: str, formato: dict = None) -> pd.DataFrame:
+    '''
+    Lee un archivo de entrada segun su esquema registrado en ESQUEMAS.
+
+    Solo se parsean las columnas que necesita el pipeline, con sus tipos, y se devuelven ya renombradas a los nombres normalizados. Las dimensiones llegan como category. `formato` (de detectar_formato) evita volver a detectarlo, por ejemplo en las partes de un mismo archivo.
+
+    `archivo` tambien puede ser una lista de archivos con el mismo esquema (un extracto partido por mes o por direccion), que se leen con _leer_insumos.
+    '''
+    if isinstance(archivo, (list, tuple)):
+        return _leer_insumos(archivo, insumo, pipeline)
+
+    esquema = ESQUEMAS[insumo]
+    esquema_pipeline = esquema['pipelines'][pipeline]
+    columnas = esquema_pipeline['columnas']
+    categoricas = [c for c in esquema.get('categoricas', []) if c in columnas]
+    renombrar = {**esquema['renombrar'], **esquema_pipeline.get('renombrar', {})}
+
+    # El formato real del archivo decide el lector, no el formato con el que suele llegar el insumo
+    formato = formato or detectar_formato(archivo, columnas=columnas)
+
+    if formato['contenedor'] in ('parquet', 'arrow'):
+        df = _leer_insumo_columnar(archivo, esquema, columnas, categoricas)
+    elif formato['contenedor'] == 'csv':
+        df = leer_csv_micro(archivo, usecols=columnas, tipos=esquema.get('tipos'), numericas=esquema.get('numericas'), categoricas=categoricas, header=formato['header'], encoding=formato['encoding'], sep=formato['sep'], decimal=formato['decimal'])
+    elif formato['contenedor'] == 'xlsx':
+        # Si la fila de encabezado se movio se usa la detectada, si no se encontro se prueba con la declarada en el esquema
+        header = formato['header'] if formato['header'] is not None else esquema.get('header', 0)
+        df = leer_excel(archivo, header=header, usecols=columnas)
+        for columna in categoricas:
+            df[columna] = df[columna].astype('category')
+    else:
+        raise ValueError(f'Formato de archivo no soportado para "{insumo}": {formato["contenedor"]}')
+
+    # Respeto el orden declarado en el esquema y no el del archivo
+    if list(df.columns) != columnas:
+        df = df[columnas]
+
+    df = df.rename(columns=renombrar)
+
+    # Dimensiones con categorias ordenadas y medidas enteras en el tipo mas chico posible
+    df = ordenar_categorias(df)
+    df = compactar_medidas(df, df.columns)
+
+    logger.debug(f'Insumo "{insumo}" leido para {pipeline}: {df.shape}')
+
+    return df
+
+
+def _claves_insumo(insumo: str, pipeline: str) -> list:
+    '''
+    Clave natural de un insumo ya leido para `pipeline`: sus columnas renombradas, salvo las medidas.
+    '''
+    esquema = ESQUEMAS[insumo]
+    esquema_pipeline = esquema['pipelines'][pipeline]
+    renombrar = {**esquema['renombrar'], **esquema_pipeline.get('renombrar', {})}
+
+    return [renombrar.get(c, c) for c in esquema_pipeline['columnas'] if c not in esquema.get('numericas', {})]
+
+
+def _leer_insumos(archivos, insumo: str, pipeline: str) -> pd.DataFrame:
+    '''
+    Lee un insumo que llego en varios archivos y devuelve un solo df, como si fuera un unico extracto.
+
+    Si entre todos superan MINIMO_BYTES_PARALELO cada archivo se parsea en su propio proceso. Las partes se concatenan con concat_particiones, que descarta las filas cuya clave natural (las dimensiones) ya vino en un archivo anterior.
+    '''
+    archivos = list(archivos)
+    if not archivos:
+        raise ValueError(f'No se cargo ningun archivo de "{insumo}"')
+    if len(archivos) == 1:
+        return leer_insumo(archivos[0], insumo, pipeline)
+
+    if tamano_descomprimido(archivos) >= MINIMO_BYTES_PARALELO:
+        partes = en_procesos(leer_insumo, [archivo_transportable(archivo) for archivo in archivos], [insumo] * len(archivos), [pipeline] * len(archivos))
+    else:
+        partes = [leer_insumo(archivo, insumo, pipeline) for archivo in archivos]
+
+    df = concat_particiones(partes, _claves_insumo(insumo, pipeline))
+    df = compactar_medidas(df, df.columns)
+
+    logger.debug(f'Insumo "{insumo}" leido de {len(archivos)} archivos para {pipeline}: {df.shape}')
+
+    return df
+
+
+def leer_insumo_por_lotes(archivo, insumo: str, pipeline: str, tamano_bloque: int = TAMANO_BLOQUE):
+    '''
+    Igual que leer_insumo pero devuelve el insumo de a partes (un df por cada `tamano_bloque` bytes de texto), ya con las columnas, nombres y tipos del esquema, para procesar archivos que no entran en memoria.
+
+    Solo los CSV se leen por partes. Parquet, Arrow y Excel se devuelven en una sola parte con leer_insumo.
+    '''
+    esquema = ESQUEMAS[insumo]
+    esquema_pipeline = esquema['pipelines'][pipeline]
+    columnas = esquema_pipeline['columnas']
+    categoricas = [c for c in esquema.get('categoricas', []) if c in columnas]
+    renombrar = {**esquema['renombrar'], **esquema_pipeline.get('renombrar', {})}
+
+    formato = detectar_formato(archivo, columnas=columnas)
+
+    if formato['contenedor'] != 'csv':
+        yield leer_insumo(archivo, insumo, pipeline)
+        return
+
+    lotes = lotes_csv_micro(archivo, usecols=columnas, tipos=esquema.get('tipos'), numericas=esquema.get('numericas'), categoricas=categoricas, header=formato['header'], encoding=formato['encoding'], sep=formato['sep'], decimal=formato['decimal'], tamano_bloque=tamano_bloque)
+    for lote in lotes:
+        df = pa.Table.from_batches([lote]).select(columnas).to_pandas().rename(columns=renombrar)
+        df = ordenar_categorias(df)
+
+        yield compactar_medidas(df, df.columns)
+
+
+def leer_insumo_arrow(archivo, insumo: str, pipeline: str) -> pa.Table:
+    '''
+    Igual que leer_insumo pero devuelve una tabla de pyarrow, sin pasar por pandas: las dimensiones quedan con dictionary encoding y las medidas ya numericas.
+
+    Los CSV de Micro, Parquet y Arrow se leen directo a Arrow. Los Excel y los insumos en varios archivos (que se unen en pandas con _leer_insumos) se leen con leer_insumo y se convierten al final.
+    '''
+    if isinstance(archivo, (list, tuple)):
+        return pa.Table.from_pandas(leer_insumo(archivo, insumo, pipeline), preserve_index=False)
+
+    esquema = ESQUEMAS[insumo]
+    esquema_pipeline = esquema['pipelines'][pipeline]
+    columnas = esquema_pipeline['columnas']
+    categoricas = [c for c in esquema.get('categoricas', []) if c in columnas]
+    renombrar = {**esquema['renombrar'], **esquema_pipeline.get('renombrar', {})}
+
+    formato = detectar_formato(archivo, columnas=columnas)
+
+    if formato['contenedor'] == 'csv':
+        tabla, _ = leer_csv_micro_arrow(archivo, usecols=columnas, tipos=esquema.get('tipos'), numericas=esquema.get('numericas'), categoricas=categoricas, header=formato['header'], encoding=formato['encoding'], sep=formato['sep'], decimal=formato['decimal'])
+        tabla = tabla.select(columnas)
+    elif formato['contenedor'] in ('parquet', 'arrow'):
+        tabla = _leer_insumo_columnar_arrow(archivo, esquema, columnas, categoricas)
+    else:
+        return pa.Table.from_pandas(leer_insumo(archivo, insumo, pipeline), preserve_index=False)
+
+    tabla = tabla.rename_columns([renombrar.get(c, c) for c in tabla.column_names])
+
+    logger.debug(f'Insumo "{insumo}" leido en Arrow para {pipeline}: {tabla.num_rows} filas')
+
+    return tabla
+
+
+def _origen_columnas(archivo, esquema: dict, columnas: list) -> tuple:
+    '''
+    Devuelve, para cada una de las `columnas` de un insumo columnar, el nombre con que figura en el archivo (el mismo, o su nombre normalizado segun esquema['renombrar']) y la lista de columnas del archivo a proyectar, sin repetidas. Si alguna no esta levanta ValueError. La comparten los lectores de pandas y Arrow, asi los dos resuelven los renombres igual.
+    '''
+    disponibles = set(columnas_columnar(archivo))
+    origen = {}
+    for columna in columnas:
+        if columna in disponibles:
+            origen[columna] = columna
+        elif esquema['renombrar'].get(columna) in disponibles:
+            origen[columna] = esquema['renombrar'][columna]
+        else:
+            raise ValueError(f'Columna "{columna}" no encontrada en el archivo')
+
+    return origen, list(dict.fromkeys(origen.values()))
+
+
+def _leer_insumo_columnar_arrow(archivo, esquema: dict, columnas: list, categoricas: list) -> pa.Table:
+    '''
+    Version Arrow de _leer_insumo_columnar: proyecta las columnas (con encabezados originales o normalizados), convierte las medidas que lleguen como texto y codifica las dimensiones como diccionario.
+    '''
+    origen, proyeccion = _origen_columnas(archivo, esquema, columnas)
+    tabla = leer_columnar_arrow(archivo, columnas=proyeccion)
+    numericas = {**esquema.get('tipos', {}), **esquema.get('numericas', {})}
+
+    arrays = []
+    for columna in columnas:
+        array = tabla.column(origen[columna])
+        if columna in numericas and not (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)):
+            array, errores = convertir_numero_ar(array, numericas[columna])
+            if errores:
+                logger.warning(f'{errores} valores de la columna "{columna}" no se pudieron convertir a numero y quedaron como nulos')
+        elif columna in categoricas and not pa.types.is_dictionary(array.type):
+            array = array.cast(pa.string()).dictionary_encode()
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, names=columnas)
+
+
+def _leer_insumo_columnar(archivo, esquema: dict, columnas: list, categoricas: list) -> pd.DataFrame:
+    '''
+    Lee un insumo guardado en Parquet o Arrow IPC (por ejemplo desde la pagina de conversion) con proyeccion de columnas.
+
+    Acepta tanto los encabezados originales como los ya normalizados. Solo se convierten las columnas que no vengan con su tipo final, el resto de la normalizacion de CSV/Excel se saltea.
+    '''
+    origen, proyeccion = _origen_columnas(archivo, esquema, columnas)
+    df = leer_columnar(archivo, columnas=proyeccion)
+    df = pd.DataFrame({columna: df[nombre] for columna, nombre in origen.items()})
+
+    for columna, tipo in {**esquema.get('tipos', {}), **esquema.get('numericas', {})}.items():
+        if columna in df.columns and not pd.api.types.is_numeric_dtype(df[columna]):
+            df[columna], errores = convertir_numero_ar(df[columna], tipo)
+            if errores:
+                logger.warning(f'{errores} valores de la columna "{columna}" no se pudieron convertir a numero y quedaron como nulos')
+
+    for columna in categoricas:
+        if not isinstance(df[columna].dtype, pd.CategoricalDtype):
+            df[columna] = df[columna].astype('category')
+
+    return df
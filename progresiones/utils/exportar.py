@@ -0,0 +1,146 @@
+import io
+import logging
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import pandas as pd
+
+from utils.procesos import en_procesos, procesos_disponibles
+
+logger = logging.getLogger(__name__)
+
+# Por debajo de esta cantidad de celdas no conviene repartir las hojas en procesos: exportar en serie es mas rapido que serializar las tablas
+MINIMO_CELDAS_PARALELO = 200_000
+
+# Filas de cada tabla que se exportan de prueba para saber, antes de repartir las hojas, si sus estilos coinciden y se van a poder unir
+FILAS_MUESTRA_ESTILOS = 5
+
+# Archivos que tiene un xlsx de una sola hoja exportado por pandas con xlsxwriter. Una parte con otros archivos (imagenes, comentarios, etc.) no se une
+ARCHIVOS_HOJA = {
+    '[Content_Types].xml', '_rels/.rels', 'xl/_rels/workbook.xml.rels', 'xl/worksheets/sheet1.xml', 'xl/workbook.xml',
+    'xl/sharedStrings.xml', 'xl/styles.xml', 'xl/theme/theme1.xml', 'docProps/core.xml', 'docProps/app.xml',
+}
+
+RELACION = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+TIPO_HOJA = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+TIPO_TEXTOS = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml'
+
+
+def _hoja_xlsx(tabla: pd.DataFrame, hoja: str, index: bool) -> bytes:
+    '''
+    Exporta una sola tabla como un xlsx de una hoja.
+    '''
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        tabla.to_excel(writer, sheet_name=hoja, index=index)
+
+    return output.getvalue()
+
+
+def se_pueden_unir(tablas: dict) -> bool:
+    '''
+    Indica si las hojas de `tablas` (dict hoja -> (df, index)) exportadas por separado van a tener los mismos estilos y por lo tanto se van a poder unir con unir_hojas. Se prueba exportando unas pocas filas de cada tabla: los estilos dependen de los tipos de las columnas y del indice (una columna de fechas agrega su formato), no de la cantidad de filas.
+    '''
+    estilos = {zipfile.ZipFile(io.BytesIO(_hoja_xlsx(tabla.head(FILAS_MUESTRA_ESTILOS), hoja, index))).read('xl/styles.xml') for hoja, (tabla, index) in tablas.items()}
+
+    return len(estilos) == 1
+
+
+def unir_hojas(hojas: list, partes: list) -> bytes:
+    '''
+    Une varios xlsx de una sola hoja (`partes`, exportados con _hoja_xlsx) en un solo xlsx con las `hojas` en ese orden.
+
+    Cada parte trae su propia tabla de textos compartidos: se unen en una sola, sin repetir los textos que aparecen en varias hojas, y en cada hoja se cambian los indices de sus celdas de texto por los de la tabla unida. Los estilos tienen que ser los mismos en todas las partes (pandas usa el mismo formato de encabezados en todas las hojas), si no se levanta ValueError.
+    '''
+    archivos = [zipfile.ZipFile(io.BytesIO(parte)) for parte in partes]
+    for archivo in archivos:
+        extra = set(archivo.namelist()) - ARCHIVOS_HOJA
+        if extra:
+            raise ValueError(f'La parte tiene archivos que no se pueden unir: {sorted(extra)}')
+
+    base = archivos[0]
+    estilos = base.read('xl/styles.xml')
+    if any(archivo.read('xl/styles.xml') != estilos for archivo in archivos[1:]):
+        raise ValueError('Las hojas tienen estilos distintos')
+
+    # Texto compartido -> indice en la tabla unida, en orden de aparicion
+    textos, cantidad_textos, hojas_xml = {}, 0, []
+    for posicion, archivo in enumerate(archivos):
+        indices = []
+        if 'xl/sharedStrings.xml' in archivo.namelist():
+            tabla_textos = archivo.read('xl/sharedStrings.xml')
+            indices = [textos.setdefault(texto, len(textos)) for texto in re.findall(rb'<si>.*?</si>', tabla_textos, flags=re.S)]
+            cantidad_textos += int(re.search(rb' count="(\d+)"', tabla_textos).group(1))
+
+        hoja_xml = archivo.read('xl/worksheets/sheet1.xml')
+        if indices != list(range(len(indices))):
+            hoja_xml = re.sub(rb'(t="s"><v>)(\d+)(</v>)', lambda m: m.group(1) + str(indices[int(m.group(2))]).encode() + m.group(3), hoja_xml)
+        # Solo la primera hoja queda seleccionada (varias seleccionadas se abren agrupadas)
+        if posicion:
+            hoja_xml = hoja_xml.replace(b' tabSelected="1"', b'', 1)
+        hojas_xml.append(hoja_xml)
+
+    cantidad = len(hojas)
+    nombres = ''.join(f'<sheet name={quoteattr(hoja)} sheetId="{i}" r:id="rId{i}"/>' for i, hoja in enumerate(hojas, start=1)).encode()
+    libro = re.sub(rb'<sheets>.*?</sheets>', lambda _: b'<sheets>' + nombres + b'</sheets>', base.read('xl/workbook.xml'), flags=re.S)
+
+    relaciones = [f'<Relationship Id="rId{i}" Type="{RELACION}/worksheet" Target="worksheets/sheet{i}.xml"/>' for i in range(1, cantidad + 1)]
+    relaciones += [f'<Relationship Id="rId{cantidad + 1}" Type="{RELACION}/theme" Target="theme/theme1.xml"/>', f'<Relationship Id="rId{cantidad + 2}" Type="{RELACION}/styles" Target="styles.xml"/>']
+    if textos:
+        relaciones.append(f'<Relationship Id="rId{cantidad + 3}" Type="{RELACION}/sharedStrings" Target="sharedStrings.xml"/>')
+    relaciones_libro = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' + ''.join(relaciones) + '</Relationships>').encode()
+
+    tipos = re.sub(rb'<Override PartName="/xl/(worksheets/sheet1|sharedStrings)\.xml"[^>]*/>', b'', base.read('[Content_Types].xml'))
+    tipos_nuevos = ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{TIPO_HOJA}"/>' for i in range(1, cantidad + 1))
+    if textos:
+        tipos_nuevos += f'<Override PartName="/xl/sharedStrings.xml" ContentType="{TIPO_TEXTOS}"/>'
+    tipos = tipos.replace(b'</Types>', tipos_nuevos.encode() + b'</Types>')
+
+    titulos = ''.join(f'<vt:lpstr>{escape(hoja)}</vt:lpstr>' for hoja in hojas)
+    propiedades = re.sub(rb'<vt:i4>\d+</vt:i4>', f'<vt:i4>{cantidad}</vt:i4>'.encode(), base.read('docProps/app.xml'), count=1)
+    propiedades = re.sub(rb'<TitlesOfParts>.*?</TitlesOfParts>', lambda _: f'<TitlesOfParts><vt:vector size="{cantidad}" baseType="lpstr">{titulos}</vt:vector></TitlesOfParts>'.encode(), propiedades, flags=re.S)
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', tipos)
+        zf.writestr('_rels/.rels', base.read('_rels/.rels'))
+        zf.writestr('xl/_rels/workbook.xml.rels', relaciones_libro)
+        for i, hoja_xml in enumerate(hojas_xml, start=1):
+            zf.writestr(f'xl/worksheets/sheet{i}.xml', hoja_xml)
+        zf.writestr('xl/workbook.xml', libro)
+        if textos:
+            zf.writestr('xl/sharedStrings.xml', b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="%d" uniqueCount="%d">' % (cantidad_textos, len(textos)) + b''.join(textos) + b'</sst>')
+        zf.writestr('xl/styles.xml', estilos)
+        zf.writestr('xl/theme/theme1.xml', base.read('xl/theme/theme1.xml'))
+        zf.writestr('docProps/core.xml', base.read('docProps/core.xml'))
+        zf.writestr('docProps/app.xml', propiedades)
+
+    return output.getvalue()
+
+
+def exportar_excel(tablas: dict) -> io.BytesIO:
+    '''
+    Exporta a un xlsx en memoria las `tablas` (dict hoja -> (df, index)), una hoja por tabla y en ese orden.
+
+    Con varias hojas y suficientes celdas, cada hoja se serializa en su propio proceso como un xlsx de una hoja y el archivo final se arma con unir_hojas, asi la exportacion escala con los nucleos en vez de ser una cola en serie despues del calculo. Antes de repartir las hojas se verifica con se_pueden_unir que las partes van a tener los mismos estilos (por ejemplo, una columna de fechas en una sola hoja lo impide): si no, o si hay un solo nucleo, se exporta directamente en serie con un solo ExcelWriter.
+    '''
+    hojas = list(tablas)
+    celdas = sum(tabla.size for tabla, _ in tablas.values())
+
+    if len(hojas) > 1 and celdas >= MINIMO_CELDAS_PARALELO and procesos_disponibles() > 1 and se_pueden_unir(tablas):
+        # Las hojas mas grandes se reparten primero, asi ninguna queda sola al final
+        orden = sorted(hojas, key=lambda hoja: tablas[hoja][0].size, reverse=True)
+        partes = dict(zip(orden, en_procesos(_hoja_xlsx, [tablas[hoja][0] for hoja in orden], orden, [tablas[hoja][1] for hoja in orden])))
+        try:
+            return io.BytesIO(unir_hojas(hojas, [partes[hoja] for hoja in hojas]))
+        except ValueError as e:
+            logger.warning(f'No se pudieron unir las hojas exportadas en paralelo, se exporta en serie. Detalle: {e}')
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        for hoja, (tabla, index) in tablas.items():
+            tabla.to_excel(writer, sheet_name=hoja, index=index)
+
+    output.seek(0)
+    return output
@@ -0,0 +1,58 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from utils.lectura import tamano_archivo, EXTENSIONES_COMPRIMIDAS
+
+logger = logging.getLogger(__name__)
+
+# Carpeta del servidor donde MicroStrategy o los analistas dejan los extractos, para leerlos directo del disco en vez de subirlos desde el navegador
+DIRECTORIO_EXTRACTOS = Path('data') / 'extractos'
+
+# Extensiones de los archivos de la carpeta que se ofrecen como extractos
+EXTENSIONES_EXTRACTOS = ['csv', 'parquet', 'arrow', *EXTENSIONES_COMPRIMIDAS]
+
+
+def listar_extractos(directorio: Path = None) -> list:
+    '''
+    Devuelve los extractos de la carpeta compartida (por defecto DIRECTORIO_EXTRACTOS, incluidas sus subcarpetas), del mas nuevo al mas viejo. Cada extracto es un dict con ruta, archivo (ruta relativa a la carpeta), tamano (bytes) y modificado.
+
+    Los archivos que se estan copiando (nombres que empiezan con "." o "~") se ignoran.
+    '''
+    directorio = Path(directorio or DIRECTORIO_EXTRACTOS)
+    if not directorio.is_dir():
+        return []
+
+    extractos = []
+    for ruta in directorio.rglob('*'):
+        if not ruta.is_file() or ruta.name.startswith(('.', '~')) or ruta.suffix[1:].lower() not in EXTENSIONES_EXTRACTOS:
+            continue
+
+        estado = ruta.stat()
+        extractos.append({
+            'ruta': ruta,
+            'archivo': ruta.relative_to(directorio).as_posix(),
+            'tamano': estado.st_size,
+            'modificado': datetime.fromtimestamp(estado.st_mtime).isoformat(sep=' ', timespec='minutes'),
+        })
+
+    return sorted(extractos, key=lambda e: e['modificado'], reverse=True)
+
+
+def rutas_extractos(archivos, directorio: Path = None) -> list:
+    '''
+    Devuelve las rutas de los `archivos` elegidos (rutas relativas a la carpeta, como las devuelve listar_extractos), verificando que sigan existiendo y que no apunten fuera de la carpeta.
+    '''
+    directorio = Path(directorio or DIRECTORIO_EXTRACTOS).resolve()
+
+    rutas = []
+    for archivo in archivos:
+        ruta = (directorio / archivo).resolve()
+        if directorio not in ruta.parents or not ruta.is_file():
+            raise ValueError(f'El extracto "{archivo}" no esta en la carpeta compartida')
+        rutas.append(ruta)
+
+    logger.debug(f'Extractos elegidos de la carpeta compartida: {len(rutas)} archivos, {round(tamano_archivo(rutas) / 1024 ** 2, 2)} MB')
+
+    return rutas
+
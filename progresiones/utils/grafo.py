@@ -0,0 +1,25 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def evaluar_grafo(grafo: dict, pedidos) -> dict:
+    '''
+    Evalua de forma perezosa un reporte definido como grafo de nodos con nombre (por ejemplo hechos -> SC -> niveles -> hojas).
+
+    `grafo` es un dict nombre -> (dependencias, funcion), donde la funcion recibe los resultados de sus dependencias en el mismo orden. Solo se evaluan los nodos `pedidos` y sus ancestros, y cada nodo una sola vez aunque lo necesiten varios (queda memoizado durante la evaluacion). Devuelve un dict nombre -> resultado con los nodos pedidos, en el orden pedido.
+    '''
+    resultados = {}
+
+    def evaluar(nombre, camino=()):
+        if nombre in camino:
+            raise ValueError(f'El grafo tiene un ciclo: {" -> ".join(camino + (nombre,))}')
+
+        if nombre not in resultados:
+            dependencias, funcion = grafo[nombre]
+            resultados[nombre] = funcion(*(evaluar(dependencia, camino + (nombre,)) for dependencia in dependencias))
+            logger.debug(f'Nodo {nombre} evaluado')
+
+        return resultados[nombre]
+
+    return {nombre: evaluar(nombre) for nombre in pedidos}
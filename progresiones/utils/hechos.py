@@ -0,0 +1,292 @@
+import collections
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.lectura import hash_contenido, detectar_formato, tamano_descomprimido, partes_csv_micro, archivo_transportable
+from utils.esquemas import ESQUEMAS, MESES_PADRON, MINIMO_BYTES_PARALELO, leer_insumo, leer_insumo_por_lotes
+from utils.padron import leer_padron, version_padron, matriz_comparable
+from utils.dimensiones import concat_dimensiones, concat_particiones, numero_operacional, derivar_por_unicos
+from utils.procesos import en_procesos, procesos_disponibles
+from utils.agregaciones import agregar_niveles
+
+logger = logging.getLogger(__name__)
+
+# Grupos de familia que se quitan del volumen (los envases no son volumen vendido)
+ENVASES = 'ENVASES'
+
+# Datos del padron que viajan en la tabla de hechos. Se guardan como category para que el cruce no multiplique la memoria por fila
+COLUMNAS_PADRON_HECHOS = ['nombre', 'fecha_apertura', 'fin_de_cierre', 'provincia', 'ene', 'feb', 'mar', 'abr', 'may', 'jun', 'jul', 'ago', 'sep', 'oct', 'nov', 'dic']
+
+# Cantidad de tablas de hechos que se mantienen en memoria (una por combinacion de archivos subidos)
+MAXIMO_CACHE_HECHOS = 4
+
+# Limite de memoria para armar la tabla de hechos. Si las ventas no entran se leen por partes
+MEMORIA_HECHOS_MB = 2048
+
+# Memoria que ocupa armar la tabla de hechos por cada byte de texto del CSV de ventas (lectura, ventas y volumen en long y cruce con el padron)
+EXPANSION_CSV = 2
+
+# Cada parte del CSV que se lee por partes ocupa como texto 1/FRACCION_LOTE del limite de memoria
+FRACCION_LOTE = 16
+TAMANO_LOTE_MINIMO = 64 * 1024
+
+# Dimensiones de ventas y volumen en la tabla de hechos
+DIMENSIONES_VENTAS = ['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia']
+
+_cache_hechos = collections.OrderedDict()
+
+# Niveles ya agregados sobre la SC de cada mes, por tabla de hechos de la cache: clave de la tabla -> {(version del padron, columnas): nivel}
+_cache_niveles_sc = {}
+
+# Las caches las usan a la vez las sesiones de Streamlit y el hilo de precalentado. Se toma el lock solo para leerlas o modificarlas, nunca mientras se arma una tabla
+_lock_cache = threading.Lock()
+
+
+def _hechos_ventas(df_ventas_y_volumen: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Pasa ventas y volumen a formato long con todo su detalle, cada uno con su categoria (VCT y VOL sin envases).
+    '''
+    dimensiones = [c for c in DIMENSIONES_VENTAS if c in df_ventas_y_volumen.columns]
+
+    ventas = df_ventas_y_volumen[dimensiones + ['venta']].rename(columns={'venta': 'valores'}).dropna(subset=['valores'])
+    ventas['categoria'] = 'VCT'
+
+    volumen = df_ventas_y_volumen[dimensiones + ['volumen']].rename(columns={'volumen': 'valores'}).dropna(subset=['valores'])
+    volumen = volumen[~volumen['grupo_de_familia'].str.contains(ENVASES, na=False)]
+    volumen['categoria'] = 'VOL'
+
+    return concat_dimensiones([ventas, volumen], ignore_index=True)
+
+
+def _sumar_grano(df: pd.DataFrame) -> pd.DataFrame:
+    # Suma los valores repetidos en el grano mas fino de los reportes (todas las dimensiones), sin cambiar el orden de las columnas
+    return df.groupby([c for c in df.columns if c != 'valores'], observed=True, dropna=False, sort=False)['valores'].sum().reset_index()[df.columns]
+
+
+def _unir_ventas(parciales: list, origenes=None) -> pd.DataFrame:
+    # Las partes de un mismo archivo se suman y las claves que ya vinieron en un archivo anterior se descartan (ver concat_particiones)
+    claves = [c for c in parciales[0].columns if c not in ('categoria', 'valores')]
+
+    return _sumar_grano(concat_particiones(parciales, claves, origenes))
+
+
+def _hechos_ventas_por_lotes(ventas, pipeline: str, memoria: int) -> pd.DataFrame:
+    '''
+    Arma la parte de ventas y volumen de la tabla de hechos leyendo el archivo de a partes, para extractos que no entran en memoria.
+
+    Cada parte se agrega apenas se lee al grano mas fino de los reportes y solo se guardan esos parciales, que se vuelven a combinar cuando superan la mitad de `memoria` (bytes). Asi el pico de memoria queda acotado por `memoria` y no por el tamaño del archivo. Los reportes solo suman valores, por lo que el resultado es el mismo que sin agregar.
+
+    Las ventas en varios archivos se procesan de a un archivo y se unen con _unir_ventas.
+    '''
+    if isinstance(ventas, (list, tuple)):
+        return _unir_ventas([_hechos_ventas_por_lotes(archivo, pipeline, memoria) for archivo in ventas])
+
+    parciales, ocupado, filas = [], 0, 0
+    for df in leer_insumo_por_lotes(ventas, 'ventas', pipeline, tamano_bloque=max(memoria // FRACCION_LOTE, TAMANO_LOTE_MINIMO)):
+        filas += len(df)
+        parcial = _sumar_grano(_hechos_ventas(df))
+        parciales.append(parcial)
+        ocupado += parcial.memory_usage(deep=True).sum()
+
+        if ocupado > memoria // 2 and len(parciales) > 1:
+            parciales = [_sumar_grano(concat_dimensiones(parciales, ignore_index=True))]
+            ocupado = parciales[0].memory_usage(deep=True).sum()
+            logger.debug(f'Parciales de ventas combinados: {len(parciales[0])} filas, {round(ocupado / 1024 ** 2, 2)} MB')
+
+    if not parciales:
+        return _hechos_ventas(leer_insumo(ventas, 'ventas', pipeline))
+
+    resultado = _sumar_grano(concat_dimensiones(parciales, ignore_index=True)) if len(parciales) > 1 else parciales[0]
+    logger.info(f'Ventas leidas por partes: {filas} filas agregadas a {len(resultado)} filas de hechos')
+
+    return resultado
+
+
+def _hechos_ventas_parte(parte: bytes, pipeline: str, formato: dict) -> pd.DataFrame:
+    # Se ejecuta en un proceso del pool: la parte es un CSV completo (ver partes_csv_micro)
+    return _sumar_grano(_hechos_ventas(leer_insumo(parte, 'ventas', pipeline, formato=formato)))
+
+
+def _hechos_ventas_en_procesos(ventas, pipeline: str) -> pd.DataFrame:
+    '''
+    Arma la parte de ventas y volumen de la tabla de hechos repartiendo los archivos de ventas en procesos.
+
+    Cada archivo es una particion, y los CSV grandes se cortan ademas en rangos de bytes al final de una fila, uno por nucleo. Cada proceso parsea su parte y la agrega al grano mas fino de los reportes, y solo esos parciales (mucho mas chicos que el texto) vuelven al proceso principal, donde se unen con _unir_ventas sin armar nunca el extracto completo. Si en total son chicos, o hay un solo nucleo, las partes se leen en el proceso actual.
+    '''
+    archivos = list(ventas) if isinstance(ventas, (list, tuple)) else [ventas]
+    procesos = procesos_disponibles()
+    paralelo = procesos > 1 and tamano_descomprimido(archivos) >= MINIMO_BYTES_PARALELO
+
+    partes, formatos, origenes = [], [], []
+    for posicion, archivo in enumerate(archivos):
+        formato = detectar_formato(archivo, columnas=ESQUEMAS['ventas']['pipelines'][pipeline]['columnas'])
+        # Los extractos comprimidos no se cortan: cada uno se descomprime en un solo proceso
+        if paralelo and formato['contenedor'] == 'csv' and formato['compresion'] is None and tamano_descomprimido(archivo) >= MINIMO_BYTES_PARALELO:
+            partes_archivo = partes_csv_micro(archivo, procesos, formato['encoding'], formato['header'])
+        else:
+            partes_archivo = [archivo_transportable(archivo) if paralelo else archivo]
+        partes += partes_archivo
+        formatos += [formato] * len(partes_archivo)
+        origenes += [posicion] * len(partes_archivo)
+
+    if len(partes) == 1:
+        return _hechos_ventas(leer_insumo(partes[0], 'ventas', pipeline, formato=formatos[0]))
+
+    if paralelo:
+        parciales = en_procesos(_hechos_ventas_parte, partes, [pipeline] * len(partes), formatos)
+    else:
+        parciales = [_hechos_ventas_parte(parte, pipeline, formato) for parte, formato in zip(partes, formatos)]
+    del partes
+
+    resultado = _unir_ventas(parciales, origenes)
+    logger.info(f'Ventas leidas de {len(archivos)} archivos en {len(parciales)} partes: {sum(len(p) for p in parciales)} filas parciales agregadas a {len(resultado)} filas de hechos')
+
+    return resultado
+
+
+def memoria_estimada(ventas) -> int:
+    '''
+    Estima en bytes la memoria que necesita armar la tabla de hechos de un archivo de ventas (o de una lista de archivos) de una sola vez, a partir del tamaño del archivo (ya descomprimido). Solo se estima para CSV (para otros formatos devuelve 0): son los unicos que se pueden leer por partes.
+    '''
+    if isinstance(ventas, (list, tuple)):
+        return sum(memoria_estimada(archivo) for archivo in ventas)
+
+    formato = detectar_formato(ventas)
+    if formato['contenedor'] != 'csv':
+        return 0
+
+    # Los CSV de Micro llegan en UTF-16: dos bytes por caracter
+    bytes_por_caracter = 2 if formato['encoding'].startswith('utf-16') else 1
+
+    return int(tamano_descomprimido(ventas) / bytes_por_caracter * EXPANSION_CSV)
+
+
+def construir_hechos(ventas, debitos, padron, pipeline: str = 'progresiones', memoria_mb: int = None) -> pd.DataFrame:
+    '''
+    Arma la tabla de hechos en formato long que comparten los reportes de progresiones: (año, mes, direccion, numero_operacional, punto_operacional, sector, seccion, grupo_de_familia, categoria, valores) con los datos del padron ya cruzados por tienda.
+
+    - categoria VCT: ventas, VOL: volumen sin envases, DEB: debitos (solo a nivel tienda, sin sector/seccion/GF)
+    - Se quitan los valores nulos y el numero operacional queda numerico (nulo si el punto operacional no empieza con un numero)
+
+    `ventas` y `debitos` pueden ser un archivo o una lista de archivos con el mismo esquema (por ejemplo un extracto por mes o por direccion): cada archivo se procesa como una particion y las filas que se repiten entre archivos se descartan.
+
+    La tabla se arma una sola vez por combinacion de archivos (por hash de contenido) y `pipeline` (las columnas que se leen de ventas segun ESQUEMAS), asi varios reportes sobre los mismos extractos no vuelven a leer ni cruzar nada. La tabla devuelta se comparte entre reportes, por lo que no se debe modificar.
+
+    Si la memoria estimada para las ventas supera `memoria_mb` (por defecto MEMORIA_HECHOS_MB), el archivo se lee por partes y cada parte se agrega al grano de los reportes antes de juntarlas (ver _hechos_ventas_por_lotes). Si entra en memoria y es un CSV grande, se parsea y agrega en paralelo de a rangos de bytes (ver _hechos_ventas_en_procesos). En los dos casos las filas repetidas en ese grano quedan sumadas en una sola.
+    '''
+    version = version_padron(padron)
+    clave = (hash_contenido(ventas), hash_contenido(debitos), version.stem, pipeline)
+    with _lock_cache:
+        hechos = _cache_hechos.get(clave)
+        if hechos is not None:
+            _cache_hechos.move_to_end(clave)
+    if hechos is not None:
+        logger.debug(f'Tabla de hechos reutilizada para {pipeline}')
+        return hechos
+
+    memoria = (memoria_mb or MEMORIA_HECHOS_MB) * 1024 ** 2
+    estimada = memoria_estimada(ventas)
+    if estimada > memoria:
+        logger.info(f'Ventas de {round(estimada / 1024 ** 2)} MB estimados con un limite de {round(memoria / 1024 ** 2)} MB: se leen por partes')
+        hechos_ventas = _hechos_ventas_por_lotes(ventas, pipeline, memoria)
+    else:
+        hechos_ventas = _hechos_ventas_en_procesos(ventas, pipeline)
+
+    df_debitos = leer_insumo(debitos, 'debitos', pipeline)
+    df_padron = leer_padron(version, 'progresiones')
+
+    # Los debitos llegan a nivel tienda
+    debitos = df_debitos[['año', 'mes', 'direccion', 'punto_operacional', 'valores']].dropna(subset=['valores'])
+    debitos['categoria'] = 'DEB'
+
+    hechos = concat_dimensiones([hechos_ventas, debitos], ignore_index=True)
+    hechos['numero_operacional'] = numero_operacional(hechos['punto_operacional'], errors='coerce')
+
+    # Preparo el padron una sola vez: fecha legible, ID numerico y datos de texto como category
+    df_padron['fecha_apertura'] = df_padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
+    df_padron['numero_operacional'] = pd.to_numeric(df_padron['numero_operacional'], errors='coerce')
+    df_padron = df_padron.dropna(subset=['numero_operacional'])[['numero_operacional', *COLUMNAS_PADRON_HECHOS]]
+    for columna in COLUMNAS_PADRON_HECHOS:
+        df_padron[columna] = df_padron[columna].astype('category')
+
+    hechos = hechos.merge(df_padron, how='left', on='numero_operacional')
+
+    logger.info(f'Tabla de hechos armada para {pipeline}: {hechos.shape}, {round(hechos.memory_usage(deep=True).sum() / 1024 ** 2, 2)} MB')
+
+    with _lock_cache:
+        _cache_hechos[clave] = hechos
+        while len(_cache_hechos) > MAXIMO_CACHE_HECHOS:
+            descartada, _ = _cache_hechos.popitem(last=False)
+            _cache_niveles_sc.pop(descartada, None)
+
+    return hechos
+
+
+def filtrar_sc(hechos: pd.DataFrame, mes_comparable: str) -> pd.DataFrame:
+    '''
+    Devuelve las filas de tiendas que son Superficie Comparable en `mes_comparable` ("Marzo") y tienen nombre y fecha de apertura en el padron.
+    '''
+    mes = mes_comparable[0:3].lower()
+
+    return hechos[(hechos[mes] == 'SC') & hechos['nombre'].notna() & hechos['fecha_apertura'].notna()]
+
+
+def comparable_por_mes(numeros_operacionales: pd.Series, fechas: pd.Series, matriz: tuple) -> np.ndarray:
+    '''
+    Devuelve un array booleano que indica, fila por fila, si la tienda es Superficie Comparable en el mes de su fecha ("Enero 2025"), buscando en la `matriz` que arma matriz_comparable. Las tiendas que no estan en el padron quedan como no comparables.
+    '''
+    tiendas, comparables = matriz
+    meses = {mes: posicion for posicion, mes in enumerate(MESES_PADRON.values())}
+
+    fila = tiendas.get_indexer(numeros_operacionales.to_numpy())
+    columna = derivar_por_unicos(fechas, lambda unicos: unicos.str[0:3].str.lower().map(meses).fillna(-1).astype('int64')).to_numpy()
+
+    validas = (fila >= 0) & (columna >= 0)
+    resultado = np.zeros(len(fila), dtype=bool)
+    resultado[validas] = comparables[fila[validas], columna[validas]]
+
+    return resultado
+
+
+def filtrar_sc_mensual(hechos: pd.DataFrame, padron) -> pd.DataFrame:
+    '''
+    Devuelve las filas de tiendas que son Superficie Comparable en el mes de cada fila, para acumular periodos de varios meses con la comparabilidad de cada mes y no la de un unico mes.
+    '''
+    return hechos[comparable_por_mes(hechos['numero_operacional'], hechos['mes'], matriz_comparable(padron))]
+
+
+def niveles_sc_mensual(hechos: pd.DataFrame, padron, niveles: dict) -> dict:
+    '''
+    Calcula los `niveles` (como agregar_niveles) sobre las filas de `hechos` que son Superficie Comparable en su propio mes (ver filtrar_sc_mensual).
+
+    Si `hechos` es una tabla de la cache de construir_hechos, los niveles quedan guardados junto con ella y un reporte posterior sobre los mismos archivos solo agrega los que falten. Se devuelven copias, asi el reporte puede modificarlas.
+    '''
+    version = version_padron(padron).stem
+    with _lock_cache:
+        clave = next((clave for clave, tabla in list(_cache_hechos.items()) if tabla is hechos), None)
+        guardados = dict(_cache_niveles_sc.get(clave, {}))
+
+    faltantes = {nombre: columnas for nombre, columnas in niveles.items() if (version, tuple(columnas)) not in guardados}
+    if faltantes:
+        calculados = {(version, tuple(faltantes[nombre])): nivel for nombre, nivel in agregar_niveles(filtrar_sc_mensual(hechos, padron), faltantes).items()}
+        guardados.update(calculados)
+        with _lock_cache:
+            # La tabla pudo salir de la cache mientras se agregaba: en ese caso los niveles no se guardan
+            if clave is not None and _cache_hechos.get(clave) is hechos:
+                _cache_niveles_sc.setdefault(clave, {}).update(calculados)
+
+    logger.debug(f'Niveles SC mensual: {len(niveles) - len(faltantes)} reutilizados, {len(faltantes)} calculados')
+
+    return {nombre: guardados[(version, tuple(columnas))].copy() for nombre, columnas in niveles.items()}
+
+
+def agregar_tiendas(hechos: pd.DataFrame, columnas=()) -> pd.DataFrame:
+    '''
+    Agrupa la tabla de hechos a nivel tienda, mes y categoria, sumando el detalle de sector/seccion/GF. `columnas` agrega datos del padron (por ejemplo provincia) a las columnas del resultado.
+    '''
+    claves = ['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', *columnas, 'categoria']
+
+    return hechos.groupby(claves, observed=True, dropna=False)['valores'].sum().reset_index()
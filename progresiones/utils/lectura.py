@@ -0,0 +1,974 @@
+import codecs
+import collections
+import csv
+import gzip
+import hashlib
+import io
+import logging
+import mmap
+import os
+import re
+import threading
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de los bloques que se leen del archivo original y se transcodifican a UTF-8 (acota la memoria del parseo)
+TAMANO_BLOQUE = 4 * 1024 * 1024
+
+# Tipos que se fuerzan al leer los reportes de Micro. El resto de las columnas se leen como texto
+TIPOS_MICRO = {'Año': 'int64'}
+
+# Columnas de valores de los reportes de Micro y el tipo al que se convierten al leerlas
+NUMERICAS_MICRO = {
+    'Ventas c/impuesto': 'float64',
+    'Venta en Unidades': 'float64',
+    'VOLUMEN': 'float64',
+    'Cant. Tickets por Local': 'int64',
+    'Cantidad de Tickets': 'int64',
+}
+
+# Firmas (magic bytes) de los formatos columnares que se leen sin parsear
+FIRMA_PARQUET = b'PAR1'
+FIRMA_ARROW = b'ARROW1'
+FIRMA_ARROW_STREAM = b'\xff\xff\xff\xff'
+
+# Firmas de los contenedores zip (XLSX o zip comprimido) y marcas de orden de bytes (BOM) de los textos
+FIRMA_ZIP = b'PK\x03\x04'
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Firmas de los extractos comprimidos (gzip y zstd) y extensiones con las que se suben. Los zip se distinguen de un XLSX por su contenido
+FIRMA_GZIP = b'\x1f\x8b'
+FIRMA_ZSTD = b'\x28\xb5\x2f\xfd'
+EXTENSIONES_COMPRIMIDAS = ['zip', 'gz', 'zst']
+
+# Relacion de compresion con la que se estima el tamaño descomprimido cuando el archivo no lo informa (un CSV UTF-16 de Micro comprime ~10x)
+RELACION_COMPRESION = 10
+
+# Hashes de los archivos en disco ya calculados, por (ruta, tamaño, fecha de modificacion): un archivo que no cambio no se vuelve a leer para hashearlo
+# Se guardan como mucho MAXIMO_CACHE_HASHES (se descartan los usados hace mas tiempo), asi una carpeta con muchos extractos reemplazados no hace crecer la cache sin limite
+MAXIMO_CACHE_HASHES = 256
+_cache_hashes = collections.OrderedDict()
+# El hilo de precalentado y las sesiones hashean a la vez
+_lock_hashes = threading.Lock()
+
+# Bytes que se miran para detectar el formato de un archivo de texto y cuantas filas se revisan como maximo buscando el encabezado
+TAMANO_MUESTRA = 64 * 1024
+FILAS_MUESTRA = 50
+
+# Valores con los que openpyxl devuelve las celdas con error de Excel (se leen como nulos, igual que en pandas)
+ERRORES_EXCEL = {'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A', '#GETTING_DATA'}
+
+# Separadores candidatos de los CSV, en orden de preferencia ante un empate
+SEPARADORES = [',', ';', '\t', '|']
+
+# Formato numerico de Argentina como lo exporta Micro: punto como separador de miles y coma decimal ("1.234.567,89")
+PATRON_NUMERO_AR = r'^\s*[-+]?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?\s*$'
+
+# Formato numerico con punto decimal y coma de miles ("1,234,567.89"), el que sale al exportar con configuracion regional en ingles
+PATRON_NUMERO_US = r'^\s*[-+]?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?\s*$'
+
+# Mismos valores que pandas interpreta como nulos por defecto, para no cambiar el comportamiento de los pipelines
+VALORES_NULOS = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+class FlujoUTF8(io.RawIOBase):
+    '''
+    Envuelve un archivo binario (UploadedFile de Streamlit, BytesIO o archivo abierto) y lo expone como un flujo UTF-8.
+
+    El archivo original se lee de a bloques de tamaño fijo y se transcodifica con un decoder incremental, por lo que nunca se materializa el texto completo en memoria.
+    '''
+
+    def __init__(self, archivo, encoding: str = 'utf-16', tamano_bloque: int = TAMANO_BLOQUE):
+        self._archivo = archivo
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._tamano_bloque = tamano_bloque
+        self._pendiente = b''
+        self._posicion = 0
+        self._fin = False
+
+    def readable(self):
+        return True
+
+    def _llenar(self):
+        # Leo bloques hasta tener bytes UTF-8 disponibles o llegar al final del archivo
+        while self._posicion >= len(self._pendiente) and not self._fin:
+            bloque = self._archivo.read(self._tamano_bloque)
+            self._fin = not bloque
+            self._pendiente = self._decoder.decode(bloque, final=self._fin).encode('utf-8')
+            self._posicion = 0
+
+    def readinto(self, buffer):
+        self._llenar()
+        n = min(len(buffer), len(self._pendiente) - self._posicion)
+        buffer[:n] = self._pendiente[self._posicion:self._posicion + n]
+        self._posicion += n
+        return n
+
+
+def convertir_numero_ar(valores, tipo='float64', decimal: str = ','):
+    '''
+    Convierte en una sola pasada vectorizada una columna de textos con formato argentino ("1.234.567,89") a float64 o int64.
+
+    Con decimal='.' se interpreta el formato inverso ("1,234,567.89").
+
+    Acepta una pd.Series o un array de pyarrow y devuelve el mismo tipo de objeto junto con la cantidad de valores que no se pudieron convertir. Esos valores quedan como nulos en vez de levantar un error. Los nulos de origen se mantienen nulos y no cuentan como error.
+    '''
+    es_serie = isinstance(valores, pd.Series)
+    if es_serie:
+        texto = pa.array(valores, from_pandas=True) if pd.api.types.is_numeric_dtype(valores) else pa.array(valores.astype(object), type=pa.string(), from_pandas=True)
+    else:
+        texto = valores
+    tipo = _tipo_arrow(tipo)
+
+    if pa.types.is_integer(texto.type) or pa.types.is_floating(texto.type):
+        # La columna ya viene numerica (por ejemplo desde un Parquet), no hay nada que parsear
+        resultado, errores = pc.cast(texto, tipo, safe=False), 0
+    else:
+        # Marco como nulo todo lo que no respete el formato, asi el cast posterior no falla
+        miles = '.' if decimal == ',' else ','
+        validos = pc.match_substring_regex(texto, PATRON_NUMERO_AR if decimal == ',' else PATRON_NUMERO_US)
+        errores = pc.sum(pc.invert(validos)).as_py() or 0
+        texto = pc.if_else(validos, texto, pa.scalar(None, pa.string()))
+
+        texto = pc.replace_substring(texto, miles, '')
+        if decimal != '.':
+            texto = pc.replace_substring(texto, decimal, '.')
+        texto = pc.utf8_trim_whitespace(texto)
+        resultado = pc.cast(texto, pa.float64())
+        if pa.types.is_integer(tipo):
+            resultado = pc.cast(pc.round(resultado), tipo)
+        elif tipo != pa.float64():
+            resultado = pc.cast(resultado, tipo)
+
+    if es_serie:
+        resultado = pd.Series(resultado.to_numpy(zero_copy_only=False), index=valores.index, name=valores.name)
+
+    return resultado, errores
+
+
+def _convertir_lote(lote, numericas: dict, errores: dict, decimal: str = ','):
+    '''
+    Convierte las columnas numericas de un lote de pyarrow y acumula los errores de parseo por columna.
+    '''
+    columnas = []
+    for nombre, columna in zip(lote.schema.names, lote.columns):
+        if nombre in numericas:
+            columna, n = convertir_numero_ar(columna, numericas[nombre], decimal=decimal)
+            errores[nombre] += n
+        columnas.append(columna)
+
+    return pa.RecordBatch.from_arrays(columnas, names=lote.schema.names)
+
+
+def _abrir_crudo(archivo):
+    '''
+    Devuelve un objeto binario legible a partir de un path, bytes o un buffer, posicionado al inicio, sin descomprimir.
+    '''
+    if isinstance(archivo, str) or hasattr(archivo, '__fspath__'):
+        return open(archivo, 'rb')
+
+    if isinstance(archivo, (bytes, bytearray)):
+        return io.BytesIO(archivo)
+
+    if hasattr(archivo, 'seek'):
+        archivo.seek(0)
+
+    return archivo
+
+
+def _leer_crudo(archivo, n: int, desde_el_final: bool = False) -> bytes:
+    '''
+    Devuelve los primeros (o con `desde_el_final` los ultimos) `n` bytes de un path, bytes o buffer, tal cual estan guardados y sin mover su posicion.
+    '''
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        return bytes(archivo[-n:] if desde_el_final else archivo[:n])
+
+    binario = _abrir_crudo(archivo) if isinstance(archivo, str) or hasattr(archivo, '__fspath__') else archivo
+    posicion = binario.tell()
+    try:
+        if desde_el_final:
+            binario.seek(0, io.SEEK_END)
+            binario.seek(max(binario.tell() - n, 0))
+        else:
+            binario.seek(0)
+        return binario.read(n)
+    finally:
+        if binario is archivo:
+            binario.seek(posicion)
+        else:
+            binario.close()
+
+
+def _miembro_zip(zf: zipfile.ZipFile) -> zipfile.ZipInfo:
+    # El extracto es el primer archivo del zip (se ignoran carpetas y los metadatos que agrega macOS)
+    miembros = [m for m in zf.infolist() if not m.is_dir() and not m.filename.startswith('__MACOSX/')]
+    if not miembros:
+        raise ValueError('El zip no contiene ningun archivo')
+
+    return miembros[0]
+
+
+def detectar_compresion(archivo) -> str:
+    '''
+    Detecta por sus primeros bytes si el archivo es un extracto comprimido. Devuelve 'gzip', 'zstd', 'zip' o None (un XLSX, aunque sea un zip, no cuenta como comprimido).
+    '''
+    inicio = _leer_crudo(archivo, 4)
+    if inicio.startswith(FIRMA_GZIP):
+        return 'gzip'
+    if inicio.startswith(FIRMA_ZSTD):
+        return 'zstd'
+    if inicio.startswith(FIRMA_ZIP):
+        binario = _abrir_crudo(archivo)
+        try:
+            with zipfile.ZipFile(binario) as zf:
+                return None if '[Content_Types].xml' in zf.namelist() else 'zip'
+        except zipfile.BadZipFile:
+            return None
+        finally:
+            if binario is archivo:
+                binario.seek(0)
+            else:
+                binario.close()
+
+    return None
+
+
+def _abrir_binario(archivo):
+    '''
+    Devuelve un objeto binario legible a partir de un path, bytes o un buffer, posicionado al inicio.
+
+    Los extractos comprimidos (gzip, zstd o un zip con el CSV adentro) se devuelven como un flujo que descomprime a medida que se lee, sin armar nunca el archivo descomprimido completo en memoria.
+    '''
+    compresion = detectar_compresion(archivo)
+    es_path = isinstance(archivo, str) or hasattr(archivo, '__fspath__')
+
+    if compresion == 'gzip':
+        return gzip.open(archivo, 'rb') if es_path else gzip.GzipFile(fileobj=_abrir_crudo(archivo), mode='rb')
+    if compresion == 'zstd':
+        # Sobre la fuente de Arrow y no sobre el buffer: al cerrar el flujo pyarrow cierra el archivo que envuelve
+        return pa.CompressedInputStream(_fuente_cruda(archivo), 'zstd')
+    if compresion == 'zip':
+        zf = zipfile.ZipFile(archivo if es_path else _abrir_crudo(archivo))
+        miembro = zf.open(_miembro_zip(zf))
+        # El zip sigue abierto hasta que se cierra el miembro
+        zf.close()
+        return miembro
+
+    return _abrir_crudo(archivo)
+
+
+def tamano_descomprimido(archivo) -> int:
+    '''
+    Devuelve el tamaño en bytes del contenido de un archivo ya descomprimido, leyendolo de los metadatos del formato sin descomprimir nada. Para un archivo sin comprimir es tamano_archivo y de una lista de archivos devuelve la suma.
+
+    Si el formato no lo informa (zstd sin el tamaño en el encabezado, o un gzip de mas de 4 GB cuyo tamaño guardado da la vuelta) se estima con RELACION_COMPRESION.
+    '''
+    if isinstance(archivo, (list, tuple)):
+        return sum(tamano_descomprimido(parte) for parte in archivo)
+
+    compresion = detectar_compresion(archivo)
+    if compresion is None:
+        return tamano_archivo(archivo)
+
+    comprimido = tamano_archivo(archivo)
+    tamano = None
+
+    if compresion == 'zip':
+        binario = _abrir_crudo(archivo)
+        try:
+            with zipfile.ZipFile(binario) as zf:
+                tamano = _miembro_zip(zf).file_size
+        finally:
+            if binario is archivo:
+                binario.seek(0)
+            else:
+                binario.close()
+    elif compresion == 'gzip':
+        # ISIZE: los ultimos 4 bytes, el tamaño original modulo 2^32
+        tamano = int.from_bytes(_leer_crudo(archivo, 4, desde_el_final=True), 'little')
+        if tamano < comprimido:
+            tamano = None
+    elif compresion == 'zstd':
+        # Encabezado del primer frame: descriptor y, segun sus flags, ventana, diccionario y tamaño del contenido
+        encabezado = _leer_crudo(archivo, 18)
+        descriptor = encabezado[4]
+        un_segmento = (descriptor >> 5) & 1
+        posicion = 5 + (0 if un_segmento else 1) + (0, 1, 2, 4)[descriptor & 3]
+        largo = (un_segmento, 2, 4, 8)[descriptor >> 6]
+        if largo:
+            tamano = int.from_bytes(encabezado[posicion:posicion + largo], 'little') + (256 if largo == 2 else 0)
+
+    return tamano if tamano is not None else comprimido * RELACION_COMPRESION
+
+
+def _tipo_arrow(tipo):
+    if isinstance(tipo, pa.DataType):
+        return tipo
+    return pa.type_for_alias(str(tipo))
+
+
+def leer_csv_micro(archivo, usecols=None, tipos=None, numericas=None, categoricas=None, header=None, encoding=None, sep=None, decimal=None):
+    '''
+    Lee un CSV exportado desde MicroStrategy con leer_csv_micro_arrow y lo pasa a pandas.
+
+    La cantidad de valores que no se pudieron convertir a numero queda en df.attrs['errores_numericos'] y las columnas de `categoricas` llegan como category.
+    '''
+    tabla, errores = leer_csv_micro_arrow(archivo, usecols=usecols, tipos=tipos, numericas=numericas, categoricas=categoricas, header=header, encoding=encoding, sep=sep, decimal=decimal)
+
+    df = tabla.to_pandas()
+    df.attrs['errores_numericos'] = errores
+
+    return df
+
+
+def _nombres_columnas(encabezado: list) -> list:
+    '''
+    Nombra las columnas del encabezado igual que pd.read_csv: las que vienen vacias quedan como "Unnamed: <posicion>" y las repetidas (por ejemplo una tienda que aparece dos veces en un crosstab) como "<nombre>.1", "<nombre>.2", ...
+
+    pyarrow no renombra los repetidos e incluir una columna repetida por nombre lee siempre la primera, asi que el encabezado se normaliza antes de abrir el lector.
+    '''
+    nombres = [nombre if nombre != '' else f'Unnamed: {posicion}' for posicion, nombre in enumerate(encabezado)]
+
+    # Mismo algoritmo que el lector C de pandas: se saltea el sufijo que ya existe como otra columna del encabezado
+    cantidades = {}
+    for posicion, nombre in enumerate(nombres):
+        original, cantidad = nombre, cantidades.get(nombre, 0)
+        while cantidad > 0:
+            cantidades[original] = cantidad + 1
+            nombre = f'{original}.{cantidad}'
+            cantidad = cantidad + 1 if nombre in nombres else cantidades.get(nombre, 0)
+        nombres[posicion] = nombre
+        cantidades[nombre] = cantidad + 1
+
+    return nombres
+
+
+def _abrir_csv_micro(archivo, usecols=None, tipos=None, categoricas=None, header=None, encoding=None, sep=None, decimal=None, tamano_bloque: int = TAMANO_BLOQUE):
+    '''
+    Detecta el formato que falte, saltea las filas de titulo y abre el lector por bloques de pyarrow de un CSV de Micro. Devuelve el lector, las columnas que se leen y el separador decimal.
+    '''
+    if None in (header, encoding, sep, decimal):
+        formato = detectar_formato(archivo, columnas=usecols)
+        if formato['contenedor'] != 'csv':
+            raise ValueError(f'Se esperaba un CSV y el archivo es {formato["contenedor"]}')
+        header = formato['header'] if header is None else header
+        encoding = formato['encoding'] if encoding is None else encoding
+        sep = formato['sep'] if sep is None else sep
+        decimal = formato['decimal'] if decimal is None else decimal
+
+    binario = _abrir_binario(archivo)
+    flujo = io.BufferedReader(FlujoUTF8(binario, encoding=encoding), buffer_size=tamano_bloque)
+
+    # Salteo las filas de titulo del reporte y leo el encabezado real
+    for _ in range(header):
+        flujo.readline()
+    linea_encabezado = flujo.readline().decode('utf-8').rstrip('\r\n')
+    encabezado = _nombres_columnas(next(csv.reader([linea_encabezado], delimiter=sep)))
+
+    if usecols is not None:
+        faltantes = [c for c in usecols if c not in encabezado]
+        if faltantes:
+            raise ValueError(f'Columnas no encontradas en el archivo: {faltantes}')
+        columnas = [c for c in encabezado if c in usecols]
+    else:
+        columnas = encabezado
+
+    tipos_columnas = {c: pa.string() for c in encabezado}
+    for columna, tipo in (tipos or {}).items():
+        if columna in tipos_columnas:
+            tipos_columnas[columna] = _tipo_arrow(tipo)
+    for columna in categoricas or []:
+        if columna in tipos_columnas:
+            tipos_columnas[columna] = pa.dictionary(pa.int32(), pa.string())
+
+    lector = pacsv.open_csv(
+        flujo,
+        read_options=pacsv.ReadOptions(column_names=encabezado, block_size=tamano_bloque),
+        parse_options=pacsv.ParseOptions(delimiter=sep),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columnas,
+            column_types=tipos_columnas,
+            null_values=VALORES_NULOS,
+            strings_can_be_null=True,
+        ),
+    )
+
+    return lector, columnas, decimal
+
+
+def leer_csv_micro_arrow(archivo, usecols=None, tipos=None, numericas=None, categoricas=None, header=None, encoding=None, sep=None, decimal=None):
+    '''
+    Lee un CSV exportado desde MicroStrategy a una tabla de pyarrow, sin pasar por el codec lento de pandas. Devuelve la tabla y los errores de conversion numerica por columna.
+
+    El archivo se transcodifica a UTF-8 de a bloques y se parsea con el lector columnar de pyarrow. Se saltean las `header` filas de titulo que agrega Micro antes del encabezado.
+
+    `header`, `encoding`, `sep` y `decimal` que no se indiquen se detectan con detectar_formato a partir del inicio del archivo (Micro exporta UTF-16, una fila de titulo, coma como separador y coma decimal, pero un export en UTF-8 o con otro separador se lee igual sin reintentos).
+
+    Todas las columnas se leen como texto, salvo las indicadas en `tipos` ({'Año': 'int64'}). Con `usecols` solo se parsean las columnas pedidas, respetando el orden del archivo.
+
+    Las columnas de `numericas` ({'Ventas c/impuesto': 'float64'}) se convierten desde el formato argentino a medida que se parsea cada bloque, contando los valores que no se pudieron convertir.
+
+    Las columnas de `categoricas` se leen con dictionary encoding.
+    '''
+    lector, columnas, decimal = _abrir_csv_micro(archivo, usecols=usecols, tipos=tipos, categoricas=categoricas, header=header, encoding=encoding, sep=sep, decimal=decimal)
+    numericas = {c: t for c, t in (numericas or {}).items() if c in columnas}
+    errores = dict.fromkeys(numericas, 0)
+
+    # Convierto los valores numericos bloque a bloque, asi el texto original de cada bloque se libera enseguida
+    lotes = [_convertir_lote(lote, numericas, errores, decimal) for lote in lector]
+    if lotes:
+        tabla = pa.Table.from_batches(lotes)
+    else:
+        esquema = pa.schema([pa.field(c, _tipo_arrow(numericas[c]) if c in numericas else t) for c, t in zip(lector.schema.names, lector.schema.types)])
+        tabla = esquema.empty_table()
+
+    logger.debug(f'CSV de Micro leido con pyarrow: {tabla.num_rows} filas, {tabla.num_columns} columnas')
+
+    for columna, n in errores.items():
+        if n:
+            logger.warning(f'{n} valores de la columna "{columna}" no se pudieron convertir a numero y quedaron como nulos')
+
+    return tabla, errores
+
+
+def lotes_csv_micro(archivo, usecols=None, tipos=None, numericas=None, categoricas=None, header=None, encoding=None, sep=None, decimal=None, tamano_bloque: int = TAMANO_BLOQUE):
+    '''
+    Igual que leer_csv_micro_arrow pero devuelve los lotes (pa.RecordBatch) a medida que se parsean, de a `tamano_bloque` bytes de texto, sin juntar nunca la tabla completa. Sirve para procesar por partes los archivos que no entran en memoria.
+    '''
+    lector, columnas, decimal = _abrir_csv_micro(archivo, usecols=usecols, tipos=tipos, categoricas=categoricas, header=header, encoding=encoding, sep=sep, decimal=decimal, tamano_bloque=tamano_bloque)
+    numericas = {c: t for c, t in (numericas or {}).items() if c in columnas}
+    errores = dict.fromkeys(numericas, 0)
+
+    for lote in lector:
+        yield _convertir_lote(lote, numericas, errores, decimal)
+
+    for columna, n in errores.items():
+        if n:
+            logger.warning(f'{n} valores de la columna "{columna}" no se pudieron convertir a numero y quedaron como nulos')
+
+
+def tamano_archivo(archivo) -> int:
+    '''
+    Devuelve el tamaño en bytes de un path, bytes o buffer (incluidos los archivos subidos a Streamlit) sin leerlo. De una lista de archivos devuelve la suma.
+    '''
+    if isinstance(archivo, (list, tuple)):
+        return sum(tamano_archivo(parte) for parte in archivo)
+
+    if isinstance(archivo, str) or hasattr(archivo, '__fspath__'):
+        return os.path.getsize(archivo)
+
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        return len(archivo)
+
+    if hasattr(archivo, 'getbuffer'):
+        return archivo.getbuffer().nbytes
+
+    posicion = archivo.tell()
+    archivo.seek(0, io.SEEK_END)
+    tamano = archivo.tell()
+    archivo.seek(posicion)
+    return tamano
+
+
+def archivo_transportable(archivo):
+    '''
+    Devuelve el archivo en una forma que se puede mandar a otro proceso: los paths quedan como estan (cada proceso lo abre) y los buffers, como los UploadedFile de Streamlit, pasan a bytes.
+    '''
+    if isinstance(archivo, (str, bytes)) or hasattr(archivo, '__fspath__'):
+        return archivo
+
+    if isinstance(archivo, (bytearray, memoryview)):
+        return bytes(archivo)
+
+    if hasattr(archivo, 'getvalue'):
+        return archivo.getvalue()
+
+    binario = _abrir_crudo(archivo)
+    contenido = binario.read()
+    binario.seek(0)
+
+    return contenido
+
+
+def partes_csv_micro(archivo, partes: int, encoding: str, header: int) -> list:
+    '''
+    Corta un CSV de Micro en hasta `partes` rangos de bytes de tamaño parecido, siempre al final de una fila, sin decodificar el texto.
+
+    Cada parte se devuelve como bytes de un CSV completo (sin comprimir): el inicio del archivo (BOM, `header` filas de titulo y encabezado) seguido de su rango de filas, asi se puede leer por separado (por ejemplo en otro proceso) con los mismos lectores que el archivo entero. Se asume, igual que el lector de pyarrow, que los valores no tienen saltos de linea.
+    '''
+    if detectar_compresion(archivo) is not None:
+        # Un extracto comprimido no se puede cortar sin descomprimirlo: conviene leerlo en un solo proceso
+        binario = _abrir_binario(archivo)
+        try:
+            texto = binario.read()
+        finally:
+            binario.close()
+    elif isinstance(archivo, (bytes, bytearray, memoryview)):
+        texto = bytes(archivo)
+    elif isinstance(archivo, str) or hasattr(archivo, '__fspath__'):
+        # Un archivo en disco se mapea en memoria: solo se copian los rangos de cada parte
+        with open(archivo, 'rb') as f:
+            texto = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+    elif hasattr(archivo, 'getvalue'):
+        texto = archivo.getvalue()
+    else:
+        binario = _abrir_crudo(archivo)
+        try:
+            texto = binario.read()
+        finally:
+            if binario is archivo:
+                binario.seek(0)
+            else:
+                binario.close()
+
+    # En UTF-16 el salto de linea ocupa dos bytes y solo cuenta si empieza en una posicion par
+    if encoding.startswith('utf-16'):
+        big_endian = encoding == 'utf-16-be' or (encoding == 'utf-16' and texto[:2] == codecs.BOM_UTF16_BE)
+        salto, paso = (b'\x00\n' if big_endian else b'\n\x00'), 2
+    else:
+        salto, paso = b'\n', 1
+
+    def fin_de_fila(desde: int) -> int:
+        posicion = texto.find(salto, desde)
+        while posicion != -1 and posicion % paso:
+            posicion = texto.find(salto, posicion + 1)
+        return len(texto) if posicion == -1 else posicion + len(salto)
+
+    # El inicio comun termina despues del encabezado
+    inicio = 0
+    for _ in range(header + 1):
+        inicio = fin_de_fila(inicio)
+    prefijo = texto[:inicio]
+
+    tamano = max((len(texto) - inicio) // max(partes, 1), 1)
+    resultado, desde = [], inicio
+    while desde < len(texto):
+        hasta = fin_de_fila(desde + tamano) if desde + tamano < len(texto) else len(texto)
+        resultado.append(prefijo + texto[desde:hasta])
+        desde = hasta
+
+    if isinstance(texto, mmap.mmap):
+        texto.close()
+
+    return resultado or [prefijo]
+
+
+def _leer_inicio(archivo, n: int = 8) -> bytes:
+    '''
+    Devuelve los primeros `n` bytes del contenido de un path, bytes o buffer sin mover su posicion. De un extracto comprimido se devuelven los primeros bytes ya descomprimidos.
+    '''
+    if detectar_compresion(archivo) is None:
+        return _leer_crudo(archivo, n)
+
+    binario = _abrir_binario(archivo)
+    try:
+        return binario.read(n)
+    finally:
+        binario.close()
+        if hasattr(archivo, 'seek'):
+            archivo.seek(0)
+
+
+def hash_contenido(archivo) -> str:
+    '''
+    Calcula el SHA-256 del contenido de un path, bytes o buffer leyendolo de a bloques, sin mover la posicion del buffer. De una lista de archivos (un insumo en varias partes) se combinan los hashes de cada uno, en orden.
+
+    El hash de un path se recuerda mientras el archivo no cambie de tamaño ni de fecha de modificacion, asi los extractos de la carpeta compartida se leen para hashearlos una sola vez.
+    '''
+    sha = hashlib.sha256()
+    if isinstance(archivo, (list, tuple)):
+        for parte in archivo:
+            sha.update(hash_contenido(parte).encode())
+        return sha.hexdigest()
+
+    if isinstance(archivo, str) or hasattr(archivo, '__fspath__'):
+        estado = os.stat(archivo)
+        clave = (os.path.abspath(archivo), estado.st_size, estado.st_mtime_ns)
+        with _lock_hashes:
+            if clave in _cache_hashes:
+                _cache_hashes.move_to_end(clave)
+                return _cache_hashes[clave]
+
+        # El archivo se lee fuera del lock para no frenar a otros hilos; si dos lo hashean a la vez ambos guardan el mismo valor
+        with open(archivo, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+
+        with _lock_hashes:
+            _cache_hashes[clave] = digest
+            while len(_cache_hashes) > MAXIMO_CACHE_HASHES:
+                _cache_hashes.popitem(last=False)
+        return digest
+
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        sha.update(archivo)
+        return sha.hexdigest()
+
+    if hasattr(archivo, 'getbuffer'):
+        sha.update(archivo.getbuffer())
+        return sha.hexdigest()
+
+    binario = _abrir_crudo(archivo)
+    try:
+        for bloque in iter(lambda: binario.read(TAMANO_BLOQUE), b''):
+            sha.update(bloque)
+    finally:
+        if binario is archivo:
+            binario.seek(0)
+        else:
+            binario.close()
+
+    return sha.hexdigest()
+
+
+def formato_columnar(archivo):
+    '''
+    Detecta por sus primeros bytes si el archivo es Parquet o Arrow IPC (file o stream). Devuelve 'parquet', 'arrow' o None.
+    '''
+    inicio = _leer_inicio(archivo)
+    if inicio.startswith(FIRMA_PARQUET):
+        return 'parquet'
+    if inicio.startswith(FIRMA_ARROW) or inicio.startswith(FIRMA_ARROW_STREAM):
+        return 'arrow'
+    return None
+
+
+def _fuente_arrow(archivo):
+    '''
+    Expone el archivo como fuente de pyarrow sin copiar los bytes: memory map para paths y la memoria del buffer para los archivos subidos.
+
+    Un Parquet o Arrow comprimido en un zip, gzip o zstd se descomprime entero en memoria, porque sus lectores necesitan saltar a cualquier posicion del archivo.
+    '''
+    if detectar_compresion(archivo) is not None:
+        binario = _abrir_binario(archivo)
+        try:
+            return pa.BufferReader(binario.read())
+        finally:
+            binario.close()
+
+    return _fuente_cruda(archivo)
+
+
+def _fuente_cruda(archivo):
+    # Fuente de pyarrow sobre los bytes tal cual estan guardados
+    if isinstance(archivo, str) or hasattr(archivo, '__fspath__'):
+        return pa.memory_map(str(archivo))
+
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        return pa.BufferReader(pa.py_buffer(archivo))
+
+    if hasattr(archivo, 'getbuffer'):
+        return pa.BufferReader(pa.py_buffer(archivo.getbuffer()))
+
+    archivo.seek(0)
+    return pa.BufferReader(archivo.read())
+
+
+def _abrir_ipc(fuente):
+    try:
+        return pa.ipc.open_file(fuente)
+    except pa.ArrowInvalid:
+        fuente.seek(0)
+        return pa.ipc.open_stream(fuente)
+
+
+def columnas_columnar(archivo) -> list:
+    '''
+    Devuelve los nombres de columnas de un Parquet o Arrow IPC leyendo solo su esquema.
+    '''
+    fuente = _fuente_arrow(archivo)
+    if formato_columnar(archivo) == 'parquet':
+        return pq.read_schema(fuente).names
+    return _abrir_ipc(fuente).schema.names
+
+
+def leer_columnar(archivo, columnas=None) -> pd.DataFrame:
+    '''
+    Lee un Parquet o Arrow IPC directo a pandas, proyectando solo `columnas`.
+
+    No hay parseo ni transcodificacion: los tipos (numeros ya convertidos, dictionary encoding de las dimensiones) vienen en el archivo.
+    '''
+    return leer_columnar_arrow(archivo, columnas).to_pandas()
+
+
+def leer_columnar_arrow(archivo, columnas=None) -> pa.Table:
+    '''
+    Lee un Parquet o Arrow IPC a una tabla de pyarrow, proyectando solo `columnas`.
+    '''
+    formato = formato_columnar(archivo)
+    fuente = _fuente_arrow(archivo)
+
+    if formato == 'parquet':
+        tabla = pq.read_table(fuente, columns=columnas)
+    elif formato == 'arrow':
+        tabla = _abrir_ipc(fuente).read_all()
+        if columnas is not None:
+            tabla = tabla.select(columnas)
+    else:
+        raise ValueError('El archivo no es Parquet ni Arrow IPC')
+
+    logger.debug(f'Archivo {formato} leido con pyarrow: {tabla.num_rows} filas, {tabla.num_columns} columnas')
+
+    return tabla
+
+
+def preparar_para_arrow(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Deja un DataFrame listo para guardarse como Parquet/Arrow.
+
+    Las columnas de texto que mezclan tipos (en el padron, fechas o numeros con "-" o "SD") no se pueden guardar como estan. Esas columnas se pasan a texto respetando los nulos, y las fechas se escriben como %m/%d/%Y, el formato con el que las parsean los pipelines.
+    '''
+    df = df.copy(deep=False)
+    for columna in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[columna], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[columna] = df[columna].map(lambda v: v if pd.isna(v) else v.strftime('%m/%d/%Y') if hasattr(v, 'strftime') else str(v))
+
+    return df
+
+
+def _detectar_encoding(inicio: bytes) -> str:
+    '''
+    Detecta el encoding de un texto por su BOM. Sin BOM, los bytes nulos alternados delatan UTF-16 y si no decodifica como UTF-8 se asume cp1252 (Excel en Windows).
+    '''
+    for bom, encoding in BOMS:
+        if inicio.startswith(bom):
+            return encoding
+
+    pares, impares = inicio[0::2], inicio[1::2]
+    if pares and impares.count(0) > len(impares) // 3 and pares.count(0) == 0:
+        return 'utf-16-le'
+    if impares and pares.count(0) > len(pares) // 3 and impares.count(0) == 0:
+        return 'utf-16-be'
+
+    try:
+        inicio.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Un caracter multibyte cortado al final de la muestra no cuenta como error
+        if e.start < len(inicio) - 3:
+            return 'cp1252'
+
+    return 'utf-8'
+
+
+def _detectar_separador(lineas: list) -> str:
+    '''
+    Elige el separador que parte la mayor cantidad de filas en la misma cantidad de columnas (respetando las comillas).
+    '''
+    mejor, mejor_puntaje = SEPARADORES[0], (0, 0)
+    for sep in SEPARADORES:
+        anchos = [len(fila) for fila in csv.reader(lineas, delimiter=sep)]
+        ancho, filas = collections.Counter(anchos).most_common(1)[0] if anchos else (1, 0)
+        puntaje = (filas, ancho) if ancho > 1 else (0, 0)
+        if puntaje > mejor_puntaje:
+            mejor, mejor_puntaje = sep, puntaje
+
+    return mejor
+
+
+def _detectar_encabezado(filas: list, columnas=None):
+    '''
+    Devuelve la posicion de la fila de encabezado: la primera que tiene todas las `columnas` esperadas o, sin columnas, la primera con el ancho mas frecuente del archivo y mas de una celda con valor (las filas de titulo de Micro tienen una sola celda).
+
+    Si se pasan `columnas` y ninguna fila las tiene devuelve None.
+    '''
+    if columnas:
+        # pandas agrega ".1", ".2" a los encabezados repetidos (ENE.2), en el archivo figuran sin sufijo
+        esperadas = {re.sub(r'\.\d+$', '', str(c)) for c in columnas}
+        for i, fila in enumerate(filas):
+            if esperadas <= {str(c) for c in fila if c is not None}:
+                return i
+        return None
+
+    # Se compara la cantidad de celdas y no las que tienen valor: un encabezado con celdas vacias sigue teniendo el ancho de los datos
+    anchos = [len(fila) for fila in filas]
+    ancho = collections.Counter(a for a in anchos if a > 1).most_common(1)
+    if not ancho:
+        return 0
+    return next((i for i, fila in enumerate(filas) if len(fila) == ancho[0][0] and sum(c is not None and str(c) != '' for c in fila) > 1), 0)
+
+
+def _detectar_decimal(filas: list) -> str:
+    '''
+    Decide la convencion decimal mirando los valores numericos de la muestra. Solo cuentan los valores que no son ambiguos ("1.234" puede ser mil o uno coma dos).
+    '''
+    votos = collections.Counter()
+    for fila in filas:
+        for valor in fila:
+            valor = valor.strip()
+            if re.fullmatch(PATRON_NUMERO_AR, valor) and (re.search(r',\d+$', valor) or re.search(r'\.\d{3}\.', valor)):
+                votos[','] += 1
+            elif re.fullmatch(PATRON_NUMERO_US, valor) and (re.search(r'\.(\d{1,2}|\d{4,})$', valor) or re.search(r',\d{3},', valor)):
+                votos['.'] += 1
+
+    return '.' if votos['.'] > votos[','] else ','
+
+
+def _detectar_contenedor(archivo, inicio: bytes) -> str:
+    if inicio.startswith(FIRMA_PARQUET):
+        return 'parquet'
+    if inicio.startswith(FIRMA_ARROW) or inicio.startswith(FIRMA_ARROW_STREAM):
+        return 'arrow'
+    if inicio.startswith(FIRMA_ZIP):
+        # Un zip dentro de un extracto comprimido no se abre (no se puede recorrer sin descomprimirlo entero)
+        if detectar_compresion(archivo) is not None:
+            return 'zip'
+        # Un XLSX es un zip con el manifiesto de Office adentro
+        binario = _abrir_binario(archivo)
+        try:
+            with zipfile.ZipFile(binario) as z:
+                return 'xlsx' if '[Content_Types].xml' in z.namelist() else 'zip'
+        finally:
+            if binario is not archivo:
+                binario.close()
+            else:
+                binario.seek(0)
+    return 'csv'
+
+
+def _abrir_libro(binario):
+    import openpyxl
+
+    # Mismas opciones que usa pandas: sin formulas (solo valores cacheados) ni vinculos externos
+    return openpyxl.load_workbook(binario, read_only=True, data_only=True, keep_links=False)
+
+
+def _valor_excel(valor):
+    '''
+    Normaliza un valor de celda igual que el lector de pandas: vacio como '', errores de Excel como nulo y numeros enteros guardados como float como int.
+    '''
+    if valor is None:
+        return ''
+    if isinstance(valor, float):
+        return int(valor) if valor.is_integer() else valor
+    if isinstance(valor, str) and valor in ERRORES_EXCEL:
+        return float('nan')
+    return valor
+
+
+def leer_excel(archivo, hoja=0, header: int = 0, usecols=None) -> pd.DataFrame:
+    '''
+    Lee una hoja de Excel recorriendo las filas en modo read-only y sin estilos, en vez de construir el modelo de celdas completo.
+
+    Se lee primero la fila `header` para ubicar las columnas de `usecols` y despues solo se recorren las filas de datos hasta la ultima columna necesaria, sin convertir las celdas de las columnas que no se usan. Los nombres de columnas repetidas o vacias y el tipado de cada columna quedan igual que con pd.read_excel.
+
+    Como en pandas, las filas vacias intermedias quedan como filas nulas y se descartan las del final.
+    '''
+    from pandas.io.parsers import TextParser
+
+    binario = _abrir_binario(archivo)
+    libro = _abrir_libro(binario)
+    try:
+        hoja = libro.worksheets[hoja] if isinstance(hoja, int) else libro[hoja]
+        # La dimension que declara el archivo puede estar mal (pasa con los exports), asi que se recorre hasta la ultima fila real
+        hoja.reset_dimensions()
+
+        encabezado = [_valor_excel(v) for v in next(hoja.iter_rows(min_row=header + 1, max_row=header + 1, values_only=True), ())]
+        while encabezado and encabezado[-1] == '':
+            encabezado.pop()
+        # Paso el encabezado por el mismo parser de pandas para obtener los nombres finales ("Unnamed: 3", "ENE.2")
+        nombres = list(TextParser([encabezado], header=0).read().columns) if encabezado else []
+
+        if usecols is None:
+            indices = list(range(len(nombres)))
+        else:
+            faltantes = [c for c in usecols if c not in nombres]
+            if faltantes:
+                raise ValueError(f'Columnas no encontradas en la hoja "{hoja.title}": {faltantes}')
+            indices = sorted(nombres.index(c) for c in usecols)
+
+        datos = []
+        if indices:
+            for fila in hoja.iter_rows(min_row=header + 2, max_col=indices[-1] + 1, values_only=True):
+                datos.append([_valor_excel(fila[i]) if i < len(fila) else '' for i in indices])
+            while datos and all(v == '' for v in datos[-1]):
+                datos.pop()
+    finally:
+        libro.close()
+        if binario is archivo:
+            binario.seek(0)
+        else:
+            binario.close()
+
+    columnas = [nombres[i] for i in indices]
+    df = TextParser(datos, header=None, names=columnas).read() if datos else pd.DataFrame(columns=columnas)
+
+    logger.debug(f'Excel leido en modo streaming: hoja "{hoja.title}", {df.shape}')
+
+    return df
+
+
+def fila_encabezado_excel(archivo, columnas=None, hoja=0):
+    '''
+    Busca la fila de encabezado de un Excel leyendo solo las primeras filas de la hoja en modo read-only, asi el padron se sigue leyendo aunque cambie la cantidad de filas de titulo.
+
+    Devuelve None si se pasan `columnas` y no aparecen en las primeras filas.
+    '''
+    binario = _abrir_binario(archivo)
+    libro = _abrir_libro(binario)
+    try:
+        hoja = libro.worksheets[hoja] if isinstance(hoja, int) else libro[hoja]
+        filas = list(hoja.iter_rows(max_row=FILAS_MUESTRA, values_only=True))
+    finally:
+        libro.close()
+        if binario is archivo:
+            binario.seek(0)
+        else:
+            binario.close()
+
+    return _detectar_encabezado(filas, columnas)
+
+
+def detectar_formato(archivo, columnas=None) -> dict:
+    '''
+    Detecta como leer un archivo de entrada mirando solo sus primeros KB.
+
+    Devuelve un dict con:
+        - contenedor: 'csv', 'xlsx', 'parquet', 'arrow' o 'zip', segun el contenido ya descomprimido
+        - compresion: 'gzip', 'zstd' o 'zip' si el archivo es un extracto comprimido (ver detectar_compresion), si no None
+        - encoding: BOM/encoding del texto (solo CSV)
+        - header: cantidad de filas antes del encabezado (CSV y XLSX). Si se pasan `columnas`, es la primera fila que las contiene a todas (None en un XLSX que no las tiene)
+        - sep / decimal: separador de columnas y separador decimal (solo CSV)
+
+    Asi cada lector elige su camino de una vez, sin parsear todo el archivo con la configuracion equivocada y reintentar.
+    '''
+    inicio = _leer_inicio(archivo, TAMANO_MUESTRA)
+    formato = {'contenedor': _detectar_contenedor(archivo, inicio), 'compresion': detectar_compresion(archivo), 'encoding': None, 'header': 0, 'sep': None, 'decimal': None}
+
+    if formato['contenedor'] == 'xlsx':
+        formato['header'] = fila_encabezado_excel(archivo, columnas)
+
+    if formato['contenedor'] != 'csv':
+        logger.debug(f'Formato detectado: {formato}')
+        return formato
+
+    encoding = _detectar_encoding(inicio)
+    texto = codecs.getincrementaldecoder(encoding)(errors='replace').decode(inicio)
+    lineas = texto.splitlines()
+    # La ultima linea de la muestra puede estar cortada
+    if len(inicio) == TAMANO_MUESTRA and len(lineas) > 1:
+        lineas = lineas[:-1]
+    lineas = lineas[:FILAS_MUESTRA]
+
+    sep = _detectar_separador(lineas)
+    filas = list(csv.reader(lineas, delimiter=sep))
+    header = _detectar_encabezado(filas, columnas)
+    if header is None:
+        # Sin las columnas esperadas, el lector va a informar cuales faltan
+        header = _detectar_encabezado(filas)
+
+    formato.update(encoding=encoding, header=header, sep=sep, decimal=_detectar_decimal(filas[header + 1:]))
+    logger.debug(f'Formato detectado: {formato}')
+
+    return formato
@@ -0,0 +1,155 @@
+import functools
+import logging
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.esquemas import MESES_PADRON, leer_insumo_arrow
+from utils.padron import leer_padron, version_padron, matriz_comparable
+from utils.dimensiones import ordenar_categorias
+from utils.hechos import ENVASES
+
+logger = logging.getLogger(__name__)
+
+# Dimensiones de la tabla de hechos, todas como diccionario de textos salvo el año
+DIMENSIONES_HECHOS = ['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia']
+TIPO_DIMENSION = pa.dictionary(pa.int32(), pa.string())
+
+
+def _como_dimension(columna) -> pa.ChunkedArray:
+    '''
+    Lleva una columna al tipo de dimension comun (diccionario int32 -> texto), sin decodificar las que ya vienen como diccionario.
+    '''
+    if pa.types.is_dictionary(columna.type):
+        return columna.cast(TIPO_DIMENSION)
+
+    return pc.dictionary_encode(columna.cast(pa.string())).cast(TIPO_DIMENSION)
+
+
+def _por_diccionario(columna: pa.ChunkedArray, funcion) -> pa.ChunkedArray:
+    '''
+    Aplica `funcion` (de un array de textos a un array) una sola vez por valor distinto de una dimension y la expande a las filas con los indices del diccionario, como derivar_por_unicos.
+    '''
+    chunks = [funcion(chunk.dictionary).take(chunk.indices) for chunk in _como_dimension(columna).chunks]
+    if not chunks:
+        return pa.chunked_array([funcion(pa.array([], pa.string()))])
+
+    return pa.chunked_array(chunks)
+
+
+def _constante(valor: str, filas: int) -> pa.DictionaryArray:
+    return pa.DictionaryArray.from_arrays(pa.array(np.zeros(filas, dtype='int32')), pa.array([valor]))
+
+
+def _numero_operacional(textos: pa.Array) -> pa.Array:
+    # "123 - NOMBRE" -> 123.0, nulo si no empieza con un numero
+    numero = pc.utf8_trim_whitespace(pc.list_element(pc.split_pattern(textos, '-'), 0))
+    validos = pc.match_substring_regex(numero, r'^[+-]?\d+(\.\d+)?$')
+
+    return pc.cast(pc.if_else(validos, numero, pa.scalar(None, pa.string())), pa.float64())
+
+
+def hechos_arrow(ventas, debitos) -> pa.Table:
+    '''
+    Arma en Arrow la misma tabla de hechos que construir_hechos (VCT, VOL sin envases y DEB) pero sin el cruce con el padron: las dimensiones quedan como diccionario compartido y los textos no se copian por fila.
+    '''
+    tabla_ventas = leer_insumo_arrow(ventas, 'ventas', 'progresiones')
+    tabla_debitos = leer_insumo_arrow(debitos, 'debitos', 'progresiones')
+
+    def parte(tabla: pa.Table, medida: str, categoria: str) -> pa.Table:
+        tabla = tabla.filter(pc.is_valid(tabla[medida]))
+        columnas = {'año': tabla['año'].cast(pa.int64())}
+        for dimension in DIMENSIONES_HECHOS[1:]:
+            columnas[dimension] = _como_dimension(tabla[dimension]) if dimension in tabla.column_names else pa.nulls(tabla.num_rows, TIPO_DIMENSION)
+        columnas['categoria'] = _constante(categoria, tabla.num_rows)
+        columnas['valores'] = tabla[medida].cast(pa.float64())
+
+        return pa.table(columnas)
+
+    # El volumen no cuenta los envases
+    envases = pc.fill_null(_por_diccionario(tabla_ventas['grupo_de_familia'], lambda textos: pc.match_substring(textos, ENVASES)), False)
+
+    hechos = pa.concat_tables([
+        parte(tabla_ventas, 'venta', 'VCT'),
+        parte(tabla_ventas.filter(pc.invert(envases)), 'volumen', 'VOL'),
+        parte(tabla_debitos, 'valores', 'DEB'),
+    ])
+
+    # Un mismo diccionario por columna para poder agrupar
+    return hechos.unify_dictionaries()
+
+
+def _provincias(padron, tiendas: pd.Index) -> pa.Array:
+    '''
+    Provincia de cada tienda de `tiendas` (en el mismo orden) segun el padron.
+    '''
+    df = leer_padron(padron, 'progresiones')
+    df['numero_operacional'] = pd.to_numeric(df['numero_operacional'], errors='coerce')
+    df = df.dropna(subset=['numero_operacional'])
+    provincias = df.set_index(df['numero_operacional'].astype('int64'))['provincia'].astype(object).reindex(tiendas)
+
+    return pa.array(provincias, type=pa.string(), from_pandas=True)
+
+
+def filtrar_sc_arrow(hechos: pa.Table, padron, mes_comparable: str = None, sc_mensual: bool = False) -> pa.Table:
+    '''
+    Filtra la tabla de hechos a las filas de Superficie Comparable con la matriz tienda x mes del padron (la de `mes_comparable`, o con `sc_mensual` la del mes de cada fila) y le agrega la provincia de cada tienda.
+    '''
+    tiendas, comparables = matriz_comparable(padron)
+    meses = list(MESES_PADRON.values())
+
+    numeros = _por_diccionario(hechos['punto_operacional'], _numero_operacional)
+    fila = tiendas.get_indexer(numeros.to_numpy())
+
+    if sc_mensual:
+        posiciones = _por_diccionario(hechos['mes'], lambda textos: pc.index_in(pc.utf8_lower(pc.utf8_slice_codeunits(textos, 0, 3)), value_set=pa.array(meses)))
+        columna = pc.fill_null(posiciones, -1).to_numpy()
+    else:
+        columna = np.full(len(fila), meses.index(mes_comparable[0:3].lower()))
+
+    validas = (fila >= 0) & (columna >= 0)
+    comparable = np.zeros(len(fila), dtype=bool)
+    comparable[validas] = comparables[fila[validas], columna[validas]]
+
+    hechos_sc = hechos.filter(pa.array(comparable))
+    provincia = pc.dictionary_encode(_provincias(padron, tiendas).take(pa.array(fila[comparable]))).cast(TIPO_DIMENSION)
+
+    return hechos_sc.append_column('provincia', provincia)
+
+
+def _sumar(tabla: pa.Table, columnas: list) -> pa.Table:
+    agrupado = tabla.group_by(columnas, use_threads=True).aggregate([('valores', 'sum')])
+
+    return agrupado.rename_columns(['valores' if c == 'valores_sum' else c for c in agrupado.column_names]).select([*columnas, 'valores'])
+
+
+def niveles_arrow(ventas, debitos, padron, niveles: dict, mes_comparable: str = None, sc_mensual: bool = False) -> dict:
+    '''
+    Calcula con pyarrow.compute los mismos niveles que agregar_niveles(filtrar_sc(construir_hechos(...)), niveles).
+
+    Lectura, filtros y group_by trabajan sobre tablas de Arrow con las dimensiones como diccionario, sin columnas object ni copias intermedias en pandas. Solo los niveles ya agregados (tablas chicas) se pasan a pandas. Con `sc_mensual` cada fila usa la comparabilidad de su propio mes, si no la de `mes_comparable`.
+    '''
+    version = version_padron(padron)
+    hechos_sc = filtrar_sc_arrow(hechos_arrow(ventas, debitos), version, mes_comparable, sc_mensual)
+
+    # Igual que agregar_niveles: agrupo una vez por el grano mas fino y cada nivel sale del nivel ya calculado mas chico que lo contiene
+    grano = list(dict.fromkeys(c for columnas in niveles.values() for c in columnas))
+    calculados = {tuple(grano): _sumar(hechos_sc, grano)}
+    logger.debug(f'Grano base de {len(niveles)} niveles en Arrow {grano}: {hechos_sc.num_rows} -> {calculados[tuple(grano)].num_rows} filas')
+
+    resultado = {}
+    for nombre, columnas in sorted(niveles.items(), key=lambda nivel: len(nivel[1]), reverse=True):
+        clave = tuple(columnas)
+        if clave not in calculados:
+            origen = min((agrupado for columnas_origen, agrupado in calculados.items() if set(columnas) <= set(columnas_origen)), key=lambda agrupado: agrupado.num_rows)
+            calculados[clave] = _sumar(origen, list(columnas))
+
+        # Los nulos en las columnas del nivel se descartan recien en el resultado, que es lo unico que pasa a pandas
+        tabla = calculados[clave]
+        validas = functools.reduce(pc.and_, [pc.is_valid(tabla[c]) for c in columnas])
+        df = ordenar_categorias(tabla.filter(validas).to_pandas())
+        resultado[nombre] = df.sort_values(list(columnas)).reset_index(drop=True)
+
+    return {nombre: resultado[nombre] for nombre in niveles}
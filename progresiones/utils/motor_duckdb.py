@@ -0,0 +1,148 @@
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.lectura import formato_columnar, detectar_compresion
+from utils.esquemas import ESQUEMAS, MESES_PADRON, leer_insumo
+from utils.padron import version_padron
+from utils.hechos import ENVASES
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+# Carpeta donde DuckDB baja a disco las agregaciones que no entran en memoria
+DIRECTORIO_TEMPORAL = Path('data') / 'duckdb'
+
+def duckdb_disponible() -> bool:
+    return duckdb is not None
+
+
+def _columna(nombre: str) -> str:
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def _conectar():
+    if duckdb is None:
+        raise ImportError('El motor DuckDB no esta instalado (pip install duckdb)')
+
+    DIRECTORIO_TEMPORAL.mkdir(parents=True, exist_ok=True)
+    return duckdb.connect(config={'threads': os.cpu_count() or 1, 'temp_directory': str(DIRECTORIO_TEMPORAL)})
+
+
+def _consulta_insumo(con, archivo, insumo: str, pipeline: str, nombre: str) -> str:
+    '''
+    Devuelve el SELECT que expone un insumo con las columnas del pipeline ya renombradas y las dimensiones como texto.
+
+    Los Parquet en disco con las medidas ya numericas se leen directo desde DuckDB (con proyeccion de columnas, sin pasar por pandas). El resto (CSV de Micro, Excel o archivos subidos) se lee con leer_insumo y se registra en la conexion.
+    '''
+    esquema = ESQUEMAS[insumo]
+    esquema_pipeline = esquema['pipelines'][pipeline]
+    renombrar = {**esquema['renombrar'], **esquema_pipeline.get('renombrar', {})}
+    numericas = set(esquema.get('numericas', {})) | set(esquema.get('tipos', {}))
+
+    if isinstance(archivo, (str, Path)) and formato_columnar(archivo) == 'parquet' and detectar_compresion(archivo) is None:
+        tipos = {fila[0]: fila[1] for fila in con.execute('DESCRIBE SELECT * FROM read_parquet(?)', [str(archivo)]).fetchall()}
+        origen = {}
+        for columna in esquema_pipeline['columnas']:
+            for candidata in (columna, esquema['renombrar'].get(columna)):
+                if candidata in tipos:
+                    origen[columna] = candidata
+                    break
+
+        directo = len(origen) == len(esquema_pipeline['columnas']) and all(
+            any(t in tipos[origen[c]] for t in ('INT', 'DOUBLE', 'FLOAT', 'DECIMAL')) for c in numericas if c in origen
+        )
+        if directo:
+            ruta = str(archivo).replace("'", "''")
+            columnas = ', '.join(
+                f'{_columna(origen[c])} AS {_columna(renombrar.get(c, c))}' if c in numericas else f'CAST({_columna(origen[c])} AS VARCHAR) AS {_columna(renombrar.get(c, c))}'
+                for c in esquema_pipeline['columnas']
+            )
+            logger.debug(f'Insumo "{insumo}" leido directo desde Parquet con DuckDB')
+            return f"SELECT {columnas} FROM read_parquet('{ruta}')"
+
+    df = leer_insumo(archivo, insumo, pipeline)
+    con.register(nombre, df)
+    columnas = ', '.join(
+        _columna(c) if pd.api.types.is_numeric_dtype(df[c]) else f'CAST({_columna(c)} AS VARCHAR) AS {_columna(c)}'
+        for c in df.columns
+    )
+
+    return f'SELECT {columnas} FROM {nombre}'
+
+
+def niveles_duckdb(ventas, debitos, padron, niveles: dict, mes_comparable: str = None, sc_mensual: bool = False) -> dict:
+    '''
+    Calcula con DuckDB los mismos niveles que agregar_niveles(filtrar_sc(construir_hechos(...)), niveles) sin armar la tabla de hechos en pandas.
+
+    El armado de los hechos (VCT, VOL sin envases y DEB), el cruce con el padron, el filtro de Superficie Comparable y todos los niveles (GROUPING SETS) se resuelven en una sola consulta SQL, que usa todos los nucleos y baja a disco lo que no entra en memoria. Con `sc_mensual` cada fila usa la comparabilidad de su propio mes (como filtrar_sc_mensual), si no la de `mes_comparable`.
+
+    Devuelve un dict nombre -> df con las columnas del nivel y 'valores', igual que agregar_niveles.
+    '''
+    meses = list(MESES_PADRON.values())
+    grano = list(dict.fromkeys(c for columnas in niveles.values() for c in columnas))
+
+    con = _conectar()
+    try:
+        consulta_ventas = _consulta_insumo(con, ventas, 'ventas', 'progresiones', 'insumo_ventas')
+        consulta_debitos = _consulta_insumo(con, debitos, 'debitos', 'progresiones', 'insumo_debitos')
+        ruta_padron = str(version_padron(padron)).replace("'", "''")
+
+        if sc_mensual:
+            casos = ' '.join(f"WHEN '{mes}' THEN p.{_columna(mes)}" for mes in meses)
+            condicion_sc = f"(CASE lower(substr(h.mes, 1, 3)) {casos} END) = 'SC'"
+        else:
+            condicion_sc = f"p.{_columna(mes_comparable[0:3].lower())} = 'SC'"
+
+        columnas_padron = ', '.join(f'CAST({_columna(original)} AS VARCHAR) AS {_columna(mes)}' for original, mes in MESES_PADRON.items())
+        conjuntos = ', '.join('(' + ', '.join(_columna(c) for c in columnas) + ')' for columnas in dict.fromkeys(tuple(c) for c in niveles.values()))
+
+        sql = f'''
+            WITH ventas AS ({consulta_ventas}),
+            debitos AS ({consulta_debitos}),
+            padron AS (
+                SELECT TRY_CAST("GSX" AS DOUBLE) AS numero_operacional, "NOMBRE" AS nombre, "Fecha apertura" AS fecha_apertura, CAST("PROVINCIA" AS VARCHAR) AS provincia, {columnas_padron}
+                FROM read_parquet('{ruta_padron}', file_row_number = true)
+                WHERE TRY_CAST("GSX" AS DOUBLE) IS NOT NULL
+                -- Como leer_padron: de una tienda repetida se queda la primera fila
+                QUALIFY row_number() OVER (PARTITION BY TRY_CAST("GSX" AS DOUBLE) ORDER BY file_row_number) = 1
+            ),
+            hechos AS (
+                SELECT "año", mes, direccion, punto_operacional, sector, seccion, grupo_de_familia, 'VCT' AS categoria, CAST(venta AS DOUBLE) AS valores FROM ventas WHERE venta IS NOT NULL
+                UNION ALL
+                SELECT "año", mes, direccion, punto_operacional, sector, seccion, grupo_de_familia, 'VOL', CAST(volumen AS DOUBLE) FROM ventas WHERE volumen IS NOT NULL AND NOT coalesce(contains(grupo_de_familia, '{ENVASES}'), false)
+                UNION ALL
+                SELECT "año", mes, direccion, punto_operacional, NULL, NULL, NULL, 'DEB', CAST(valores AS DOUBLE) FROM debitos WHERE valores IS NOT NULL
+            ),
+            hechos_sc AS (
+                SELECT h.*, p.provincia
+                FROM hechos h
+                JOIN padron p ON p.numero_operacional = TRY_CAST(trim(split_part(h.punto_operacional, '-', 1)) AS DOUBLE)
+                WHERE p.nombre IS NOT NULL AND p.fecha_apertura IS NOT NULL AND {condicion_sc}
+            )
+            SELECT GROUPING({', '.join(_columna(c) for c in grano)}) AS nivel, {', '.join(_columna(c) for c in grano)}, SUM(valores) AS valores
+            FROM hechos_sc
+            GROUP BY GROUPING SETS ({conjuntos})
+        '''
+
+        agrupado = con.execute(sql).fetch_arrow_table().to_pandas()
+
+    finally:
+        con.close()
+
+    logger.debug(f'Niveles calculados con DuckDB: {len(niveles)} niveles, {len(agrupado)} filas')
+
+    # GROUPING(...) marca con un bit en 1 cada columna del grano que no forma parte del conjunto, la primera columna es el bit mas alto
+    resultado = {}
+    for nombre, columnas in niveles.items():
+        nivel = sum(1 << (len(grano) - 1 - posicion) for posicion, columna in enumerate(grano) if columna not in columnas)
+        df = agrupado.loc[agrupado['nivel'] == nivel, [*columnas, 'valores']]
+        resultado[nombre] = df.dropna(subset=list(columnas)).sort_values(list(columnas)).reset_index(drop=True)
+
+    return resultado
@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.lectura import leer_excel, leer_columnar, formato_columnar, fila_encabezado_excel, hash_contenido, preparar_para_arrow
+from utils.esquemas import ESQUEMAS, MESES_PADRON, leer_insumo
+
+logger = logging.getLogger(__name__)
+
+# Carpeta donde quedan las versiones del padron ya parseadas (una por contenido distinto) y su registro
+DIRECTORIO_PADRONES = Path('data') / 'padrones'
+REGISTRO_PADRONES = DIRECTORIO_PADRONES / 'versiones.json'
+
+# Archivo que marca que alguien esta actualizando el registro, y cuantos segundos se espera antes de darlo por abandonado
+BLOQUEO_REGISTRO = DIRECTORIO_PADRONES / 'versiones.lock'
+ESPERA_REGISTRO = 30
+
+_lock_registro = threading.Lock()
+
+# Matrices tienda x mes de Superficie Comparable ya armadas, por version del padron
+_cache_matrices = {}
+
+# Columnas que tiene que tener un padron para servir a todos los pipelines
+COLUMNAS_PADRON = list(dict.fromkeys(c for pipeline in ESQUEMAS['padron']['pipelines'].values() for c in pipeline['columnas']))
+
+
+def versiones_padron() -> list:
+    '''
+    Devuelve el registro de versiones del padron, de la cargada primero a la ultima. Cada version es un dict con hash, archivo, cargado, filas y advertencias.
+    '''
+    if not REGISTRO_PADRONES.exists():
+        return []
+
+    with open(REGISTRO_PADRONES, encoding='utf-8') as f:
+        versiones = json.load(f)
+
+    return sorted(versiones, key=lambda v: v['cargado'])
+
+
+def _guardar_registro(versiones: list):
+    # Escribo a un temporal y lo renombro para que otra sesion nunca lea un registro a medio escribir
+    temporal = REGISTRO_PADRONES.with_suffix('.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(versiones, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, REGISTRO_PADRONES)
+
+
+@contextmanager
+def _registro_bloqueado():
+    '''
+    Bloquea el registro de versiones mientras se lee, modifica y guarda, asi dos padrones cargados a la vez no se pisan la entrada. El lock cubre los hilos de este servidor y el archivo BLOQUEO_REGISTRO a otros procesos que usen la misma carpeta.
+    '''
+    with _lock_registro:
+        DIRECTORIO_PADRONES.mkdir(parents=True, exist_ok=True)
+        inicio = time.monotonic()
+        while True:
+            try:
+                os.close(os.open(BLOQUEO_REGISTRO, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                # Si quien lo tomo se murio sin soltarlo, pasado ESPERA_REGISTRO se libera
+                try:
+                    abandonado = time.time() - BLOQUEO_REGISTRO.stat().st_mtime > ESPERA_REGISTRO
+                except FileNotFoundError:
+                    continue
+                if abandonado:
+                    logger.warning(f'Se libera el bloqueo abandonado del registro de padrones ({BLOQUEO_REGISTRO})')
+                    BLOQUEO_REGISTRO.unlink(missing_ok=True)
+                elif time.monotonic() - inicio > ESPERA_REGISTRO:
+                    raise TimeoutError(f'El registro de padrones sigue bloqueado despues de {ESPERA_REGISTRO} s ({BLOQUEO_REGISTRO})')
+                else:
+                    time.sleep(0.05)
+
+        try:
+            yield
+        finally:
+            BLOQUEO_REGISTRO.unlink(missing_ok=True)
+
+
+def ruta_version(hash_padron: str) -> Path:
+    return DIRECTORIO_PADRONES / f'{hash_padron}.parquet'
+
+
+def es_version(padron) -> bool:
+    '''
+    Indica si `padron` es el hash de una version ya guardada, o el Parquet de esa version (en vez de un archivo).
+    '''
+    if isinstance(padron, Path):
+        return padron.parent == DIRECTORIO_PADRONES and es_version(padron.stem)
+
+    return isinstance(padron, str) and re.fullmatch(r'[0-9a-f]{64}', padron) is not None and ruta_version(padron).exists()
+
+
+def validar_padron(df: pd.DataFrame) -> list:
+    '''
+    Valida un padron recien leido. Levanta ValueError si le faltan columnas que usan los pipelines y devuelve la lista de advertencias (tiendas repetidas o marcas de comparabilidad desconocidas) que no impiden usarlo.
+    '''
+    faltantes = [c for c in COLUMNAS_PADRON if c not in df.columns]
+    if faltantes:
+        raise ValueError(f'Al padron le faltan las columnas: {faltantes}')
+
+    advertencias = []
+
+    tiendas = pd.to_numeric(df['GSX'], errors='coerce').dropna()
+    repetidas = sorted(tiendas[tiendas.duplicated()].astype(int).unique().tolist())
+    if repetidas:
+        advertencias.append(f'Tiendas repetidas en el padron: {repetidas}')
+
+    for columna in MESES_PADRON:
+        marcas = set(df[columna].dropna().unique()) - {'SC', 'NC'}
+        if marcas:
+            advertencias.append(f'Valores de comparabilidad desconocidos en {columna}: {sorted(map(str, marcas))}')
+
+    return advertencias
+
+
+def _leer_padron_original(archivo) -> pd.DataFrame:
+    '''
+    Lee la hoja completa del padron tal como viene (Excel o un Parquet/Arrow ya convertido), con los encabezados originales.
+    '''
+    if formato_columnar(archivo):
+        return leer_columnar(archivo)
+
+    # El encabezado se busca por la columna GSX, si no aparece se usa la fila habitual
+    header = fila_encabezado_excel(archivo, ['GSX'])
+    return leer_excel(archivo, header=header if header is not None else ESQUEMAS['padron']['header'])
+
+
+def registrar_padron(archivo, nombre: str = None) -> str:
+    '''
+    Parsea, valida y guarda un padron como version columnar, identificada por el hash de su contenido. Devuelve el hash.
+
+    Si ese mismo contenido ya se habia cargado no se vuelve a leer el Excel, se devuelve la version existente.
+    '''
+    hash_padron = hash_contenido(archivo)
+    if ruta_version(hash_padron).exists():
+        logger.debug(f'Padron {hash_padron[:12]} ya registrado, se reutiliza su version')
+        return hash_padron
+
+    df = _leer_padron_original(archivo)
+    df.columns = [str(c) for c in df.columns]
+
+    # Normalizo una sola vez las marcas de comparabilidad (" sc" -> "SC") en vez de hacerlo en cada pipeline
+    for columna in MESES_PADRON:
+        if columna in df.columns:
+            df[columna] = df[columna].map(lambda v: v.strip().upper() if isinstance(v, str) else v)
+
+    advertencias = validar_padron(df)
+    for advertencia in advertencias:
+        logger.warning(advertencia)
+
+    DIRECTORIO_PADRONES.mkdir(parents=True, exist_ok=True)
+    ruta = ruta_version(hash_padron)
+    temporal = ruta.with_suffix('.tmp')
+    preparar_para_arrow(df).to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+
+    with _registro_bloqueado():
+        versiones = [v for v in versiones_padron() if v['hash'] != hash_padron]
+        versiones.append({
+            'hash': hash_padron,
+            'archivo': nombre or getattr(archivo, 'name', None) or (Path(archivo).name if isinstance(archivo, (str, Path)) else 'padron'),
+            'cargado': datetime.now().isoformat(timespec='seconds'),
+            'filas': len(df),
+            'advertencias': advertencias,
+        })
+        _guardar_registro(versiones)
+
+    logger.info(f'Padron registrado como version {hash_padron[:12]} ({len(df)} filas)')
+
+    return hash_padron
+
+
+def version_padron(padron) -> Path:
+    '''
+    Devuelve el Parquet de la version de `padron`, que puede ser un hash ya registrado o un archivo (que se registra si es nuevo).
+    '''
+    if es_version(padron):
+        return ruta_version(padron.stem if isinstance(padron, Path) else padron)
+
+    return ruta_version(registrar_padron(padron))
+
+
+def leer_padron(padron, pipeline: str) -> pd.DataFrame:
+    '''
+    Lee el padron para un pipeline desde su version guardada, con las columnas y nombres que declara ESQUEMAS.
+
+    Si una tienda (GSX) esta repetida se queda la primera fila, asi el cruce con las ventas no duplica sus valores y todos los motores y reportes usan el mismo padron (validar_padron ya advierte las repetidas al registrarlo).
+    '''
+    df = leer_insumo(version_padron(padron), 'padron', pipeline)
+
+    esquema = ESQUEMAS['padron']
+    columna = esquema['pipelines'][pipeline].get('renombrar', {}).get('GSX', esquema['renombrar']['GSX'])
+    numeros = pd.to_numeric(df[columna], errors='coerce')
+    repetidas = numeros.notna() & numeros.duplicated()
+    if repetidas.any():
+        logger.debug(f'Padron para {pipeline}: {int(repetidas.sum())} filas de tiendas repetidas descartadas')
+        df = df[~repetidas].reset_index(drop=True)
+
+    return df
+
+
+def matriz_comparable(padron) -> tuple:
+    '''
+    Devuelve la matriz de Superficie Comparable tienda x mes de una version del padron como (tiendas, matriz): `tiendas` es un pd.Index con los numeros operacionales y `matriz` un array booleano (tiendas x 12 meses, de ene a dic) que vale True si la tienda es SC en ese mes. Las tiendas sin nombre o fecha de apertura nunca son comparables.
+
+    Se arma una sola vez por version a partir de las columnas ENE.2 ... DIC.2 y queda en memoria, asi cada fila se resuelve con un lookup por (tienda, mes) en vez de un join con el padron por cada mes.
+    '''
+    version = version_padron(padron)
+    if version.stem not in _cache_matrices:
+        df = leer_padron(version, 'progresiones')
+        df['numero_operacional'] = pd.to_numeric(df['numero_operacional'], errors='coerce')
+        # leer_padron ya descarta las tiendas repetidas, igual que para las tablas que cruzan el padron con un merge
+        df = df.dropna(subset=['numero_operacional'])
+
+        meses = list(MESES_PADRON.values())
+        con_datos = df[['nombre', 'fecha_apertura']].notna().all(axis=1).to_numpy()
+        matriz = df[meses].eq('SC').to_numpy() & con_datos[:, np.newaxis]
+
+        _cache_matrices[version.stem] = (pd.Index(df['numero_operacional'].astype('int64')), matriz)
+        logger.debug(f'Matriz de comparabilidad armada para el padron {version.stem[:12]}: {matriz.shape}')
+
+    return _cache_matrices[version.stem]
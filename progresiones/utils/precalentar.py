@@ -0,0 +1,74 @@
+import logging
+import multiprocessing
+import threading
+import time
+
+from utils.extractos import listar_extractos, DIRECTORIO_EXTRACTOS
+from utils.padron import versiones_padron
+
+logger = logging.getLogger(__name__)
+
+# Cada cuantos segundos se revisa la carpeta compartida y el registro de padrones
+INTERVALO_PRECALENTADO = 60
+
+# Subcarpetas de DIRECTORIO_EXTRACTOS de donde se toma el ultimo extracto de cada insumo para precalentar
+INSUMOS_PRECALENTADO = ['ventas', 'debitos']
+
+_hilo = None
+_lock_hilo = threading.Lock()
+
+
+def insumos_vigentes(directorio=None) -> tuple:
+    '''
+    Devuelve los insumos que usaria hoy un reporte y su huella para detectar cambios: el extracto mas nuevo de cada subcarpeta de INSUMOS_PRECALENTADO (como una lista de una ruta, igual que los elige la pagina) y el hash de la ultima version del padron.
+
+    La huella cambia si aparece un extracto nuevo, si uno se reemplaza (tamaño o fecha de modificacion) o si se registra otro padron. Si falta algun insumo devuelve (None, None).
+    '''
+    directorio = directorio or DIRECTORIO_EXTRACTOS
+    ultimos = {insumo: (listar_extractos(directorio / insumo) or [None])[0] for insumo in INSUMOS_PRECALENTADO}
+    versiones = versiones_padron()
+    if not versiones or None in ultimos.values():
+        return None, None
+
+    insumos = {insumo: [extracto['ruta']] for insumo, extracto in ultimos.items()}
+    insumos['padron'] = versiones[-1]['hash']
+    huella = tuple((str(extracto['ruta']), extracto['tamano'], extracto['modificado']) for extracto in ultimos.values()) + (insumos['padron'],)
+
+    return insumos, huella
+
+
+def _vigilar(precalentar, intervalo: int):
+    # Se precalienta cuando la huella cambio y se mantuvo igual entre dos revisiones, asi no se lee un extracto que todavia se esta copiando
+    anterior, precalentada = None, None
+    while True:
+        huella = None
+        try:
+            insumos, huella = insumos_vigentes()
+            if huella is not None and huella == anterior and huella != precalentada:
+                inicio = time.perf_counter()
+                precalentar(**insumos)
+                logger.info(f'Cache precalentada con {[str(r) for insumo in INSUMOS_PRECALENTADO for r in insumos[insumo]]} en {round(time.perf_counter() - inicio, 1)} s')
+                precalentada = huella
+            anterior = huella
+        except Exception as e:
+            logger.warning(f'No se pudo precalentar la cache con los extractos de la carpeta compartida. Detalle: {e}')
+            # No se reintenta hasta que cambien los archivos
+            precalentada = anterior = huella
+
+        time.sleep(intervalo)
+
+
+def iniciar_precalentado(precalentar, intervalo: int = INTERVALO_PRECALENTADO):
+    '''
+    Arranca (una sola vez por servidor) el hilo que vigila la carpeta compartida y el registro de padrones y, cuando llegan extractos o un padron nuevos, llama a `precalentar(ventas, debitos, padron)` para dejar armadas en la cache la tabla de hechos y los niveles de los reportes. Asi el primero que abre un reporte sobre esos extractos no paga la lectura, el cruce ni las agregaciones.
+    '''
+    global _hilo
+    # Dentro de un proceso del pool no se vigila nada
+    if multiprocessing.parent_process() is not None:
+        return
+
+    with _lock_hilo:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_vigilar, args=(precalentar, intervalo), name='precalentado', daemon=True)
+            _hilo.start()
+            logger.debug(f'Precalentado iniciado sobre {DIRECTORIO_EXTRACTOS}, cada {intervalo} s')
@@ -0,0 +1,60 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def procesos_disponibles() -> int:
+    # Dentro de un proceso del pool no se abren mas procesos
+    if multiprocessing.parent_process() is not None:
+        return 1
+
+    return os.cpu_count() or 1
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    '''
+    Devuelve el pool de procesos que comparten los reportes. Se crea la primera vez que se usa y queda vivo para no volver a levantar los procesos (y a importar pandas) en cada reporte.
+    '''
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            # spawn y no fork: Streamlit corre con varios hilos y un fork puede heredar locks tomados
+            _pool = ProcessPoolExecutor(max_workers=procesos_disponibles(), mp_context=multiprocessing.get_context('spawn'))
+
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def en_procesos(funcion, *argumentos) -> list:
+    '''
+    Aplica `funcion` a cada juego de argumentos, como map(funcion, *argumentos), en el pool de procesos compartido y devuelve los resultados en el mismo orden.
+
+    `funcion` tiene que estar definida a nivel de modulo (se importa en cada proceso) y sus argumentos y resultados viajan serializados. Con una sola tarea o un solo nucleo, o si el pool no puede arrancar, se ejecuta en serie en el proceso actual.
+    '''
+    tareas = list(zip(*argumentos))
+
+    if len(tareas) > 1 and procesos_disponibles() > 1:
+        try:
+            resultados = list(_obtener_pool().map(funcion, *zip(*tareas)))
+            logger.debug(f'{funcion.__name__}: {len(tareas)} tareas en {procesos_disponibles()} procesos')
+            return resultados
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f'No se pudo usar el pool de procesos para {funcion.__name__}, se ejecuta en serie. Detalle: {e}')
+            _descartar_pool()
+
+    return [funcion(*tarea) for tarea in tareas]
@@ -3,7 +3,6 @@ import pandas as pd
 from datetime import datetime, timedelta
 import plotly.express as px
 import io
-import chardet
 import streamlit as st
 import logging
 import zipfile
@@ -11,6 +10,19 @@ import numpy as np
 from bq_carrefour import MethodBQ
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
+from utils.lectura import leer_csv_micro, leer_columnar, leer_excel, formato_columnar, convertir_numero_ar, preparar_para_arrow, detectar_formato, hash_contenido, EXTENSIONES_COMPRIMIDAS
+from utils.esquemas import leer_insumo
+from utils.padron import leer_padron, version_padron, versiones_padron, matriz_comparable
+from utils.extractos import listar_extractos, rutas_extractos
+from utils.precalentar import iniciar_precalentado
+from utils.dimensiones import concat_dimensiones, derivar_por_unicos, numero_operacional, parte_de_fecha
+from utils.hechos import construir_hechos, filtrar_sc, niveles_sc_mensual, comparable_por_mes, agregar_tiendas
+from utils.agregaciones import agregar_niveles, calcular_progresiones, columnas_años, formato_ancho
+from utils.grafo import evaluar_grafo
+from utils.briefing import briefing_por_direccion, niveles_ventas
+from utils.exportar import exportar_excel
+from utils.motor_duckdb import niveles_duckdb, duckdb_disponible
+from utils.motor_arrow import niveles_arrow
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -20,303 +32,164 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Motores de calculo de los pipelines de progresiones. Salvo 'pandas', cada uno resuelve los hechos, la SC y los niveles en una sola funcion con la firma de niveles_duckdb.
+# DuckDB es opcional (ver requirements.txt): si no esta instalado el motor no se ofrece en las paginas
+MOTORES_NIVELES = {
+    'arrow': niveles_arrow,
+    **({'duckdb': niveles_duckdb} if duckdb_disponible() else {}),
+}
+MOTORES = ['pandas', *MOTORES_NIVELES]
+
 def proteger_pagina():
     if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
         st.warning("🔐 Debés iniciar sesión para acceder a esta página.")
         st.stop()
 
-def detectar_encoding(archivo):
-    # archivo es un UploadedFile de Streamlit
-    raw_data = archivo.read(10000)  # leo los primeros 10k bytes
-    archivo.seek(0)  # reseteo el puntero para no perder info
-    result = chardet.detect(raw_data)
-    return result["encoding"]
+def elegir_padron_guardado(clave: str = 'padron_guardado'):
+    """
+    Si no se subio un padron, permite elegir una de las versiones ya cargadas (por ejemplo, para recalcular un reporte viejo con el padron que se uso entonces). Devuelve el hash de la version elegida o None.
+    """
+    versiones = versiones_padron()
+    if not versiones:
+        return None
+
+    opciones = {v['hash']: f"{v['archivo']} - cargado el {v['cargado'].replace('T', ' ')}" for v in reversed(versiones)}
+    return st.selectbox('O elegir un padrón ya cargado', list(opciones), index=None, format_func=opciones.get, placeholder='Padrones guardados', key=clave)
 
-def leer_archivo(path_o_buffer, tipo: str, header=None):
+def elegir_extractos(clave: str, multiple: bool = True):
     """
-    Función genérica para leer CSV, XLSX o Parquet según tipo.
+    Si no se subio el archivo, permite elegir extractos de la carpeta compartida del servidor (DIRECTORIO_EXTRACTOS), que se leen directo del disco sin pasar por el navegador ni copiarse en la sesion. Devuelve la lista de rutas elegidas (con `multiple=False`, la ruta) o None.
+    """
+    extractos = listar_extractos()
+    if not extractos:
+        return None
+
+    opciones = {e['archivo']: f"{e['archivo']} - {round(e['tamano'] / 1024 ** 2, 1)} MB - {e['modificado']}" for e in extractos}
+    if multiple:
+        elegidos = st.multiselect('O elegir extractos de la carpeta compartida', list(opciones), format_func=opciones.get, placeholder='Extractos del servidor', key=clave)
+        return rutas_extractos(elegidos) or None
+
+    elegido = st.selectbox('O elegir un extracto de la carpeta compartida', list(opciones), index=None, format_func=opciones.get, placeholder='Extractos del servidor', key=clave)
+    return rutas_extractos([elegido])[0] if elegido else None
+
+def leer_archivo(path_o_buffer, tipo: str = None, header=None):
     """
-    tipo = tipo.lower()
+    Función genérica para leer CSV, XLSX, Parquet o Arrow IPC según tipo.
+
+    Sin `tipo` el formato se detecta desde el contenido del archivo. En los CSV el encoding, el separador y la convención decimal siempre se detectan, y también la fila de encabezado si no se indica `header`.
+    """
+    formato = detectar_formato(path_o_buffer)
+    tipo = (tipo or formato["contenedor"]).lower()
+    if hasattr(path_o_buffer, "seek"):
+        path_o_buffer.seek(0)
     if tipo == "csv":
-        return pd.read_csv(path_o_buffer, encoding="utf-16", header=header, sep=",", decimal=",")
+        return pd.read_csv(path_o_buffer, encoding=formato["encoding"], header=formato["header"] if header is None else header, sep=formato["sep"], decimal=formato["decimal"], thousands="." if formato["decimal"] == "," else ",")
     elif tipo == "xlsx":
-        return pd.read_excel(path_o_buffer, header=header)
-    elif tipo == "parquet":
-        return pd.read_parquet(path_o_buffer, engine="pyarrow")
+        return leer_excel(path_o_buffer, header=formato["header"] if header is None else header)
+    elif tipo in ("parquet", "arrow"):
+        return leer_columnar(path_o_buffer)
     else:
         raise ValueError(f"Formato no soportado: {tipo}")
 
-def progresiones_mmaa(volumen_y_ventas, debitos, padron, mes_comparable:str):
+# Niveles de agregacion del reporte del mes. Los niveles por sector, seccion y GF quedan solo con VCT y VOL porque los debitos llegan hasta el detalle de tienda
+NIVELES_MMAA = {
+    'total': ['año', 'categoria'],
+    'formato': ['año', 'direccion', 'categoria'],
+    'provincia': ['año', 'provincia', 'categoria'],
+    'provincia_formato': ['año', 'provincia', 'direccion', 'categoria'],
+    'tiendas': ['año', 'direccion', 'punto_operacional', 'categoria'],
+    'sector': ['año', 'sector', 'categoria'],
+    'seccion': ['año', 'seccion', 'categoria'],
+    'grupo_de_familia': ['año', 'grupo_de_familia', 'categoria'],
+    'aperturado': ['año', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria'],
+    'tienda_sector': ['año', 'direccion', 'punto_operacional', 'sector', 'categoria'],
+    'tienda_seccion': ['año', 'direccion', 'punto_operacional', 'seccion', 'categoria'],
+    'tienda_grupo_de_familia': ['año', 'direccion', 'punto_operacional', 'grupo_de_familia', 'categoria'],
+}
+
+# Hojas del reporte del mes, en el orden en que se exportan, y el nivel del que sale cada una
+HOJAS_MMAA = {
+    'Prog Carrefour - SC': 'total',
+    'Prog x Formatos - SC': 'formato',
+    'Prog x Provincia - SC': 'provincia',
+    'Prog x Prov y Form - SC': 'provincia_formato',
+    'Prog x Tiendas - SC': 'tiendas',
+    'Progresiones x Sector - SC': 'sector',
+    'Progresiones x Seccion - SC': 'seccion',
+    'Progresiones x GF - SC': 'grupo_de_familia',
+    'Prog Sector x Tienda - SC': 'tienda_sector',
+    'Prog Seccion x Tienda - SC': 'tienda_seccion',
+    'Prog GF x Tienda - SC': 'tienda_grupo_de_familia',
+    'Prog Aperturado x Tienda - SC': 'aperturado',
+}
+
+def progresiones_mmaa(volumen_y_ventas, debitos, padron, mes_comparable:str, hojas=None, motor='pandas'):
     try:
         '''
         Pipeline para consegur las progresiones de un mes puntual, teniendo en cuenta la SC. Las progresiones se mostraran por Formato, por Tienda, Sector, Seccion, Grupo de Familia y Provincia.
 
         Los archivos de Ventas y Debitos se deben cargar en formato csv como salen de Micro y el padron en formato xslx (Excel Normal) desde el drive.
-        '''
-        # Carga de Archivos y transformaciones generales
-        df_ventas_y_volumen = pd.read_csv(volumen_y_ventas, encoding='utf-16', header=1)
-        df_debitos = pd.read_csv(debitos, encoding='utf-16', header=1, sep=',', decimal=',')
-        padron = pd.read_excel(padron, header=17)
-
-        # Trabajo sobre Ventas y Volumen
-        #Me quedo unicamente con las columnas importantes
-        df_ventas_y_volumen = df_ventas_y_volumen[['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']]
-
-        #Renombro las columnas
-        df_ventas_y_volumen.columns = (df_ventas_y_volumen.columns.str.strip().str.lower().str.replace(" ", "_"))
-        df_ventas_y_volumen.rename(columns={
-            'ventas_c/impuesto':'venta',
-            'venta_en_unidades':'volumen'
-        }, inplace=True)
-
-        #Genero una columna para Obtener el ID tienda
-        df_ventas_y_volumen['numero_operacional'] = df_ventas_y_volumen['punto_operacional'].str.split('-').str[0]
-
-        #Me quedo con las columnas necesarias
-        ventas = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'venta']]
-        volumen = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'volumen']]
-
-        #Quito los NA de las columans de valores
-        ventas.dropna(subset=['venta'], how='any', inplace=True)
-        volumen.dropna(subset=['volumen'], how='any', inplace=True)
-
-        #Realizo transformaciones para quitar carateres y convertir las columnas a valores numericos
-        ventas['venta'] = ventas['venta'].str.replace('.', '', regex=False).str.replace(',', '.', regex=False).astype(float)
-        volumen['volumen'] = volumen['volumen'].str.split(',').str[0].str.replace('.', '', regex=False).astype(int)
-
-        #Renombro las columnas con valores de ambos DF
-        ventas.rename(columns={
-            'venta':'valores'
-        }, inplace=True)
-
-        volumen.rename(columns={
-            'volumen':'valores'
-        }, inplace=True)
-
-        #Categorizo los valores tanto de volumne como de Ventas
-        ventas['categoria'] = 'VCT'
-        volumen['categoria'] = 'VOL'
-
-        #Agrupo las ventas
-        ventas_agrupado = ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        #Quito Envases del Volumen y Agrupo
-        volumen_sin_vol = volumen[~volumen['grupo_de_familia'].isin(['ENVASES BEBIDAS', 'ENVASES PAGADOS'])]
-        volumen_agrupado = volumen_sin_vol.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        # Trabajo sobre Debitos
-        # Renombro el DF
-        debitos_agrupados = df_debitos
-
-        # Renombro las columnas como corresponden
-        debitos_agrupados.columns = debitos_agrupados.columns.str.lower().str.replace(' ','_')
-        debitos_agrupados.rename(columns={
-            'cant._tickets_por_local':'valores'
-        }, inplace=True)
-
-        # Renombro la columna de Debitos a valores
-        debitos_agrupados['categoria'] = 'DEB'
-
-        # Genero una columna Categorica
-        debitos_agrupados['numero_operacional'] = debitos_agrupados['punto_operacional'].str.split('-').str[0]
-
-        # Genero columna para el ID tienda
-        debitos_agrupados = debitos_agrupados[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'valores']]
-
-        # Quito nulos numericos de la columna valores
-        debitos_agrupados.dropna(subset=['valores'], how='any', inplace=True)
-
-        # Convierto la columna de valores a su tipo de datos correspondiente
-        debitos_agrupados['valores'] = debitos_agrupados['valores'].str.replace('.', '', regex=False).astype(int)
-
-        # Trabajo sobre el padron
-        # Selecciono las columnas que me sirven del padron
-        padron = padron[['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']]
-
-        # Cambio de nombres en el padron
-        padron.columns = (
-            padron.columns
-            .str.lower()
-            .str.strip()
-            .str.replace(' ', '_', regex=False)
-            .str.replace('m²', 'm', regex=False)
-            .str.replace('.2','')
-        )
-
-        # Formateo la fecha para que tenga sentido
-        padron['fecha_apertura'] = padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
-
-        # Cambio el nombre de la columna N por "Numero Operacional"
-        padron.rename(columns={'gsx':'numero_operacional'}, inplace=True)
-
-        # Quito los valores nulos utilizando como referencia la columna Numero Operacional, nombre y fecha apertura
-        padron.dropna(subset=['numero_operacional', 'nombre', 'fecha_apertura', mes_comparable[0:3].lower()], how='any', inplace=True)
-
-        # Genero una funcion para convertir los valores de una columna a mayuscula
-        def maysc(df: pd.DataFrame, columna: str):
-            df[columna] = df[columna].astype(str).str.upper()
-
-        maysc(padron, mes_comparable[0:3].lower())
-            #Aplico la formula a la columna del mes comparable para que todos los valores sean en mayuscula
-
-        # Coloco el numero operacional como numero
-        padron['numero_operacional'] = padron['numero_operacional'].astype(int)
-
-        # Concateno todos los df (venta, debito y volumen) y lo joineo con el padron
-        df = pd.concat([ventas_agrupado, volumen_agrupado, debitos_agrupados])
-
-        # Convierto el ID a numero
-        df['numero_operacional'] = df['numero_operacional'].astype(int)
-
-        # Genero el Join del df Agupado con el Padron con el objetivo de quedarme unicamente con aquellas tiendas Comparables
-        df_join = df.merge(padron, how='left', on='numero_operacional')
-
-        # Trabajo sobre Progresiones Total Formato
-        # Me quedo unicamente con las columnas que me sirven del DF Joineado (ACA TENGO LA SC DEL MES)
-        df_join = df_join[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'fecha_apertura', 'fin_de_cierre', 'provincia','categoria', 'valores', mes_comparable[0:3].lower()]]
-
-        # Filtro unicamente las lineas que sean Superficie Comparable
-        df_join_sc = df_join[df_join[mes_comparable[0:3].lower()] == 'SC']
-        df_progresiones_total_carrefour = df_join_sc.groupby(['año','categoria'])['valores'].sum().reset_index().pivot_table('valores', ['categoria'], 'año', 'sum').reset_index()
-
-        # Genero la Columna de Progresiones
-        df_progresiones_total_carrefour['progresion'] = round(((df_progresiones_total_carrefour[2025] / df_progresiones_total_carrefour[2024]) - 1) * 100, 1)
-
-        # Trabajo sobre Progresiones por Formato
-        # Agrupo el df por año, direccion y categoria para pivotrear y construir un df para realizar las progresiones
-        df_progresiones_formato = df_join_sc.groupby(['año', 'direccion','categoria'])['valores'].sum().reset_index().pivot_table('valores', ['direccion', 'categoria'], 'año', 'sum').reset_index()
-
-        # Genero la Columna de Progresiones
-        df_progresiones_formato['progresion'] = round(((df_progresiones_formato[2025] / df_progresiones_formato[2024]) - 1) * 100, 1)
-
-        # Pivoteo nuevamente la informacion para que este en un formato mas legible (Wide y no Long)
-        df_progresiones_formato = df_progresiones_formato.pivot_table([2024, 2025, 'progresion'], 'direccion', 'categoria').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        # Trabajo sobre Progresiones por Provincia
-        df_progresiones_provincia = df_join_sc.groupby(['año', 'provincia','categoria'])['valores'].sum().reset_index().pivot_table('valores', ['provincia', 'categoria'], 'año', 'sum').reset_index()
-
-        # Genero la Columna de Progresiones
-        df_progresiones_provincia['progresion'] = round(((df_progresiones_provincia[2025] / df_progresiones_provincia[2024]) - 1) * 100, 1)
-
-        # Pivoteo nuevamente la informacion para que este en un provincia mas legible (Wide y no Long)
-        df_progresiones_provincia = df_progresiones_provincia.pivot_table([2024, 2025, 'progresion'], 'provincia', 'categoria').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        # Trabajo sobre Progresiones por Tiendas / Formatos
-        # Agrupo el DF joineado con el padron y ya con la superficie comparable y agrego las tiendas
-        df_progresiones_tiendas = df_join_sc.groupby(['año', 'direccion', 'punto_operacional','categoria'])['valores'].sum().reset_index().pivot_table('valores', ['direccion', 'punto_operacional', 'categoria'], 'año', 'sum').reset_index()
-
-        # Genero las Progresiones
-        df_progresiones_tiendas['progresion'] = round(((df_progresiones_tiendas[2025] / df_progresiones_tiendas[2024]) - 1) * 100, 1)
 
-        # Pivoteo la Informacion para mostrar en unformato Wide (Mas legible) y no un un formato long (Mas estructura para trabajar)
-        df_progresiones_tiendas = df_progresiones_tiendas.pivot_table(values=[2024, 2025, 'progresion'], index=['direccion', 'punto_operacional'], columns='categoria').reset_index().sort_values(by=['direccion', ('progresion', 'VOL')], ascending=[False, False]) #type:ignore
+        `hojas` es la lista de hojas de HOJAS_MMAA a generar (por defecto todas). El reporte se arma como un grafo (hechos -> SC -> niveles -> hojas) y solo se calculan los niveles que necesitan las hojas pedidas.
 
-        # Trabajo sobre Progresiones por Sector Total (Solo Vol y VCT porque Debitos llega hasta el detalle de Tiendas)
-        # Concateno las ventas y el volumen sin envases, lo cruzo con el padron, me quedo con los valores comparables segun el mes, genero tres df agrupados por sector, seccion y grupo de familia
-        #Concateno las ventas con el volumen sin Envases con el objetivo de agruparlo por sus distintas carecteristicas y  asi conseguir las progresiones totales por Sector, seccion y grupo de familia
-        df_venta_volumen = pd.concat([ventas, volumen_sin_vol])
-
-        # Convierto la columna Numero Operacional para realizar el merge con el padron
-        df_venta_volumen['numero_operacional'] = df_venta_volumen['numero_operacional'].astype(int) 
-        df_venta_volumen = df_venta_volumen.merge(padron, how='left', on='numero_operacional')
-
-        # Me quedo unicamente con las columnas que me sirven y los valores comparables
-        df_venta_volumen = df_venta_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia','fecha_apertura', 'fin_de_cierre', 'provincia', 'categoria', 'valores', mes_comparable[0:3].lower()]]
-        df_venta_volumen = df_venta_volumen[df_venta_volumen[mes_comparable[0:3].lower()] == 'SC']
-
-        # Agrupo por sector
-        df_venta_volumen_agrupado_sector = df_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index()
-
-        # Agrupo por Seccion
-        df_venta_volumen_agrupado_seccion = df_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index()
-
-        # Agrupo por grupo de familia
-        df_venta_volumen_agrupado_grupo_familia = df_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
-
-        # Trabajo sobre los Sectores
-        # Pivoteo la Info para generar las Progresiones
-        sectores_total = df_venta_volumen_agrupado_sector.groupby(['año', 'mes', 'direccion', 'sector', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['sector', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        # Genero las progresiones por Sector
-        sectores_total['progresion'] = round(((sectores_total[2025] / sectores_total[2024])-1)*100, 1)
-
-        # Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        progresion_sectores_total = sectores_total.pivot_table(values=[2024, 2025, 'progresion'], index='sector', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        # Trabajo sobre las secciones
-        # Pivoteo la Info para generar las Progresiones
-        seccion_total = df_venta_volumen_agrupado_seccion.groupby(['año', 'mes', 'direccion', 'seccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['seccion', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        # Genero las progresiones por seccion
-        seccion_total['progresion'] = round(((seccion_total[2025] / seccion_total[2024])-1)*100,1)
-        # Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        progresion_seccion_total = seccion_total.pivot_table(values=[2024, 2025, 'progresion'], index='seccion', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
+        `motor` elige como se calculan los hechos, la SC y los niveles: 'pandas', 'arrow' (pyarrow.compute sobre tablas de Arrow, sin columnas object) o 'duckdb' (una consulta SQL en DuckDB, para los extractos mas grandes).
+        '''
+        if motor not in MOTORES:
+            return f'El motor de calculo {motor} no esta disponible en este servidor. Motores disponibles: {MOTORES}'
 
-        # Trabajo sobre los Grupos de Familia
-        # Pivoteo la Info para generar las Progrgrupo_de_familia
-        grupo_de_familia_total = df_venta_volumen_agrupado_grupo_familia.groupby(['año', 'mes', 'direccion', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['grupo_de_familia', 'categoria'], columns='año', aggfunc='sum').reset_index()
+        hojas = [hoja for hoja in HOJAS_MMAA if hojas is None or hoja in hojas]
+        niveles_necesarios = {HOJAS_MMAA[hoja] for hoja in hojas}
 
-        # Genero las progresiones por grupo_de_familia
-        grupo_de_familia_total['progresion'] = round(((grupo_de_familia_total[2025] / grupo_de_familia_total[2024])-1)*100,1)
+        # Como se arma cada hoja a partir de su nivel (con las progresiones del año actual contra el anterior) y si se exporta con index
+        armado = {
+            # Trabajo sobre Progresiones Total Formato
+            'Prog Carrefour - SC': (lambda nivel: calcular_progresiones(nivel, ['categoria']), False),
 
-        # Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        progresion_grupo_de_familia_total = grupo_de_familia_total.pivot_table(values=[2024, 2025, 'progresion'], index='grupo_de_familia', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
+            # Calculo las progresiones por direccion y categoria y las presento en un formato mas legible (Wide y no Long)
+            'Prog x Formatos - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['direccion', 'categoria']), 'direccion').sort_values(by=('progresion', 'VOL'), ascending=False), True),
+            'Prog x Provincia - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['provincia', 'categoria']), 'provincia').sort_values(by=('progresion', 'VOL'), ascending=False), True),
 
-        # Trabajo sobre Ventas y Vol Aperturado por Formato, Tienda, sector, seccion en una misma Tab
-        # Agrupo la informacion de las ventas y volumen por sector, seccion y GF. El problema aca es que en una misma tabla no puedo poner subtotales de sector seccion por tienda, por lo que tengo que generar tres tablas diferentes, cada una de estas aperturadas por Tienda y luego (Sector/seccion/GF)
-        df_aperturado = df_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', columns='año', index=['direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria'], aggfunc='sum').reset_index()
+            # Trabajo sobre las provincias, pero aperturado por direccion
+            'Prog x Prov y Form - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['direccion', 'provincia', 'categoria'], decimales=2), ['direccion', 'provincia']).fillna(0).reset_index(), True),
 
-        # Obtengo la informacion correspondiente
-        df_tienda_sector = df_aperturado.groupby(['direccion', 'punto_operacional', 'sector', 'categoria'])[[2024, 2025]].sum()
-        df_tienda_seccion = df_aperturado.groupby(['direccion', 'punto_operacional', 'seccion', 'categoria'])[[2024, 2025]].sum()
-        df_tienda_grupo_de_familia = df_aperturado.groupby(['direccion', 'punto_operacional', 'grupo_de_familia', 'categoria'])[[2024, 2025]].sum()
+            # Tomo el nivel por tienda, ya con la superficie comparable, y lo muestro en un formato Wide (Mas legible) y no un un formato long (Mas estructura para trabajar)
+            'Prog x Tiendas - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['direccion', 'punto_operacional', 'categoria']), ['direccion', 'punto_operacional']).reset_index().sort_values(by=['direccion', ('progresion', 'VOL')], ascending=[False, False]), True), #type:ignore
 
-        # Calculo las progresiones
-        df_tienda_sector['progresion'] = round(((df_tienda_sector[2025] /df_tienda_sector[2024] -1) *100),1)
-        df_tienda_seccion['progresion'] = round(((df_tienda_seccion[2025] /df_tienda_seccion[2024] -1) *100),1)
-        df_tienda_grupo_de_familia['progresion'] = round(((df_tienda_grupo_de_familia[2025] /df_tienda_grupo_de_familia[2024] -1) *100),1)
+            # Trabajo sobre los Sectores, Secciones y Grupos de Familia (Solo Vol y VCT porque Debitos llega hasta el detalle de Tiendas)
+            'Progresiones x Sector - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['sector', 'categoria']), 'sector').sort_values(by=('progresion', 'VOL'), ascending=False), True),
+            'Progresiones x Seccion - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['seccion', 'categoria']), 'seccion').sort_values(by=('progresion', 'VOL'), ascending=False), True),
+            'Progresiones x GF - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['grupo_de_familia', 'categoria']), 'grupo_de_familia').sort_values(by=('progresion', 'VOL'), ascending=False), True),
 
-        # Reseteo los index
-        df_tienda_sector = df_tienda_sector.reset_index()
-        df_tienda_seccion = df_tienda_seccion.reset_index()
-        df_tienda_grupo_de_familia = df_tienda_grupo_de_familia.reset_index()
+            # Calculo las progresiones por tienda y sector/seccion/GF y las pivoteo para presentar en un formato mas legible
+            'Prog Sector x Tienda - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['direccion', 'punto_operacional', 'sector', 'categoria']), ['direccion', 'punto_operacional', 'sector']).reset_index().sort_values(by=[('direccion',''), ('punto_operacional',    ''), ('sector',    ''), ('progresion', 'VOL')], ascending=[False, False, False, False]), True), #type:ignore
+            'Prog Seccion x Tienda - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['direccion', 'punto_operacional', 'seccion', 'categoria']), ['direccion', 'punto_operacional', 'seccion']).reset_index().sort_values(by=[('direccion',''), ('punto_operacional',    ''), ('seccion',    ''), ('progresion', 'VOL')], ascending=[False, False, False, False]), True), #type:ignore
+            'Prog GF x Tienda - SC': (lambda nivel: formato_ancho(calcular_progresiones(nivel, ['direccion', 'punto_operacional', 'grupo_de_familia', 'categoria']), ['direccion', 'punto_operacional', 'grupo_de_familia']).reset_index().sort_values(by=[('direccion',''), ('punto_operacional',    ''), ('grupo_de_familia',    ''), ('progresion', 'VOL')], ascending=[False, False, False, False]), True), #type:ignore
 
-        # Ordeno los valores por su volumen 
-        df_tienda_sector = df_tienda_sector.sort_values(by=['direccion', 'punto_operacional', 'sector', 'progresion'], ascending=[False, False, False, False])
-        df_tienda_seccion = df_tienda_seccion = df_tienda_seccion.sort_values(by=['direccion', 'punto_operacional', 'seccion', 'progresion'], ascending=[False, False, False, False])
-        df_tienda_grupo_de_familia = df_tienda_grupo_de_familia = df_tienda_grupo_de_familia.sort_values(by=['direccion', 'punto_operacional', 'grupo_de_familia', 'progresion'], ascending=[False, False, False, False])
+            # Ventas y Vol Aperturado por Formato, Tienda, sector, seccion en una misma Tab. En una misma tabla no puedo poner subtotales de sector seccion por tienda, por eso estan las tres tablas de arriba
+            'Prog Aperturado x Tienda - SC': (lambda nivel: calcular_progresiones(nivel, ['direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria']).drop(columns='progresion'), True),
+        }
 
-        # Pivoteo para presentar en un formato mas legible
-        df_tienda_sector = df_tienda_sector.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index=['direccion', 'punto_operacional', 'sector'], aggfunc='sum').reset_index().sort_values(by=[('direccion',''), ('punto_operacional',    ''), ('sector',    ''), ('progresion', 'VOL')], ascending=[False, False, False, False]) #type:ignore
+        niveles_pedidos = {nivel: columnas for nivel, columnas in NIVELES_MMAA.items() if nivel in niveles_necesarios}
 
-        df_tienda_seccion = df_tienda_seccion.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index=['direccion', 'punto_operacional', 'seccion'], aggfunc='sum').reset_index().sort_values(by=[('direccion',''), ('punto_operacional',    ''), ('seccion',    ''), ('progresion', 'VOL')], ascending=[False, False, False, False]) #type:ignore
+        grafo = {
+            # Tabla de hechos (VCT, VOL sin envases y DEB) ya cruzada con el padron. Se arma una vez por set de archivos y la comparten los demas reportes
+            'hechos': ((), lambda: construir_hechos(volumen_y_ventas, debitos, padron, 'progresiones')),
+            # Me quedo unicamente con las lineas que sean Superficie Comparable en el mes elegido
+            'hechos_sc': (('hechos',), lambda hechos: filtrar_sc(hechos, mes_comparable)),
+            # Calculo de una sola pasada los niveles que necesitan las hojas pedidas
+            'niveles': (('hechos_sc',), lambda hechos_sc: agregar_niveles(hechos_sc, niveles_pedidos)),
+            **{hoja: (('niveles',), lambda niveles, hoja=hoja: armado[hoja][0](niveles[HOJAS_MMAA[hoja]])) for hoja in hojas},
+        }
 
-        df_tienda_grupo_de_familia = df_tienda_grupo_de_familia.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index=['direccion', 'punto_operacional', 'grupo_de_familia'], aggfunc='sum').reset_index().sort_values(by=[('direccion',''), ('punto_operacional',    ''), ('grupo_de_familia',    ''), ('progresion', 'VOL')], ascending=[False, False, False, False]) #type:ignore
+        # Con Arrow o DuckDB los hechos, la SC y los niveles salen de una sola funcion
+        if motor in MOTORES_NIVELES:
+            grafo['niveles'] = ((), lambda: MOTORES_NIVELES[motor](volumen_y_ventas, debitos, padron, niveles_pedidos, mes_comparable=mes_comparable))
 
-        # Trabajo sobre las provincias, pero aperturado por direccion
-        df_progresiones_provincia_abierto = df_join_sc.groupby(['año', 'provincia', 'direccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['provincia', 'direccion', 'categoria'], columns=['año'], aggfunc='sum').reset_index()
-        df_progresiones_provincia_abierto['progresion'] = ((df_progresiones_provincia_abierto[2025] / df_progresiones_provincia_abierto[2024] - 1) * 100).round(2)
-        df_progresiones_provincia_abierto = df_progresiones_provincia_abierto.pivot_table(values=[2024, 2025, 'progresion'], index=['direccion', 'provincia'], columns=['categoria'], aggfunc='sum').fillna(0).reset_index()
+        tablas = evaluar_grafo(grafo, hojas)
 
         try:
-            # Exporto todas las tablas a un archivo Excel en memoria
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_progresiones_total_carrefour.to_excel(writer, sheet_name="Prog Carrefour - SC", index=False)
-                df_progresiones_formato.to_excel(writer, sheet_name="Prog x Formatos - SC", index=True)
-                df_progresiones_provincia.to_excel(writer, sheet_name="Prog x Provincia - SC", index=True)
-                df_progresiones_provincia_abierto.to_excel(writer, sheet_name='Prog x Prov y Form - SC', index=True)
-                df_progresiones_tiendas.to_excel(writer, sheet_name="Prog x Tiendas - SC", index=True)
-                progresion_sectores_total.to_excel(writer, sheet_name='Progresiones x Sector - SC', index=True)
-                progresion_seccion_total.to_excel(writer, sheet_name='Progresiones x Seccion - SC', index=True)
-                progresion_grupo_de_familia_total.to_excel(writer, sheet_name='Progresiones x GF - SC', index=True)
-                df_tienda_sector.to_excel(writer, sheet_name='Prog Sector x Tienda - SC', index=True)
-                df_tienda_seccion.to_excel(writer, sheet_name='Prog Seccion x Tienda - SC', index=True)
-                df_tienda_grupo_de_familia.to_excel(writer, sheet_name='Prog GF x Tienda - SC', index=True)
-                df_aperturado.to_excel(writer, sheet_name='Prog Aperturado x Tienda - SC', index=True)
-
-            output.seek(0)
-            return output
+            # Exporto las tablas a un archivo Excel en memoria (las hojas grandes se serializan en paralelo)
+            return exportar_excel({hoja: (tabla, armado[hoja][1]) for hoja, tabla in tablas.items()})
 
         except Exception as e:
             print(e)
@@ -328,427 +201,151 @@ def progresiones_mmaa(volumen_y_ventas, debitos, padron, mes_comparable:str):
 def exporto_parquet(df: pd.DataFrame):
     try:
         output = io.BytesIO()
-        df.to_parquet(output, index=False, engine="pyarrow")
+        preparar_para_arrow(df).to_parquet(output, index=False, engine="pyarrow")
         output.seek(0)
         return output
     
     except Exception as e:
         return f"Ocurrió un error al generar el parquet: {e}"
 
-def progresiones_acumulado(ventas, debitos, padron, mes_comparable:str): 
+# Niveles de agregacion del acumulado, todos por mes para poder limitarlos al periodo acumulado. Los niveles por sector, seccion y GF quedan solo con VCT y VOL porque los debitos llegan hasta el detalle de tienda
+NIVELES_ACUMULADO = {
+    'total': ['año', 'mes', 'categoria'],
+    'formato': ['año', 'mes', 'direccion', 'categoria'],
+    'provincia': ['año', 'mes', 'direccion', 'provincia', 'categoria'],
+    'tiendas': ['año', 'mes', 'direccion', 'punto_operacional', 'categoria'],
+    'sector': ['año', 'mes', 'direccion', 'sector', 'categoria'],
+    'seccion': ['año', 'mes', 'direccion', 'seccion', 'categoria'],
+    'grupo_de_familia': ['año', 'mes', 'direccion', 'grupo_de_familia', 'categoria'],
+    'tienda_sector': ['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'categoria'],
+    'tienda_seccion': ['año', 'mes', 'direccion', 'punto_operacional', 'seccion', 'categoria'],
+    'tienda_grupo_de_familia': ['año', 'mes', 'direccion', 'punto_operacional', 'grupo_de_familia', 'categoria'],
+    'provincia_formato': ['año', 'provincia', 'direccion', 'categoria'],
+}
+
+# Hojas del acumulado, en el orden en que se exportan, y el nivel del que sale cada una
+HOJAS_ACUMULADO = {
+    'Prog Acum Carrefour - SC': 'total',
+    'Prog Acum Formatos - SC': 'formato',
+    'Prog Acum Provincia - SC': 'provincia',
+    'Prog Acum Prov Abierto - SC': 'provincia_formato',
+    'Prog Acum Tiendas - SC': 'tiendas',
+    'Prog Acum Sector - SC': 'sector',
+    'Prog Acum Seccion - SC': 'seccion',
+    'Prog Acum GF - SC': 'grupo_de_familia',
+    'Prog Sector x Tienda - SC': 'tienda_sector',
+    'Prog Seccion x Tienda - SC': 'tienda_seccion',
+    'Prog GF x Tienda - SC': 'tienda_grupo_de_familia',
+}
+
+def progresiones_acumulado(ventas, debitos, padron, mes_comparable:str, hojas=None, motor='pandas'): 
+    '''
+    Pipeline de las progresiones acumuladas desde Enero hasta `mes_comparable`, con la Superficie Comparable de cada mes.
+
+    `hojas` es la lista de hojas de HOJAS_ACUMULADO a generar (por defecto todas). El reporte se arma como un grafo (hechos -> SC -> niveles -> hojas) y solo se calculan los niveles que necesitan las hojas pedidas.
+
+    `motor` elige como se calculan los hechos, la SC y los niveles: 'pandas', 'arrow' (pyarrow.compute sobre tablas de Arrow, sin columnas object) o 'duckdb' (una consulta SQL en DuckDB, para los extractos mas grandes).
+    '''
     try:
         logger.info("🔁 Iniciando cálculo de progresiones acumuladas")
 
-        try:
-            ventas.seek(0)
-            df_ventas_y_volumen = pd.read_csv(ventas, encoding='utf-16', header=1)
-            logger.debug(f"Ventas y Volumen cargado: {df_ventas_y_volumen.shape}")
-        except Exception as e:
-            logger.error(f'Error leyendo archivo de ventas: {e}')
-            return f'Error en ventas. {e}'
+        if motor not in MOTORES:
+            return f'El motor de calculo {motor} no esta disponible en este servidor. Motores disponibles: {MOTORES}'
 
-        try:
-            debitos.seek(0)
-            df_debitos = pd.read_csv(debitos, encoding='utf-16', header=1, sep=',', decimal=',')
-            logger.debug(f"Debitos cargado: {df_debitos.shape}")
-        except Exception as e:
-            logger.error(f'Error leyendo archivo de debitos: {e}')
-            return f'Error en debitos. {e}'
+        hojas = [hoja for hoja in HOJAS_ACUMULADO if hojas is None or hoja in hojas]
+        niveles_necesarios = {HOJAS_ACUMULADO[hoja] for hoja in hojas}
+
+        niveles_pedidos = {nivel: columnas for nivel, columnas in NIVELES_ACUMULADO.items() if nivel in niveles_necesarios}
 
         try:
-            padron.seek(0)
-            df_padron = pd.read_excel(padron, header=17)
-            logger.debug(f"Padron cargado: {df_padron.shape}")
-            padron = df_padron
+            if motor in MOTORES_NIVELES:
+                # Con Arrow o DuckDB los hechos, la SC de cada mes y los niveles salen de una sola funcion, sin armar la tabla de hechos en pandas
+                hechos = None
+                agregados = MOTORES_NIVELES[motor](ventas, debitos, padron, niveles_pedidos, sc_mensual=True)
+            else:
+                # Tabla de hechos (VCT, VOL sin envases y DEB) ya cruzada con el padron, compartida con los demas reportes
+                hechos = construir_hechos(ventas, debitos, padron, 'progresiones')
+                logger.debug(f"Tabla de hechos cargada: {hechos.shape}")
         except Exception as e:
-            logger.error(f'Error leyendo archivo de padron: {e}')
-            return f'Error en padron. {e}'
-
-        # Trabajo sobre Ventas y Volumen
-        #Me quedo unicamente con las columnas importantes
-        df_ventas_y_volumen = df_ventas_y_volumen[['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']].copy()
-
-        #Renombro las columnas
-        df_ventas_y_volumen.columns = (df_ventas_y_volumen.columns.str.strip().str.lower().str.replace(" ", "_"))
-        df_ventas_y_volumen.rename(columns={
-        'ventas_c/impuesto':'venta',
-        'venta_en_unidades':'volumen'
-        }, inplace=True)
-
-        #Genero una columna para Obtener el ID tienda
-        df_ventas_y_volumen['numero_operacional'] = df_ventas_y_volumen['punto_operacional'].str.split('-').str[0]
-
-        #Me quedo con las columnas necesarias
-        ventas = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'venta']].copy()
-        volumen = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'volumen']].copy()
-
-        #Quito los NA de las columans de valores
-        ventas.dropna(subset=['venta'], how='any', inplace=True)
-        volumen.dropna(subset=['volumen'], how='any', inplace=True)
-
-        logger.debug(f"Valores Nulos Quitados")
-
-        #Realizo transformaciones para quitar carateres y convertir las columnas a valores numericos
-        ventas['venta'] = ventas['venta'].str.replace('.','').str.replace(',','.').astype('float')
-        volumen['volumen'] = volumen['volumen'].str.split(',').str[0].str.replace('.','').astype('int')
-
-        logger.debug(f"Valores transformados a numeros de forma exitosa")
-
-        #Renombro las columnas con valores de ambos DF
-        ventas.rename(columns={
-        'venta':'valores'
-        }, inplace=True)
-
-        volumen.rename(columns={
-        'volumen':'valores'
-        }, inplace=True)
-
-        #Categorizo los valores tanto de volumen como de Ventas
-        ventas['categoria'] = 'VCT'
-        volumen['categoria'] = 'VOL'
-
-        logger.debug(f"columnas categorias generadas con exito")
-
-        #Agrupo las ventas
-        ventas_agrupado = ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        logger.debug(f"Primera agrupacion de ventas {ventas_agrupado.shape}")
-
-        #Quito Envases del Volumen y Agrupo
-        volumen_sin_vol = volumen[~volumen['grupo_de_familia'].str.contains('ENVASES')]
-        volumen_agrupado = volumen_sin_vol.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        logger.debug(f"Se quitaron los envases del volumen y se agrupo el df: {volumen_agrupado.shape}")
-
-        # Trabajo sobre Debitos
-        # Renombro el DF
-        debitos_agrupados = df_debitos.copy()
-
-        logger.debug(f"debitos cargados {debitos_agrupados.shape}")
-
-        # Renombro las columnas como corresponden
-        # Renombro la columna de Debitos a valores
-        debitos_agrupados.columns = debitos_agrupados.columns.str.lower().str.replace(' ','_')
-        debitos_agrupados.rename(columns={
-        'cant._tickets_por_local':'valores'
-        }, inplace=True)
-
-        # Genero una columna Categorica
-        debitos_agrupados['categoria'] = 'DEB'
-
-        logger.debug(f"Columna categoria para debitos generada con exito")
-
-        # Genero columna para el ID tienda
-        debitos_agrupados['numero_operacional'] = debitos_agrupados['punto_operacional'].str.split('-').str[0]
-
-        # Me quedo con las columnas que necesito
-        debitos_agrupados = debitos_agrupados[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'valores']].copy()
-
-        logger.debug(f"Agrupo los debitos {debitos_agrupados.shape}")
-
-        # Quito nulos numericos de la columna valores
-        debitos_agrupados.dropna(subset=['valores'], how='any', inplace=True)
-
-        logger.debug(f"Quito los nulos de los debitos")
-
-        # Convierto la columna de valores a su tipo de datos correspondiente
-        debitos_agrupados['valores'] = debitos_agrupados['valores'].str.replace('.','').astype(int)
-        
-        logger.debug(f"convierto la columan valores de debitos a numeros")
-
-        # Trabajo sobre el padron
-        # Selecciono las columnas que me sirven del padron
-        padron = padron[['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']].copy() #type:ignore
-
-        logger.debug(f"cargo el padron {padron.shape}")
-
-        # Cambio de nombres en el padron
-        padron.columns = (
-        padron.columns
-        .str.lower()
-        .str.strip()
-        .str.replace(' ', '_', regex=False)
-        .str.replace('m²', 'm', regex=False)
-        .str.replace('.2','')
-        )
-
-        # Formateo la fecha para que tenga sentido
-        padron['fecha_apertura'] = padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
-
-        # Cambio el nombre de la columna N por "Numero Operacional"
-        padron.rename(columns={'gsx':'numero_operacional'}, inplace=True)
-
-        # Quito los valores nulos utilizando como referencia la columna Numero Operacional, nombre y fecha apertura
-        padron.dropna(subset=['numero_operacional', 'nombre', 'fecha_apertura', mes_comparable[0:3].lower()], how='any', inplace=True)
-
-        # Genero una funcion para convertir los valores de una columna a mayuscula
-        def maysc(df: pd.DataFrame, columna: str):
-            df[columna] = df[columna].str.upper()
-
-        #Aplico la formula a la columna del mes comparable para que todos los valores sean en mayuscula
-        maysc(padron, mes_comparable[0:3].lower())
-
-        # Coloco el numero operacional como numero
-        padron['numero_operacional'] = padron['numero_operacional'].astype(int)
-
-        # Concateno todos los df (venta, debito y volumen) y lo joineo con el padron
-        df = pd.concat([ventas_agrupado, volumen_agrupado, debitos_agrupados])
-
-        logger.debug(f"Concateno todos los df, ventas, debitos y vol {df.shape}")
-
-        # Convierto el ID a numero
-        df['numero_operacional'] = df['numero_operacional'].astype(int)
-
-        # Genero el Join del df Agupado con el Padron con el objetivo de quedarme unicamente con aquellas tiendas Comparables
-        df_join = df.merge(padron, how='left', on='numero_operacional')
-
-        logger.debug(f"Genero un Join con el padron {df_join.shape}")
-
-        # Trabajo sobre Progresiones Total Formato
-        # Me quedo unicamente con las columnas que me sirven del DF Joineado (ACA TENGO LA SC DEL MES)
-        df_join = df_join[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'fecha_apertura', 'fin_de_cierre', 'provincia','categoria', 'valores', mes_comparable[0:3].lower()]].copy()
-
-        logger.debug(f"Join final con padrón: {df_join.shape}, columnas: {df_join.columns.tolist()}")
-
-        #Renombro la Columna Mes a Fecha para Luego generar la Columna Mes Correspondiente
-        df_join.rename(columns={
-            'mes':'fecha'
-        }, inplace=True)
-        df_join['mes'] = df_join['fecha'].str.split(' ').str[0]
-
-        # Filtro unicamente las lineas que sean Superficie Comparable
-        df_join_sc = df_join[df_join[mes_comparable[0:3].lower()] == 'SC'].copy()
-
-        #Agrupo el df por categoria teniendo en cuenta el mes, ya que este me servirá luego para limitar el periodo comparable y la superficie comparable
-        df_acum_formato = df_join_sc.groupby(['año', 'mes', 'direccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'direccion', 'categoria'], columns='año', aggfunc='sum').reset_index()
+            logger.error(f'Error leyendo los archivos de ventas, debitos o padron: {e}')
+            return f'Error en los archivos de ventas, debitos o padron. {e}'
 
         #Genero un diccionario con los meses y sus valores numericos de forma auxiliar
         orden_meses = {"Enero":1, "Febrero":2, "Marzo":3, "Abril":4, "Mayo":5, "Junio":6, "Julio":7, "Agosto":8, "Septiembre":9, "Octubre":10, "Noviembre":11, "Diciembre":12}
-
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        df_acum_formato['aux'] = df_acum_formato['mes'].map(orden_meses)
-
-        #Limito el periodo del df al mes comparable que quiero
         mes_limite = orden_meses[mes_comparable.capitalize()]
-        df_acum_formato = df_acum_formato.loc[df_acum_formato['aux'] <= mes_limite]
-
-        #Vuelvo a ordenar los meses
-        df_acum_formato = df_acum_formato.sort_values('aux', ascending=True)
-
-        # TOTAL CIA
-        df_total_cia = df_join_sc.groupby(['año', 'mes', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'categoria'], columns='año', aggfunc='sum').reset_index().groupby('categoria')[[2024, 2025]].sum()
-        df_total_cia['progresion'] = round((((df_total_cia[2025] / df_total_cia[2024]) - 1) * 100), 1)
-
-        #Una vez que tengo limitado el df por los meses que me interesan, agrupo el df para quitar el detalle de los meses ya que lo que queremos obtener es la sumatoria de los debitos, ventas y volumen del periodo acumulado indicado
-        df_acum_formato = df_acum_formato.groupby(['direccion', 'categoria'])[[2024, 2025]].sum().reset_index()
 
-        #Calculo la Progresion
-        df_acum_formato['progresion'] = round((((df_acum_formato[2025] / df_acum_formato[2024]) - 1) * 100), 1)
+        def preparar_niveles(niveles: dict):
+            logger.debug(f"Niveles comparables agrupados: { {nombre: nivel.shape for nombre, nivel in niveles.items()} }")
 
-        #Pivoteo para mostrar mejor la informacion
-        df_acum_formato.pivot_table(values=[2024, 2025, 'progresion'], index='direccion', columns='categoria')
+            #En cada nivel mensual renombro la Columna Mes a Fecha y genero la Columna Mes Correspondiente (sobre los niveles ya agrupados y no sobre cada fila)
+            for nivel in niveles.values():
+                if 'mes' in nivel.columns:
+                    nivel.rename(columns={
+                        'mes':'fecha'
+                    }, inplace=True)
+                    nivel['mes'] = parte_de_fecha(nivel['fecha'])
 
-        ### Trabajo sobre las provincias
-        #Agrupo el df por categoria teniendo en cuenta el mes, ya que este me servirá luego para limitar el periodo comparable y la superficie comparable
-        df_acum_provincia = df_join_sc.groupby(['año', 'mes', 'direccion', 'provincia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'categoria', 'provincia'], columns='año', aggfunc='sum').reset_index()
-
-        logger.info("🔄 Generando acumulado a nivel Provincia")
-        logger.debug(f"Shape antes del pivot provincia: {df_acum_provincia.shape}")
-
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        df_acum_provincia['aux'] = df_acum_provincia['mes'].map(orden_meses)
-
-        #Limito el periodo del df al mes comparable que quiero
-        df_acum_provincia = df_acum_provincia.loc[df_acum_provincia['aux'] <= mes_limite].copy()
-
-        # Una vez que tengo el periodo, ya el mes no me sirve, por eso agrupo por provincia y categoria
-        df_acum_provincia = df_acum_provincia.groupby(['categoria', 'provincia'])[[2024, 2025]].sum().reset_index()
-
-        #calculo las Progresiones
-        df_acum_provincia['progresion'] = round((((df_acum_provincia[2025] / df_acum_provincia[2024]) - 1) * 100), 1)
-
-        #Pivot para mostrar mejora la info
-        df_acum_provincia = df_acum_provincia.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index='provincia', aggfunc='sum').sort_values(('progresion', 'VOL'), ascending=False)
-
-        logger.debug(f"Trabajo sobre el df Provincia {df_acum_provincia.shape}")
-
-        ### Trabajo sobre las tiendas
-        df_acum_tiendas = df_join_sc.groupby(['año', 'mes', 'direccion', 'categoria', 'punto_operacional'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'categoria', 'punto_operacional'], columns='año', aggfunc='sum').reset_index()
-
-        logger.info("🔄 Generando acumulado a nivel Tiendas")
-        logger.debug(f"Shape antes del pivot provincia: {df_acum_tiendas.shape}")
+            return niveles
 
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        df_acum_tiendas['aux'] = df_acum_tiendas['mes'].map(orden_meses)
-
-        #Limito el periodo del df al mes comparable que quiero
-        df_acum_tiendas = df_acum_tiendas.loc[df_acum_tiendas['aux'] <= mes_limite].copy()
-
-        #Vuelvo a ordenar los meses
-        df_acum_tiendas = df_acum_tiendas.sort_values('aux', ascending=True)
-
-        #Una vez que tengo limitado el df por los meses que me interesan, agrupo el df para quitar el detalle de los meses ya que lo que queremos obtener es la sumatoria de los debitos, ventas y volumen del periodo acumulado indicado
-        df_acum_tiendas = df_acum_tiendas.groupby(['punto_operacional', 'categoria'])[[2024, 2025]].sum().reset_index()
-
-        #Calculo la Progresion
-        df_acum_tiendas['progresion'] = round((((df_acum_tiendas[2025] / df_acum_tiendas[2024]) - 1) * 100), 1)
-        df_acum_tiendas = df_acum_tiendas.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index='punto_operacional', aggfunc='sum').sort_values(('progresion', 'VOL'), ascending=False)
-
-        logger.debug(f"Trabajo sobre las prog acum por tienda {df_acum_tiendas.shape}")
-
-        ### Trabajo con VOL y VCT por Sector, Seccion y GF
-        #Concateno las ventas con el volumen sin Envases con el objetivo de agruparlo por sus distintas carecteristicas y  asi conseguir las progresiones totales por Sector, seccion y grupo de familia
-        acumulado_venta_volumen = pd.concat([ventas, volumen_sin_vol])
+        #Años que se comparan en las tablas del acumulado: el ultimo del reporte y el anterior
+        def años_comparados(niveles: dict):
+            año_actual = max(int(nivel['año'].max()) for nivel in niveles.values())
+            return [año_actual - 1, año_actual]
 
-        logger.info("🔄 Generando concat de VOL y VCT Solamente")
-        logger.debug(f"Shape antes del concat: {acumulado_venta_volumen.shape}")
-
-        #Convierto la columna Numero Operacional para realizar el merge con el padron
-        acumulado_venta_volumen['numero_operacional'] = acumulado_venta_volumen['numero_operacional'].astype(int) 
-        acumulado_venta_volumen = acumulado_venta_volumen.merge(padron, how='left', on='numero_operacional')
-
-        logger.info("🔄 Generando Join de la venta y el vol con el padron")
-
-        #Me quedo unicamente con las columnas que me sirven y los valores comparables
-        acumulado_venta_volumen = acumulado_venta_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia','fecha_apertura', 'fin_de_cierre', 'provincia', 'categoria', 'valores', mes_comparable[0:3].lower()]]
-        acumulado_venta_volumen = acumulado_venta_volumen[acumulado_venta_volumen[mes_comparable[0:3].lower()] == 'SC'].copy() 
-
-        #Renomrbo la columna mes a fecha y genero la columna de mes correcta
-        acumulado_venta_volumen.rename(columns={
-            'mes':'fecha'
-        }, inplace=True)
-        acumulado_venta_volumen['mes'] = acumulado_venta_volumen['fecha'].str.split(' ').str[0]
-
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        acumulado_venta_volumen['aux'] = acumulado_venta_volumen['mes'].map(orden_meses)
+        #Limito un nivel al periodo acumulado hasta el mes comparable
+        def hasta_mes_limite(df: pd.DataFrame):
+            return df.loc[df['mes'].map(orden_meses) <= mes_limite]
 
-        #Limito el periodo del df al mes comparable que quiero
-        acumulado_venta_volumen = acumulado_venta_volumen.loc[acumulado_venta_volumen['aux'] <= mes_limite].copy()
+        # Como se arma cada hoja a partir de su nivel y de los años comparados, y si se exporta con index
+        armado = {
+            # TOTAL CIA
+            'Prog Acum Carrefour - SC': (lambda nivel, años: calcular_progresiones(nivel, ['categoria'], años=años).set_index('categoria'), True),
 
-        #Vuelvo a ordenar los meses
-        acumulado_venta_volumen = acumulado_venta_volumen.sort_values('aux', ascending=True)
+            #Limito el nivel al periodo acumulado y calculo la progresion, que ya suma los debitos, ventas y volumen de todos los meses del periodo
+            'Prog Acum Formatos - SC': (lambda nivel, años: calcular_progresiones(hasta_mes_limite(nivel), ['direccion', 'categoria'], años=años), False),
 
-        #Agrupo y trabajo por Sector
-        acumulado_venta_volumen_sector = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index()
+            ### Trabajo sobre las provincias
+            'Prog Acum Provincia - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['provincia', 'categoria']), 'provincia').sort_values(('progresion', 'VOL'), ascending=False), True),
 
-        logger.info("🔄 Agrupo por Sector Ventas y VOL")
+            # Trabajo sobre las provincias, pero aperturado por direccion
+            'Prog Acum Prov Abierto - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(nivel, ['direccion', 'provincia', 'categoria'], decimales=2), ['direccion', 'provincia']).fillna(0).reset_index(), True),
 
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_sector = acumulado_venta_volumen_sector.groupby(['año', 'mes', 'direccion', 'sector', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['sector', 'categoria'], columns='año', aggfunc='sum').reset_index()
+            ### Trabajo sobre las tiendas
+            'Prog Acum Tiendas - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['punto_operacional', 'categoria']), 'punto_operacional').sort_values(('progresion', 'VOL'), ascending=False), True),
 
-        logger.info("🔄 Pivot VOL Y VCT por Sector")
+            ### Trabajo con VOL y VCT por Sector, Seccion y GF, limitados al periodo acumulado. Genero las Progresiones y las disponibilizo en formato wide y no long
+            'Prog Acum Sector - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['sector', 'categoria']), 'sector').sort_values(by=('progresion', 'VOL'), ascending=False), True),
+            'Prog Acum Seccion - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['seccion', 'categoria']), 'seccion').sort_values(by=('progresion', 'VOL'), ascending=False), True),
+            'Prog Acum GF - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['grupo_de_familia', 'categoria']), 'grupo_de_familia').sort_values(by=('progresion', 'VOL'), ascending=False), True),
 
-        #Genero la Progresion
-        acumulado_venta_volumen_sector['progresion'] = round(((acumulado_venta_volumen_sector[2025] / acumulado_venta_volumen_sector[2024])-1)*100,1)
-
-        logger.info("🔄 Genero Progresiones")
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_sector = acumulado_venta_volumen_sector.pivot_table(values=[2024, 2025, 'progresion'], index='sector', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        ### Agrupo y Trabajo por Seccion
-        acumulado_venta_volumen_seccion = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_seccion = acumulado_venta_volumen_seccion.groupby(['año', 'mes', 'direccion', 'seccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['seccion', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_seccion['progresion'] = round(((acumulado_venta_volumen_seccion[2025] / acumulado_venta_volumen_seccion[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_seccion = acumulado_venta_volumen_seccion.pivot_table(values=[2024, 2025, 'progresion'], index='seccion', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        logger.info("🔄 Finalizo las secciones")
-
-        ### Agrupo y trabajo por grupo de familia
-        acumulado_venta_volumen_grupo_de_familia = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_grupo_de_familia = acumulado_venta_volumen_grupo_de_familia.groupby(['año', 'mes', 'direccion', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['grupo_de_familia', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_grupo_de_familia['progresion'] = round(((acumulado_venta_volumen_grupo_de_familia[2025] / acumulado_venta_volumen_grupo_de_familia[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_grupo_de_familia = acumulado_venta_volumen_grupo_de_familia.pivot_table(values=[2024, 2025, 'progresion'], index='grupo_de_familia', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        logger.info("🔄 Finalizo los Grupos de Familia")
-
-        #Agrupo y trabajo por Tienda / Sector
-        acumulado_venta_volumen_tienda_sector = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_tienda_sector = acumulado_venta_volumen_tienda_sector.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['sector', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_tienda_sector['progresion'] = round(((acumulado_venta_volumen_tienda_sector[2025] / acumulado_venta_volumen_tienda_sector[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_tienda_sector = acumulado_venta_volumen_tienda_sector.pivot_table(values=[2024, 2025, 'progresion'], index=['punto_operacional', 'sector'], columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
-
-        logger.info("🔄 Finalizo los sectores por Tienda")
-
-        #Agrupo y trabajo por Tienda / Seccion
-        acumulado_venta_volumen_tienda_seccion = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_tienda_seccion = acumulado_venta_volumen_tienda_seccion.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['seccion', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_tienda_seccion['progresion'] = round(((acumulado_venta_volumen_tienda_seccion[2025] / acumulado_venta_volumen_tienda_seccion[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_tienda_seccion = acumulado_venta_volumen_tienda_seccion.pivot_table(values=[2024, 2025, 'progresion'], index=['punto_operacional', 'seccion'], columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
-
-        logger.info("🔄 Finalizo las secciones por Tienda")
-
-        #Agrupo y trabajo por Tienda / GF
-        acumulado_venta_volumen_tienda_grupo_de_familia = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_tienda_grupo_de_familia = acumulado_venta_volumen_tienda_grupo_de_familia.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['grupo_de_familia', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_tienda_grupo_de_familia['progresion'] = round(((acumulado_venta_volumen_tienda_grupo_de_familia[2025] / acumulado_venta_volumen_tienda_grupo_de_familia[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_tienda_grupo_de_familia = acumulado_venta_volumen_tienda_grupo_de_familia.pivot_table(values=[2024, 2025, 'progresion'], index=['punto_operacional', 'grupo_de_familia'], columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
-
-        logger.info("🔄 Finalizo los Grupos de Familia por Tienda")
+            #Lo mismo por Tienda / Sector, Seccion y GF
+            'Prog Sector x Tienda - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['punto_operacional', 'sector', 'categoria']), ['punto_operacional', 'sector']).sort_values(by=('progresion', 'VOL'), ascending=False).reset_index(), True),
+            'Prog Seccion x Tienda - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['punto_operacional', 'seccion', 'categoria']), ['punto_operacional', 'seccion']).sort_values(by=('progresion', 'VOL'), ascending=False).reset_index(), True),
+            'Prog GF x Tienda - SC': (lambda nivel, años: formato_ancho(calcular_progresiones(hasta_mes_limite(nivel), ['punto_operacional', 'grupo_de_familia', 'categoria']), ['punto_operacional', 'grupo_de_familia']).sort_values(by=('progresion', 'VOL'), ascending=False).reset_index(), True),
+        }
 
-        #Aperturo para dejar toda la informacion lista para que el usuario realice una tabla Pivot y tenga todo de forma  compacta
-        #if len(df_join_sc['direccion'].isin(['PROXIMIDAD']).unique()) >= 2:
-            #acumulado_venta_volumen_total = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
+        grafo = {
+            'hechos': ((), lambda: hechos),
+            # Me quedo unicamente con las lineas que sean Superficie Comparable en su propio mes, asi el acumulado usa la comparabilidad de cada mes del periodo, y calculo de una sola pasada los niveles que necesitan las hojas pedidas (ACA TENGO LA SC DE CADA MES). Los niveles ya calculados para esta tabla de hechos (por otro reporte o por el precalentado) se reutilizan
+            'agregados': (('hechos',), lambda hechos: niveles_sc_mensual(hechos, padron, niveles_pedidos)),
+            'niveles': (('agregados',), preparar_niveles),
+            'años': (('niveles',), años_comparados),
+            **{hoja: (('niveles', 'años'), lambda niveles, años, hoja=hoja: armado[hoja][0](niveles[HOJAS_ACUMULADO[hoja]], años)) for hoja in hojas},
+        }
 
-        # Trabajo sobre las provincias, pero aperturado por direccion
-        df_progresiones_provincia_abierto = df_join_sc.groupby(['año', 'provincia', 'direccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['provincia', 'direccion', 'categoria'], columns=['año'], aggfunc='sum').reset_index()
-        df_progresiones_provincia_abierto['progresion'] = ((df_progresiones_provincia_abierto[2025] / df_progresiones_provincia_abierto[2024] - 1) * 100).round(2)
-        df_progresiones_provincia_abierto = df_progresiones_provincia_abierto.pivot_table(values=[2024, 2025, 'progresion'], index=['direccion', 'provincia'], columns=['categoria'], aggfunc='sum').fillna(0).reset_index()
+        if motor in MOTORES_NIVELES:
+            grafo['agregados'] = ((), lambda: agregados)
 
+        tablas = evaluar_grafo(grafo, hojas)
 
-        logger.debug(f"Uso de memoria previo al ExcelWriter: {round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2)} MB")
+        if hechos is not None:
+            logger.debug(f"Uso de memoria previo al ExcelWriter: {round(hechos.memory_usage(deep=True).sum() / 1024 ** 2, 2)} MB")
 
         try:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                logger.info("💾 Comenzando a escribir Excel en memoria")
-                
-                df_total_cia.to_excel(writer, sheet_name=f"Prog Acum Carrefour - SC", index=True)
-                df_acum_formato.to_excel(writer, sheet_name=f"Prog Acum Formatos - SC", index=False)
-                df_acum_provincia.to_excel(writer, sheet_name="Prog Acum Provincia - SC", index=True)
-                df_progresiones_provincia_abierto.to_excel(writer, sheet_name="Prog Acum Prov Abierto - SC", index=True)
-                df_acum_tiendas.to_excel(writer, sheet_name="Prog Acum Tiendas - SC", index=True)
-                acumulado_venta_volumen_sector.to_excel(writer, sheet_name="Prog Acum Sector - SC", index=True)
-                acumulado_venta_volumen_seccion.to_excel(writer, sheet_name="Prog Acum Seccion - SC", index=True)
-                acumulado_venta_volumen_grupo_de_familia.to_excel(writer, sheet_name="Prog Acum GF - SC", index=True)
-                acumulado_venta_volumen_tienda_sector.to_excel(writer, sheet_name="Prog Sector x Tienda - SC", index=True)
-                acumulado_venta_volumen_tienda_seccion.to_excel(writer, sheet_name="Prog Seccion x Tienda - SC", index=True)
-                acumulado_venta_volumen_tienda_grupo_de_familia.to_excel(writer, sheet_name="Prog GF x Tienda - SC", index=True)
-                #En caso de que el formato sea Express, no se genera la ultima tab para que no se rompa el programa
-                #if len(df_join_sc['direccion'].isin(['PROXIMIDAD']).unique()) >= 2:
-                    #acumulado_venta_volumen_total.to_excel(writer, sheet_name="Prog Aperturado x Tienda - SC", index=True)
+            logger.info("💾 Comenzando a escribir Excel en memoria")
 
-            output.seek(0)
+            # Las hojas grandes se serializan en paralelo y despues se unen en un solo archivo
+            output = exportar_excel({hoja: (tabla, armado[hoja][1]) for hoja, tabla in tablas.items()})
             logger.info("✅ Excel generado correctamente")
             return output
 
@@ -760,139 +357,18 @@ def progresiones_acumulado(ventas, debitos, padron, mes_comparable:str):
     
 def genero_df_comparacion(ventas, debitos, padron, mes_comparable:str):
     try:
-        # Carga de Archivos y transformaciones generales
         #TENER CUIDADO A LA HORA DE SUBIR LA INFORMACION. EN ESTE CASO COMO VAMOS A REALIZAR UNA COMPARACION GENERAL POR TIENDA/FORMATO, NO ES NECESARIO APERTURAR EL REPORTE DE VENTAS Y VOLUMEN POR SECTOR SECCION. UNICAMENTE POR GF PARA QUITARLE LOS ENVASES AL VOLUMEN
-        df_ventas_y_volumen = pd.read_csv(ventas, encoding='utf-16', header=1)
-        df_debitos = pd.read_csv(debitos, encoding='utf-16', header=1, sep=',', decimal=',')
-        padron = pd.read_excel(padron, header=17)
-
-        # Trabajo sobre Ventas y Volumen
-        #Me quedo unicamente con las columnas importantes
-        df_ventas_y_volumen = df_ventas_y_volumen[['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']]
-
-        #Renombro las columnas
-        df_ventas_y_volumen.columns = (df_ventas_y_volumen.columns.str.strip().str.lower().str.replace(" ", "_"))
-        df_ventas_y_volumen.rename(columns={
-        'ventas_c/impuesto':'venta',
-        'venta_en_unidades':'volumen'
-        }, inplace=True)
-
-        #Genero una columna para Obtener el ID tienda
-        df_ventas_y_volumen['numero_operacional'] = df_ventas_y_volumen['punto_operacional'].str.split('-').str[0]
-
-        #Me quedo con las columnas necesarias
-        ventas = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'venta']]
-        volumen = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'volumen']]
-
-        #Quito los NA de las columans de valores
-        ventas.dropna(subset=['venta'], how='any', inplace=True)
-        volumen.dropna(subset=['volumen'], how='any', inplace=True)
-
-        #Realizo transformaciones para quitar carateres y convertir las columnas a valores numericos
-        ventas['venta'] = ventas['venta'].str.replace('.','').str.replace(',','.').astype('float')
-        volumen['volumen'] = volumen['volumen'].str.split(',').str[0].str.replace('.','').astype('int')
-
-        #Renombro las columnas con valores de ambos DF
-        ventas.rename(columns={
-        'venta':'valores'
-        }, inplace=True)
-
-        volumen.rename(columns={
-        'volumen':'valores'
-        }, inplace=True)
-
-        #Categorizo los valores tanto de volumne como de Ventas
-        ventas['categoria'] = 'VCT'
-        volumen['categoria'] = 'VOL'
-
-        #Agrupo las ventas
-        ventas_agrupado = ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        #Quito Envases del Volumen y Agrupo
-        volumen_sin_vol = volumen[~volumen['grupo_de_familia'].str.contains('ENVASES')]
-        volumen_agrupado = volumen_sin_vol.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        # Trabajo sobre Debitos
-        # Renombro el DF
-        debitos_agrupados = df_debitos
-
-        # Renombro las columnas como corresponden
-        debitos_agrupados.columns = debitos_agrupados.columns.str.lower().str.replace(' ','_')
-
-        # Renombro la columna de Debitos a valores
-        debitos_agrupados.rename(columns={
-        'cant._tickets_por_local':'valores'
-        }, inplace=True)
-
-        # Genero una columna Categorica
-        debitos_agrupados['categoria'] = 'DEB'
-
-        # Genero columna para el ID tienda
-        debitos_agrupados['numero_operacional'] = debitos_agrupados['punto_operacional'].str.split('-').str[0]
-
-        # Ordeno las columnas del df
-        debitos_agrupados = debitos_agrupados[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'valores']]
-
-        # Quito nulos numericos de la columna valores
-        debitos_agrupados.dropna(subset=['valores'], how='any', inplace=True)
-
-        # Convierto la columna de valores a su tipo de datos correspondiente
-        debitos_agrupados['valores'] = debitos_agrupados['valores'].str.replace('.','').astype(int)
-
-        # Trabajo sobre el padron
-        # Selecciono las columnas que me sirven del padron
-        padron = padron[['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']] #type:ignore
-
-        # Cambio de nombres en el padron
-        padron.columns = (
-        padron.columns
-        .str.lower()
-        .str.strip()
-        .str.replace(' ', '_', regex=False)
-        .str.replace('m²', 'm', regex=False)
-        .str.replace('.2','')
-        )
-
-        # Formateo la fecha para que tenga sentido
-        padron['fecha_apertura'] = padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
-
-        # Cambio el nombre de la columna N por "Numero Operacional"
-        padron.rename(columns={'gsx':'numero_operacional'}, inplace=True)
-
-        # Quito los valores nulos utilizando como referencia la columna Numero Operacional, nombre y fecha apertura
-        padron.dropna(subset=['numero_operacional', 'nombre', 'fecha_apertura', mes_comparable[0:3].lower()], how='any', inplace=True)
-
-        # Genero una funcion para convertir los valores de una columna a mayuscula
-        def maysc(df: pd.DataFrame, columna: str):
-            df[columna] = df[columna].str.upper()
-        #Aplico la formula a la columna del mes comparable para que todos los valores sean en mayuscula
-
-        maysc(padron, mes_comparable[0:3].lower())
-
-        # Coloco el numero operacional como numero
-        padron['numero_operacional'] = padron['numero_operacional'].astype(int)
+        # Tabla de hechos (VCT, VOL sin envases y DEB) ya cruzada con el padron, compartida con los demas reportes
+        hechos = construir_hechos(ventas, debitos, padron, 'comparacion')
 
-        # Concateno todos los df (venta, debito y volumen) y lo joineo con el padron
-        df = pd.concat([ventas_agrupado, volumen_agrupado, debitos_agrupados])
-
-        # Convierto el ID a numero
-        df['numero_operacional'] = df['numero_operacional'].astype(int)
-
-        # Genero el Join del df Agupado con el Padron con el objetivo de quedarme unicamente con aquellas tiendas Comparables
-        df_join = df.merge(padron, how='left', on='numero_operacional')
-
-        # Trabajo sobre Progresiones Total Formato
-        # Me quedo unicamente con las columnas que me sirven del DF Joineado (ACA TENGO LA SC DEL MES)
-        df_join = df_join[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'fecha_apertura', 'fin_de_cierre', 'provincia','categoria', 'valores', mes_comparable[0:3].lower()]]
-
-        # Filtro unicamente las lineas que sean Superficie Comparable
-        df_join_sc = df_join[df_join[mes_comparable[0:3].lower()] == 'SC']
+        # Filtro unicamente las lineas que sean Superficie Comparable y agrupo a nivel tienda (ACA TENGO LA SC DEL MES)
+        df_join_sc = agregar_tiendas(filtrar_sc(hechos, mes_comparable), ['fecha_apertura', 'fin_de_cierre', 'provincia'])
 
         #Renombro la Columna Mes a Fecha para Luego generar la Columna Mes Correspondiente
         df_join_sc.rename(columns={
         'mes':'fecha'
         }, inplace=True)
-        df_join_sc['mes'] = df_join_sc['fecha'].str.split(' ').str[0] 
+        df_join_sc['mes'] = parte_de_fecha(df_join_sc['fecha'])
 
         #Genero un diccionario con los meses y sus valores numericos de forma auxiliar
         orden_meses = {"Enero":1, "Febrero":2, "Marzo":3, "Abril":4, "Mayo":5, "Junio":6, "Julio":7, "Agosto":8, "Septiembre":9, "Octubre":10, "Noviembre":11, "Diciembre":12}
@@ -900,49 +376,45 @@ def genero_df_comparacion(ventas, debitos, padron, mes_comparable:str):
         #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
         df_join_sc['aux'] = df_join_sc['mes'].map(orden_meses)
 
-        # Agrupo por los campos que me sirven y pivoteo la info para calcular las progresiones
-        df_total_formato = df_join_sc.groupby(['año', 'mes', 'aux', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'aux', 'categoria'], columns='año', aggfunc='sum').reset_index()
+        # Calculo por mes los valores de cada año y las progresiones de cada año contra el anterior
+        df_total_formato = calcular_progresiones(df_join_sc, ['mes', 'aux', 'categoria'], por_año=True)
 
-        #Genero las progresiones
-        df_total_formato['progresion 2024'] = round((((df_total_formato[2024] / df_total_formato[2023]) - 1) * 100), 1)
-        df_total_formato['progresion 2025'] = round((((df_total_formato[2025] / df_total_formato[2024]) - 1) * 100), 1)
+        # Los años y sus progresiones salen de la muestra (todos los pares de años consecutivos), no de columnas fijas
+        años = columnas_años(df_total_formato)
+        progresiones = [f'progresion {año}' for año in años[1:]]
 
         #Me traigo unicamente la informacion que me sirve
-        df_total_formato = df_total_formato[['mes', 'aux', 2023, 2024, 2025, 'categoria', 'progresion 2024', 'progresion 2025']]
+        df_total_formato = df_total_formato[['mes', 'aux', *años, 'categoria', *progresiones]]
 
         #Ordeno el df
         df_total_formato = df_total_formato.sort_values('aux')
 
         #"Derrito" el df para poder generar un formato long y asi realizar un grafico con el periodo continuado desde 2024 en adelante
-        df_total_formato = df_total_formato.melt(id_vars=['mes', 'aux', 'categoria', 2023, 2024, 2025], value_vars=['progresion 2024', 'progresion 2025'], var_name='progresiones', value_name='valores')
+        df_total_formato = df_total_formato.melt(id_vars=['mes', 'aux', 'categoria', *años], value_vars=progresiones, var_name='progresiones', value_name='valores')
 
         #Genero una columna de periodo concatenando el mes y el año
         df_total_formato['periodo'] = df_total_formato['aux'].astype(str).str.zfill(2) + '-' + df_total_formato['progresiones'].str.split(' ').str[1].astype(str).str[2:]
 
         df_total_formato['punto_operacional'] = 'Total Formato'
 
-        df_total_formato = df_total_formato[['punto_operacional', 'mes', 2023, 2024, 2025, 'aux', 'categoria', 'progresiones', 'valores', 'periodo']]
-
-        # Agrupo por los campos que me sirven y pivoteo la info para calcular las progresiones
-        df_join_sc = df_join_sc.groupby(['año', 'mes', 'aux', 'punto_operacional', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'aux', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
+        df_total_formato = df_total_formato[['punto_operacional', 'mes', *años, 'aux', 'categoria', 'progresiones', 'valores', 'periodo']]
 
-        #Genero las progresiones
-        df_join_sc['progresion 2024'] = round((((df_join_sc[2024] / df_join_sc[2023]) - 1) * 100), 1)
-        df_join_sc['progresion 2025'] = round((((df_join_sc[2025] / df_join_sc[2024]) - 1) * 100), 1)
+        # Lo mismo por tienda
+        df_join_sc = calcular_progresiones(df_join_sc, ['mes', 'aux', 'punto_operacional', 'categoria'], años=años, por_año=True)
 
         #Me traigo unicamente la informacion que me sirve
-        df_progresiones = df_join_sc[['punto_operacional', 'mes', 'aux', 2023, 2024, 2025, 'categoria', 'progresion 2024', 'progresion 2025']]
+        df_progresiones = df_join_sc[['punto_operacional', 'mes', 'aux', *años, 'categoria', *progresiones]]
 
         #Ordeno el df
         df_progresiones = df_progresiones.sort_values('aux')
 
         #"Derrito" el df para poder generar un formato long y asi realizar un grafico con el periodo continuado desde 2024 en adelante
-        df_progresiones = df_progresiones.melt(id_vars=['punto_operacional', 'mes', 2023, 2024, 2025, 'aux', 'categoria'], value_vars=['progresion 2024', 'progresion 2025'], var_name='progresiones', value_name='valores')
+        df_progresiones = df_progresiones.melt(id_vars=['punto_operacional', 'mes', *años, 'aux', 'categoria'], value_vars=progresiones, var_name='progresiones', value_name='valores')
 
         #Genero una columna de periodo concatenando el mes y el año
         df_progresiones['periodo'] = df_progresiones['aux'].astype(str).str.zfill(2) + '-' + df_progresiones['progresiones'].str.split(' ').str[1].astype(str).str[2:]
 
-        df_progresiones[[2023, 2024, 2025]] = df_progresiones[[2023, 2024, 2025]].astype(int)
+        df_progresiones[años] = df_progresiones[años].astype(int)
 
         #Concateno los dos dfs finales
         df_final = pd.concat([df_progresiones, df_total_formato])
@@ -987,82 +459,16 @@ def actualizo_df_comparacion(df_final:pd.DataFrame, tiendas:list, categoria:str)
 
 def obtener_join_comparable(ventas, debitos, padron, mes_comparable:str): 
     try:
-        # Carga de Archivos y transformaciones generales
-        cols_venta = ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']
-        df_ventas_y_volumen = pd.read_csv(ventas, encoding='utf-16', header=1, usecols=cols_venta)
+        # Tabla de hechos (VCT, VOL sin envases y DEB) compartida con los demas reportes, agrupada a nivel tienda
+        df = agregar_tiendas(construir_hechos(ventas, debitos, padron, 'comparacion'))
 
-        cols_debitos = ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Cant. Tickets por Local']
-        df_debitos = pd.read_csv(debitos, encoding='utf-16', header=1, sep=',', decimal=',', usecols=cols_debitos)
-
-        cols_pad = ['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']
-        padron = pd.read_excel(padron, header=17, usecols=cols_pad)
-
-        #Renombro las columnas
-        df_ventas_y_volumen.columns = (df_ventas_y_volumen.columns.str.strip().str.lower().str.replace(" ", "_"))
-        df_ventas_y_volumen = df_ventas_y_volumen.rename(columns={'ventas_c/impuesto':'venta', 'venta_en_unidades':'volumen'})
-
-        #Genero una columna para Obtener el ID tienda
-        df_ventas_y_volumen['numero_operacional'] = pd.to_numeric(df_ventas_y_volumen['punto_operacional'].str.split('-').str[0], errors='coerce')
-
-        #Me quedo con las columnas necesarias
-        ventas = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'venta']]
-        volumen = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'volumen']]
-
-        #Renombro las columnas con valores de ambos DF
-        ventas = ventas.rename(columns={'venta':'valores'})
-        volumen = volumen.rename(columns={'volumen':'valores'})
-
-        #Realizo transformaciones para quitar carateres y convertir las columnas a valores numericos
-        ventas['valores'] = pd.to_numeric(ventas['valores'].str.replace('.', '').str.replace(',', '.'), errors='coerce')
-        volumen['valores'] =pd.to_numeric(volumen['valores'].str.replace('.', '').str.replace(',', '.'), errors='coerce')
-
-        #Categorizo los valores tanto de volumne como de Ventas
-        ventas['categoria'] = 'VCT'
-        volumen['categoria'] = 'VOL'
-
-        #Agrupo las ventas
-        ventas_agrupado = ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        #Quito Envases del Volumen y Agrupo
-        volumen_sin_vol = volumen[~volumen['grupo_de_familia'].isin(['ENVASES PAGADOS', 'ENVASES BEBIDAS'])]
-        #Si le quito las regularizadoras, el volumnes se me chinga todo!
-        #volumen_sin_vol = volumen[~volumen['grupo_de_familia'].str.contains('REGULARIZADOR')]
-        volumen_agrupado = volumen_sin_vol.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        # Trabajo sobre Debitos
-        # Renombro el DF
-        debitos_agrupados = df_debitos
-
-        # Renombro las columnas como corresponden
-        debitos_agrupados.columns = debitos_agrupados.columns.str.lower().str.replace(' ','_')
-        debitos_agrupados = debitos_agrupados.rename(columns={'cant._tickets_por_local':'valores'})
-
-        # Genero una columna Categorica
-        debitos_agrupados['categoria'] = 'DEB'
-
-        # Genero columna para el ID tienda
-        debitos_agrupados['numero_operacional'] = pd.to_numeric(debitos_agrupados['punto_operacional'].str.split('-').str[0], errors='coerce')
-
-        # Convierto la columna de valores a su tipo de datos correspondiente
-        debitos_agrupados['valores'] = pd.to_numeric(debitos_agrupados['valores'].str.replace('.',''), errors='coerce')
+        # El cruce con el padron es propio de este reporte (por numero operacional y direccion, con la vida de la tienda)
+        padron = leer_padron(padron, 'progresiones')
 
         # Trabajo sobre el padron
-        # Cambio de nombres en el padron
-        padron.columns = (
-        padron.columns
-        .str.lower()
-        .str.strip()
-        .str.replace(' ', '_', regex=False)
-        .str.replace('m²', 'm', regex=False)
-        .str.replace('.2','')
-        )
-
         # Formateo la fecha para que tenga sentido
         padron['fecha_apertura'] = padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
 
-        # Cambio el nombre de la columna N por "Numero Operacional"
-        padron = padron.rename(columns={'gsx':'numero_operacional'})
-
         # Me aseguro que la columna de fin_de_cierre sea Datetime para realizar una columna auxiliar y quitar la tiendas que esten cerradas por mas de años que causan problemas de duplicados
         padron['fin_de_cierre'] = pd.to_datetime(padron['fin_de_cierre'], format='%m/%d/%Y', errors='coerce')
 
@@ -1104,8 +510,7 @@ def obtener_join_comparable(ventas, debitos, padron, mes_comparable:str):
             default=pd.NaT
         )
 
-        # Concateno todos los df (venta, debito y volumen) y lo joineo con el padron
-        df = pd.concat([ventas_agrupado, volumen_agrupado, debitos_agrupados])
+        # Trabajo sobre las tiendas agrupadas de la tabla de hechos para joinearlas con el padron
 
         #Normalizo columna
         df['direccion'] = df['direccion'].str.lower()
@@ -1130,7 +535,7 @@ def obtener_join_comparable(ventas, debitos, padron, mes_comparable:str):
         df_join = df_join.rename(columns={'mes':'fecha'})
 
         #Genero columna de Mes
-        df_join['mes'] = df_join['fecha'].str.split(' ').str[0]
+        df_join['mes'] = parte_de_fecha(df_join['fecha'])
 
         #Completo columna Vida
         df_join['vida'] = df_join['vida'].fillna('Tienda Abierta')
@@ -1158,82 +563,16 @@ def obtener_join_comparable(ventas, debitos, padron, mes_comparable:str):
     
 def obtener_join_no_comparable(ventas, debitos, padron, mes_comparable:str): 
     try:
-        # Carga de Archivos y transformaciones generales
-        cols_venta = ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']
-        df_ventas_y_volumen = pd.read_csv(ventas, encoding='utf-16', header=1, usecols=cols_venta)
-
-        cols_debitos = ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Cant. Tickets por Local']
-        df_debitos = pd.read_csv(debitos, encoding='utf-16', header=1, sep=',', decimal=',', usecols=cols_debitos)
-
-        cols_pad = ['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']
-        padron = pd.read_excel(padron, header=17, usecols=cols_pad)
-
-        #Renombro las columnas
-        df_ventas_y_volumen.columns = (df_ventas_y_volumen.columns.str.strip().str.lower().str.replace(" ", "_"))
-        df_ventas_y_volumen = df_ventas_y_volumen.rename(columns={'ventas_c/impuesto':'venta', 'venta_en_unidades':'volumen'})
-
-        #Genero una columna para Obtener el ID tienda
-        df_ventas_y_volumen['numero_operacional'] = pd.to_numeric(df_ventas_y_volumen['punto_operacional'].str.split('-').str[0], errors='coerce')
-
-        #Me quedo con las columnas necesarias
-        ventas = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'venta']]
-        volumen = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'volumen']]
-
-        #Renombro las columnas con valores de ambos DF
-        ventas = ventas.rename(columns={'venta':'valores'})
-        volumen = volumen.rename(columns={'volumen':'valores'})
-
-        #Realizo transformaciones para quitar carateres y convertir las columnas a valores numericos
-        ventas['valores'] = pd.to_numeric(ventas['valores'].str.replace('.', '').str.replace(',', '.'), errors='coerce')
-        volumen['valores'] =pd.to_numeric(volumen['valores'].str.replace('.', '').str.replace(',', '.'), errors='coerce')
-
-        #Categorizo los valores tanto de volumne como de Ventas
-        ventas['categoria'] = 'VCT'
-        volumen['categoria'] = 'VOL'
-
-        #Agrupo las ventas
-        ventas_agrupado = ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        #Quito Envases del Volumen y Agrupo
-        volumen_sin_vol = volumen[~volumen['grupo_de_familia'].isin(['ENVASES PAGADOS', 'ENVASES BEBIDAS'])]
-        #Si le quito las regularizadoras, el volumnes se me chinga todo!
-        #volumen_sin_vol = volumen[~volumen['grupo_de_familia'].str.contains('REGULARIZADOR')]
-        volumen_agrupado = volumen_sin_vol.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        # Trabajo sobre Debitos
-        # Renombro el DF
-        debitos_agrupados = df_debitos
-
-        # Renombro las columnas como corresponden
-        debitos_agrupados.columns = debitos_agrupados.columns.str.lower().str.replace(' ','_')
-        debitos_agrupados = debitos_agrupados.rename(columns={'cant._tickets_por_local':'valores'})
-
-        # Genero una columna Categorica
-        debitos_agrupados['categoria'] = 'DEB'
+        # Tabla de hechos (VCT, VOL sin envases y DEB) compartida con los demas reportes, agrupada a nivel tienda
+        df = agregar_tiendas(construir_hechos(ventas, debitos, padron, 'comparacion'))
 
-        # Genero columna para el ID tienda
-        debitos_agrupados['numero_operacional'] = pd.to_numeric(debitos_agrupados['punto_operacional'].str.split('-').str[0], errors='coerce')
-
-        # Convierto la columna de valores a su tipo de datos correspondiente
-        debitos_agrupados['valores'] = pd.to_numeric(debitos_agrupados['valores'].str.replace('.',''), errors='coerce')
+        # El cruce con el padron es propio de este reporte (por numero operacional y direccion, con la vida de la tienda)
+        padron = leer_padron(padron, 'progresiones')
 
         # Trabajo sobre el padron
-        # Cambio de nombres en el padron
-        padron.columns = (
-        padron.columns
-        .str.lower()
-        .str.strip()
-        .str.replace(' ', '_', regex=False)
-        .str.replace('m²', 'm', regex=False)
-        .str.replace('.2','')
-        )
-
         # Formateo la fecha para que tenga sentido
         padron['fecha_apertura'] = padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
 
-        # Cambio el nombre de la columna N por "Numero Operacional"
-        padron = padron.rename(columns={'gsx':'numero_operacional'})
-
         # Me aseguro que la columna de fin_de_cierre sea Datetime para realizar una columna auxiliar y quitar la tiendas que esten cerradas por mas de años que causan problemas de duplicados
         padron['fin_de_cierre'] = pd.to_datetime(padron['fin_de_cierre'], format='%m/%d/%Y', errors='coerce')
 
@@ -1275,8 +614,7 @@ def obtener_join_no_comparable(ventas, debitos, padron, mes_comparable:str):
             default=pd.NaT
         )
 
-        # Concateno todos los df (venta, debito y volumen) y lo joineo con el padron
-        df = pd.concat([ventas_agrupado, volumen_agrupado, debitos_agrupados])
+        # Trabajo sobre las tiendas agrupadas de la tabla de hechos para joinearlas con el padron
 
         #Normalizo columna
         df['direccion'] = df['direccion'].str.lower()
@@ -1301,7 +639,7 @@ def obtener_join_no_comparable(ventas, debitos, padron, mes_comparable:str):
         df_join = df_join.rename(columns={'mes':'fecha'})
 
         #Genero columna de Mes
-        df_join['mes'] = df_join['fecha'].str.split(' ').str[0]
+        df_join['mes'] = parte_de_fecha(df_join['fecha'])
 
         #Completo columna Vida
         df_join['vida'] = df_join['vida'].fillna('Tienda Abierta')
@@ -1328,389 +666,89 @@ def progresiones_acumulado_csv(ventas, debitos, padron, mes_comparable:str):
         logger.info("🔁 Iniciando cálculo de progresiones acumuladas")
 
         try:
-            ventas.seek(0)
-            df_ventas_y_volumen = pd.read_csv(ventas, encoding='utf-16', header=1)
-            logger.debug(f"Ventas y Volumen cargado: {df_ventas_y_volumen.shape}")
+            # Tabla de hechos (VCT, VOL sin envases y DEB) ya cruzada con el padron, compartida con los demas reportes
+            hechos = construir_hechos(ventas, debitos, padron, 'progresiones')
+            logger.debug(f"Tabla de hechos cargada: {hechos.shape}")
         except Exception as e:
-            logger.error(f'Error leyendo archivo de ventas: {e}')
-            return f'Error en ventas. {e}'
-
-        try:
-            debitos.seek(0)
-            df_debitos = pd.read_csv(debitos, encoding='utf-16', header=1, sep=',', decimal=',')
-            logger.debug(f"Debitos cargado: {df_debitos.shape}")
-        except Exception as e:
-            logger.error(f'Error leyendo archivo de debitos: {e}')
-            return f'Error en debitos. {e}'
-
-        try:
-            padron.seek(0)
-            df_padron = pd.read_excel(padron, header=17)
-            logger.debug(f"Padron cargado: {df_padron.shape}")
-            padron = df_padron
-        except Exception as e:
-            logger.error(f'Error leyendo archivo de padron: {e}')
-            return f'Error en padron. {e}'
-
-        # Trabajo sobre Ventas y Volumen
-        #Me quedo unicamente con las columnas importantes
-        df_ventas_y_volumen = df_ventas_y_volumen[['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']].copy()
-
-        #Renombro las columnas
-        df_ventas_y_volumen.columns = (df_ventas_y_volumen.columns.str.strip().str.lower().str.replace(" ", "_"))
-        df_ventas_y_volumen.rename(columns={
-        'ventas_c/impuesto':'venta',
-        'venta_en_unidades':'volumen'
-        }, inplace=True)
-
-        #Genero una columna para Obtener el ID tienda
-        df_ventas_y_volumen['numero_operacional'] = df_ventas_y_volumen['punto_operacional'].str.split('-').str[0]
-
-        #Me quedo con las columnas necesarias
-        ventas = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'venta']].copy()
-        volumen = df_ventas_y_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'volumen']].copy()
-
-        #Quito los NA de las columans de valores
-        ventas.dropna(subset=['venta'], how='any', inplace=True)
-        volumen.dropna(subset=['volumen'], how='any', inplace=True)
-
-        logger.debug(f"Valores Nulos Quitados")
-
-        #Realizo transformaciones para quitar carateres y convertir las columnas a valores numericos
-        ventas['venta'] = ventas['venta'].str.replace('.','').str.replace(',','.').astype('float')
-        volumen['volumen'] = volumen['volumen'].str.split(',').str[0].str.replace('.','').astype('int')
-
-        logger.debug(f"Valores transformados a numeros de forma exitosa")
-
-        #Renombro las columnas con valores de ambos DF
-        ventas.rename(columns={
-        'venta':'valores'
-        }, inplace=True)
-
-        volumen.rename(columns={
-        'volumen':'valores'
-        }, inplace=True)
-
-        #Categorizo los valores tanto de volumne como de Ventas
-        ventas['categoria'] = 'VCT'
-        volumen['categoria'] = 'VOL'
-
-        logger.debug(f"columnas categorias generadas con exito")
-
-        #Agrupo las ventas
-        ventas_agrupado = ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        logger.debug(f"Primera agrupacion de ventas {ventas_agrupado.shape}")
-
-        #Quito Envases del Volumen y Agrupo
-        volumen_sin_vol = volumen[~volumen['grupo_de_familia'].str.contains('ENVASES')]
-        volumen_agrupado = volumen_sin_vol.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-
-        logger.debug(f"Se quitaron los envases del volumen y se agrupo el df: {volumen_agrupado.shape}")
-
-        # Trabajo sobre Debitos
-        # Renombro el DF
-        debitos_agrupados = df_debitos.copy()
-
-        logger.debug(f"debitos cargados {debitos_agrupados.shape}")
-
-        # Renombro las columnas como corresponden
-        # Renombro la columna de Debitos a valores
-        debitos_agrupados.columns = debitos_agrupados.columns.str.lower().str.replace(' ','_')
-        debitos_agrupados.rename(columns={
-        'cant._tickets_por_local':'valores'
-        }, inplace=True)
-
-        # Genero una columna Categorica
-        debitos_agrupados['categoria'] = 'DEB'
-
-        logger.debug(f"Columna categoria para debitos generada con exito")
-
-        # Genero columna para el ID tienda
-        debitos_agrupados['numero_operacional'] = debitos_agrupados['punto_operacional'].str.split('-').str[0]
-
-        # Me quedo con las columnas que necesito
-        debitos_agrupados = debitos_agrupados[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'valores']].copy()
-
-        logger.debug(f"Agrupo los debitos {debitos_agrupados.shape}")
-
-        # Quito nulos numericos de la columna valores
-        debitos_agrupados.dropna(subset=['valores'], how='any', inplace=True)
-
-        logger.debug(f"Quito los nulos de los debitos")
-
-        # Convierto la columna de valores a su tipo de datos correspondiente
-        debitos_agrupados['valores'] = debitos_agrupados['valores'].str.replace('.','').astype(int)
-        
-        logger.debug(f"convierto la columan valores de debitos a numeros")
-
-        # Trabajo sobre el padron
-        # Selecciono las columnas que me sirven del padron
-        padron = padron[['GSX', 'NOMBRE', 'Fecha apertura', 'ORGANIZACIÓN ', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']].copy() #type:ignore
-
-        logger.debug(f"cargo el padron {padron.shape}")
-
-        # Cambio de nombres en el padron
-        padron.columns = (
-        padron.columns
-        .str.lower()
-        .str.strip()
-        .str.replace(' ', '_', regex=False)
-        .str.replace('m²', 'm', regex=False)
-        .str.replace('.2','')
-        )
-
-        # Formateo la fecha para que tenga sentido
-        padron['fecha_apertura'] = padron['fecha_apertura'].dt.strftime('%d/%m/%Y')
-
-        # Cambio el nombre de la columna N por "Numero Operacional"
-        padron.rename(columns={'gsx':'numero_operacional'}, inplace=True)
-
-        # Quito los valores nulos utilizando como referencia la columna Numero Operacional, nombre y fecha apertura
-        padron.dropna(subset=['numero_operacional', 'nombre', 'fecha_apertura', mes_comparable[0:3].lower()], how='any', inplace=True)
-
-        # Genero una funcion para convertir los valores de una columna a mayuscula
-        def maysc(df: pd.DataFrame, columna: str):
-            df[columna] = df[columna].str.upper()
-
-        #Aplico la formula a la columna del mes comparable para que todos los valores sean en mayuscula
-        maysc(padron, mes_comparable[0:3].lower())
-
-        # Coloco el numero operacional como numero
-        padron['numero_operacional'] = padron['numero_operacional'].astype(int)
-
-        # Concateno todos los df (venta, debito y volumen) y lo joineo con el padron
-        df = pd.concat([ventas_agrupado, volumen_agrupado, debitos_agrupados])
-
-        logger.debug(f"Concateno todos los df, ventas, debitos y vol {df.shape}")
-
-        # Convierto el ID a numero
-        df['numero_operacional'] = df['numero_operacional'].astype(int)
-
-        # Genero el Join del df Agupado con el Padron con el objetivo de quedarme unicamente con aquellas tiendas Comparables
-        df_join = df.merge(padron, how='left', on='numero_operacional')
-
-        logger.debug(f"Genero un Join con el padron {df_join.shape}")
-
-        # Trabajo sobre Progresiones Total Formato
-        # Me quedo unicamente con las columnas que me sirven del DF Joineado (ACA TENGO LA SC DEL MES)
-        df_join = df_join[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'fecha_apertura', 'fin_de_cierre', 'provincia','categoria', 'valores', mes_comparable[0:3].lower()]].copy()
-
-        logger.debug(f"Join final con padrón: {df_join.shape}, columnas: {df_join.columns.tolist()}")
-
-        #Renombro la Columna Mes a Fecha para Luego generar la Columna Mes Correspondiente
-        df_join.rename(columns={
-            'mes':'fecha'
-        }, inplace=True)
-        df_join['mes'] = df_join['fecha'].str.split(' ').str[0]
-
-        # Filtro unicamente las lineas que sean Superficie Comparable
-        df_join_sc = df_join[df_join[mes_comparable[0:3].lower()] == 'SC'].copy()
-
-        logger.debug(f"Me quedo unicamente con valores comparables {df_join_sc.shape}")
-
-        #Agrupo el df por categoria teniendo en cuenta el mes, ya que este me servirá luego para limitar el periodo comparable y la superficie comparable
-        df_acum_formato = df_join_sc.groupby(['año', 'mes', 'direccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        logger.info("🔄 Generando acumulado a nivel Formato")
-        logger.debug(f"Antes del pivot, DF: {df_join_sc.shape}")
+            logger.error(f'Error leyendo los archivos de ventas, debitos o padron: {e}')
+            return f'Error en los archivos de ventas, debitos o padron. {e}'
 
         #Genero un diccionario con los meses y sus valores numericos de forma auxiliar
         orden_meses = {"Enero":1, "Febrero":2, "Marzo":3, "Abril":4, "Mayo":5, "Junio":6, "Julio":7, "Agosto":8, "Septiembre":9, "Octubre":10, "Noviembre":11, "Diciembre":12}
+        mes_limite = orden_meses[mes_comparable.capitalize()]
 
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        df_acum_formato['aux'] = df_acum_formato['mes'].map(orden_meses)
+        # Me quedo unicamente con las lineas que sean Superficie Comparable en su propio mes, asi el acumulado usa la comparabilidad de cada mes del periodo, y calculo de una sola pasada todos los niveles que muestra el reporte (ACA TENGO LA SC DE CADA MES). Los niveles por sector, seccion y GF quedan solo con VCT y VOL porque los debitos llegan hasta el detalle de tienda
+        niveles = niveles_sc_mensual(hechos, padron, {
+            'total': ['año', 'mes', 'categoria'],
+            'formato': ['año', 'mes', 'direccion', 'categoria'],
+            'provincia': ['año', 'mes', 'direccion', 'provincia', 'categoria'],
+            'tiendas': ['año', 'mes', 'direccion', 'punto_operacional', 'categoria'],
+            'sector': ['año', 'mes', 'direccion', 'sector', 'categoria'],
+            'seccion': ['año', 'mes', 'direccion', 'seccion', 'categoria'],
+            'grupo_de_familia': ['año', 'mes', 'direccion', 'grupo_de_familia', 'categoria'],
+            'tienda_sector': ['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'categoria'],
+            'tienda_seccion': ['año', 'mes', 'direccion', 'punto_operacional', 'seccion', 'categoria'],
+            'tienda_grupo_de_familia': ['año', 'mes', 'direccion', 'punto_operacional', 'grupo_de_familia', 'categoria'],
+            'aperturado': ['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria'],
+        })
 
-        #Limito el periodo del df al mes comparable que quiero
-        mes_limite = orden_meses[mes_comparable.capitalize()]
-        df_acum_formato = df_acum_formato.loc[df_acum_formato['aux'] <= mes_limite]
+        logger.debug(f"Niveles comparables agrupados: { {nombre: nivel.shape for nombre, nivel in niveles.items()} }")
 
-        #Vuelvo a ordenar los meses
-        df_acum_formato = df_acum_formato.sort_values('aux', ascending=True)
+        #En cada nivel mensual renombro la Columna Mes a Fecha y genero la Columna Mes Correspondiente (sobre los niveles ya agrupados y no sobre cada fila)
+        for nivel in niveles.values():
+            if 'mes' in nivel.columns:
+                nivel.rename(columns={
+                    'mes':'fecha'
+                }, inplace=True)
+                nivel['mes'] = parte_de_fecha(nivel['fecha'])
 
-        #Una vez que tengo limitado el df por los meses que me interesan, agrupo el df para quitar el detalle de los meses ya que lo que queremos obtener es la sumatoria de los debitos, ventas y volumen del periodo acumulado indicado
-        df_acum_formato = df_acum_formato.groupby(['categoria'])[[2024, 2025]].sum().reset_index()
+        #Limito un nivel al periodo acumulado hasta el mes comparable
+        def hasta_mes_limite(df: pd.DataFrame):
+            return df.loc[df['mes'].map(orden_meses) <= mes_limite]
 
-        logger.debug(f"Agrupo por año quitando el detalle de los meses: {df_acum_formato.shape}")
+        #Años que se comparan en las tablas del acumulado: el ultimo del reporte y el anterior
+        año_actual = max(int(nivel['año'].max()) for nivel in niveles.values())
+        años = [año_actual - 1, año_actual]
 
-        #Calculo la Progresion
-        df_acum_formato['progresion'] = round((((df_acum_formato[2025] / df_acum_formato[2024]) - 1) * 100), 1)
+        logger.info("🔄 Generando acumulado a nivel Formato")
 
-        logger.debug(f"Calculo la primer progresion a nivel formato")
+        #Limito el nivel al periodo acumulado y calculo la progresion, que ya suma los debitos, ventas y volumen de todos los meses del periodo
+        df_acum_formato = calcular_progresiones(hasta_mes_limite(niveles['formato']), ['categoria'], años=años)
 
         ### Trabajo sobre las provincias
-        #Agrupo el df por categoria teniendo en cuenta el mes, ya que este me servirá luego para limitar el periodo comparable y la superficie comparable
-        df_acum_provincia = df_join_sc.groupby(['año', 'mes', 'direccion', 'provincia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'categoria', 'provincia'], columns='año', aggfunc='sum').reset_index()
-
         logger.info("🔄 Generando acumulado a nivel Provincia")
-        logger.debug(f"Shape antes del pivot provincia: {df_acum_provincia.shape}")
-
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        df_acum_provincia['aux'] = df_acum_provincia['mes'].map(orden_meses)
-
-        #Limito el periodo del df al mes comparable que quiero
-        df_acum_provincia = df_acum_provincia.loc[df_acum_provincia['aux'] <= mes_limite].copy()
 
-        # Una vez que tengo el periodo, ya el mes no me sirve, por eso agrupo por provincia y categoria
-        df_acum_provincia = df_acum_provincia.groupby(['categoria', 'provincia'])[[2024, 2025]].sum().reset_index()
-
-        #calculo las Progresiones
-        df_acum_provincia['progresion'] = round((((df_acum_provincia[2025] / df_acum_provincia[2024]) - 1) * 100), 1)
-
-        #Pivot para mostrar mejora la info
-        df_acum_provincia = df_acum_provincia.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index='provincia', aggfunc='sum').sort_values(('progresion', 'VOL'), ascending=False)
+        df_acum_provincia = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['provincia']), ['provincia', 'categoria']), 'provincia').sort_values(('progresion', 'VOL'), ascending=False)
 
         logger.debug(f"Trabajo sobre el df Provincia {df_acum_provincia.shape}")
 
         ### Trabajo sobre las tiendas
-        df_acum_tiendas = df_join_sc.groupby(['año', 'mes', 'direccion', 'categoria', 'punto_operacional'])['valores'].sum().reset_index().pivot_table(values='valores', index=['mes', 'categoria', 'punto_operacional'], columns='año', aggfunc='sum').reset_index()
-
         logger.info("🔄 Generando acumulado a nivel Tiendas")
-        logger.debug(f"Shape antes del pivot provincia: {df_acum_tiendas.shape}")
 
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        df_acum_tiendas['aux'] = df_acum_tiendas['mes'].map(orden_meses)
-
-        #Limito el periodo del df al mes comparable que quiero
-        df_acum_tiendas = df_acum_tiendas.loc[df_acum_tiendas['aux'] <= mes_limite].copy()
-
-        #Vuelvo a ordenar los meses
-        df_acum_tiendas = df_acum_tiendas.sort_values('aux', ascending=True)
-
-        #Una vez que tengo limitado el df por los meses que me interesan, agrupo el df para quitar el detalle de los meses ya que lo que queremos obtener es la sumatoria de los debitos, ventas y volumen del periodo acumulado indicado
-        df_acum_tiendas = df_acum_tiendas.groupby(['punto_operacional', 'categoria'])[[2024, 2025]].sum().reset_index()
-
-        #Calculo la Progresion
-        df_acum_tiendas['progresion'] = round((((df_acum_tiendas[2025] / df_acum_tiendas[2024]) - 1) * 100), 1)
-        df_acum_tiendas = df_acum_tiendas.pivot_table(values=[2024, 2025, 'progresion'], columns='categoria', index='punto_operacional', aggfunc='sum').sort_values(('progresion', 'VOL'), ascending=False)
+        df_acum_tiendas = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['tiendas']), ['punto_operacional', 'categoria']), 'punto_operacional').sort_values(('progresion', 'VOL'), ascending=False)
 
         logger.debug(f"Trabajo sobre las prog acum por tienda {df_acum_tiendas.shape}")
 
-        ### Trabajo con VOL y VCT por Sector, Seccion y GF
-        #Concateno las ventas con el volumen sin Envases con el objetivo de agruparlo por sus distintas carecteristicas y  asi conseguir las progresiones totales por Sector, seccion y grupo de familia
-        acumulado_venta_volumen = pd.concat([ventas, volumen_sin_vol])
-
-        logger.info("🔄 Generando concat de VOL y VCT Solamente")
-        logger.debug(f"Shape antes del concat: {acumulado_venta_volumen.shape}")
-
-        #Convierto la columna Numero Operacional para realizar el merge con el padron
-        acumulado_venta_volumen['numero_operacional'] = acumulado_venta_volumen['numero_operacional'].astype(int) 
-        acumulado_venta_volumen = acumulado_venta_volumen.merge(padron, how='left', on='numero_operacional')
-
-        logger.info("🔄 Generando Join de la venta y el vol con el padron")
-
-        #Me quedo unicamente con las columnas que me sirven y los valores comparables
-        acumulado_venta_volumen = acumulado_venta_volumen[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia','fecha_apertura', 'fin_de_cierre', 'provincia', 'categoria', 'valores', mes_comparable[0:3].lower()]]
-        acumulado_venta_volumen = acumulado_venta_volumen[acumulado_venta_volumen[mes_comparable[0:3].lower()] == 'SC'].copy() 
-
-        #Renomrbo la columna mes a fecha y genero la columna de mes correcta
-        acumulado_venta_volumen.rename(columns={
-            'mes':'fecha'
-        }, inplace=True)
-        acumulado_venta_volumen['mes'] = acumulado_venta_volumen['fecha'].str.split(' ').str[0]
-
-        #Genero una columna auziliar para ordenar los meses y luego limitar el periodo
-        acumulado_venta_volumen['aux'] = acumulado_venta_volumen['mes'].map(orden_meses)
-
-        #Limito el periodo del df al mes comparable que quiero
-        acumulado_venta_volumen = acumulado_venta_volumen.loc[acumulado_venta_volumen['aux'] <= mes_limite].copy()
-
-        #Vuelvo a ordenar los meses
-        acumulado_venta_volumen = acumulado_venta_volumen.sort_values('aux', ascending=True)
-
-        #Agrupo y trabajo por Sector
-        acumulado_venta_volumen_sector = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index()
-
-        logger.info("🔄 Agrupo por Sector Ventas y VOL")
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_sector = acumulado_venta_volumen_sector.groupby(['año', 'mes', 'direccion', 'sector', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['sector', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        logger.info("🔄 Pivot VOL Y VCT por Sector")
-
-        #Genero la Progresion
-        acumulado_venta_volumen_sector['progresion'] = round(((acumulado_venta_volumen_sector[2025] / acumulado_venta_volumen_sector[2024])-1)*100,1)
-
-        logger.info("🔄 Genero Progresiones")
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_sector = acumulado_venta_volumen_sector.pivot_table(values=[2024, 2025, 'progresion'], index='sector', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        ### Agrupo y Trabajo por Seccion
-        acumulado_venta_volumen_seccion = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index()
+        ### Trabajo con VOL y VCT por Sector, Seccion y GF, limitados al periodo acumulado
+        #Genero las Progresiones y las disponibilizo en formato wide y no long
+        acumulado_venta_volumen_sector = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['sector']), ['sector', 'categoria']), 'sector').sort_values(by=('progresion', 'VOL'), ascending=False)
+        acumulado_venta_volumen_seccion = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['seccion']), ['seccion', 'categoria']), 'seccion').sort_values(by=('progresion', 'VOL'), ascending=False)
+        acumulado_venta_volumen_grupo_de_familia = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['grupo_de_familia']), ['grupo_de_familia', 'categoria']), 'grupo_de_familia').sort_values(by=('progresion', 'VOL'), ascending=False)
 
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_seccion = acumulado_venta_volumen_seccion.groupby(['año', 'mes', 'direccion', 'seccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['seccion', 'categoria'], columns='año', aggfunc='sum').reset_index()
+        logger.info("🔄 Finalizo los Sectores, Secciones y Grupos de Familia")
 
-        #Genero la Progresion
-        acumulado_venta_volumen_seccion['progresion'] = round(((acumulado_venta_volumen_seccion[2025] / acumulado_venta_volumen_seccion[2024])-1)*100,1)
+        #Lo mismo por Tienda / Sector, Seccion y GF
+        acumulado_venta_volumen_tienda_sector = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['tienda_sector']), ['punto_operacional', 'sector', 'categoria']), ['punto_operacional', 'sector']).sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
+        acumulado_venta_volumen_tienda_seccion = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['tienda_seccion']), ['punto_operacional', 'seccion', 'categoria']), ['punto_operacional', 'seccion']).sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
+        acumulado_venta_volumen_tienda_grupo_de_familia = formato_ancho(calcular_progresiones(hasta_mes_limite(niveles['tienda_grupo_de_familia']), ['punto_operacional', 'grupo_de_familia', 'categoria']), ['punto_operacional', 'grupo_de_familia']).sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
 
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_seccion = acumulado_venta_volumen_seccion.pivot_table(values=[2024, 2025, 'progresion'], index='seccion', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        logger.info("🔄 Finalizo las secciones")
-
-        ### Agrupo y trabajo por grupo de familia
-        acumulado_venta_volumen_grupo_de_familia = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_grupo_de_familia = acumulado_venta_volumen_grupo_de_familia.groupby(['año', 'mes', 'direccion', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['grupo_de_familia', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_grupo_de_familia['progresion'] = round(((acumulado_venta_volumen_grupo_de_familia[2025] / acumulado_venta_volumen_grupo_de_familia[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_grupo_de_familia = acumulado_venta_volumen_grupo_de_familia.pivot_table(values=[2024, 2025, 'progresion'], index='grupo_de_familia', columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False)
-
-        logger.info("🔄 Finalizo los Grupos de Familia")
-
-        #Agrupo y trabajo por Tienda / Sector
-        acumulado_venta_volumen_tienda_sector = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_tienda_sector = acumulado_venta_volumen_tienda_sector.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['sector', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_tienda_sector['progresion'] = round(((acumulado_venta_volumen_tienda_sector[2025] / acumulado_venta_volumen_tienda_sector[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_tienda_sector = acumulado_venta_volumen_tienda_sector.pivot_table(values=[2024, 2025, 'progresion'], index=['punto_operacional', 'sector'], columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
-
-        logger.info("🔄 Finalizo los sectores por Tienda")
-
-        #Agrupo y trabajo por Tienda / Seccion
-        acumulado_venta_volumen_tienda_seccion = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_tienda_seccion = acumulado_venta_volumen_tienda_seccion.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'seccion', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['seccion', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_tienda_seccion['progresion'] = round(((acumulado_venta_volumen_tienda_seccion[2025] / acumulado_venta_volumen_tienda_seccion[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_tienda_seccion = acumulado_venta_volumen_tienda_seccion.pivot_table(values=[2024, 2025, 'progresion'], index=['punto_operacional', 'seccion'], columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
-
-        logger.info("🔄 Finalizo las secciones por Tienda")
-
-        #Agrupo y trabajo por Tienda / GF
-        acumulado_venta_volumen_tienda_grupo_de_familia = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
-
-        #Pivoteo la Info para generar las Progresiones
-        acumulado_venta_volumen_tienda_grupo_de_familia = acumulado_venta_volumen_tienda_grupo_de_familia.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index().pivot_table(values='valores', index=['grupo_de_familia', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-
-        #Genero la Progresion
-        acumulado_venta_volumen_tienda_grupo_de_familia['progresion'] = round(((acumulado_venta_volumen_tienda_grupo_de_familia[2025] / acumulado_venta_volumen_tienda_grupo_de_familia[2024])-1)*100,1)
-
-        #Pivoteo la Informacion para disponibilizar la informacion en formato wide y no long
-        acumulado_venta_volumen_tienda_grupo_de_familia = acumulado_venta_volumen_tienda_grupo_de_familia.pivot_table(values=[2024, 2025, 'progresion'], index=['punto_operacional', 'grupo_de_familia'], columns='categoria', aggfunc='sum').sort_values(by=('progresion', 'VOL'), ascending=False).reset_index()
-
-        logger.info("🔄 Finalizo los Grupos de Familia por Tienda")
+        logger.info("🔄 Finalizo los Sectores, Secciones y Grupos de Familia por Tienda")
 
         #Aperturo para dejar toda la informacion lista para que el usuario realice una tabla Pivot y tenga todo de forma  compacta
-        if df_join_sc['direccion'].unique()[0] != 'PROXIMIDAD':
-            acumulado_venta_volumen_total = acumulado_venta_volumen.groupby(['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria'])['valores'].sum().reset_index()
+        if niveles['formato']['direccion'].iloc[0] != 'PROXIMIDAD':
+            acumulado_venta_volumen_total = hasta_mes_limite(niveles['aperturado'])[['año', 'mes', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'categoria', 'valores']].reset_index(drop=True)
 
-        logger.debug(f"Uso de memoria previo al ExcelWriter: {round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2)} MB")
+        logger.debug(f"Uso de memoria previo al ExcelWriter: {round(hechos.memory_usage(deep=True).sum() / 1024 ** 2, 2)} MB")
 
         try:
             output = io.BytesIO()
@@ -1718,7 +756,7 @@ def progresiones_acumulado_csv(ventas, debitos, padron, mes_comparable:str):
                 logger.info("💾 Comenzando a escribir CSVs en un ZIP en memoria")
 
                 # Guardar cada DataFrame como CSV en el ZIP
-                zf.writestr(f"01 Prog Acum {df_join_sc['direccion'].unique()[0]} SC.csv", df_acum_formato.to_csv(index=True))
+                zf.writestr(f"01 Prog Acum {niveles['formato']['direccion'].iloc[0]} SC.csv", df_acum_formato.to_csv(index=True))
                 zf.writestr("02 Prog Acum Provincia SC.csv", df_acum_provincia.to_csv(index=True))
                 zf.writestr("03 Prog Acum Tiendas SC.csv", df_acum_tiendas.to_csv(index=True))
                 zf.writestr("04 Prog Acum Sector SC.csv", acumulado_venta_volumen_sector.to_csv(index=True))
@@ -1729,7 +767,7 @@ def progresiones_acumulado_csv(ventas, debitos, padron, mes_comparable:str):
                 zf.writestr("09 Prog GF x Tienda SC.csv", acumulado_venta_volumen_tienda_grupo_de_familia.to_csv(index=True))
 
                 # En caso de que el formato NO sea Proximidad → agregar esta tabla
-                if df_join_sc['direccion'].unique()[0] != 'PROXIMIDAD':
+                if niveles['formato']['direccion'].iloc[0] != 'PROXIMIDAD':
                     zf.writestr("Prog Aperturado x Tienda SC.csv", acumulado_venta_volumen_total.to_csv(index=True))
 
             output.seek(0)
@@ -1743,6 +781,16 @@ def progresiones_acumulado_csv(ventas, debitos, padron, mes_comparable:str):
     except Exception as e:
         return f'Error a la hora de generar calculos. Error: {e}'
     
+def precalentar_reportes(ventas, debitos, padron):
+    """
+    Deja armado en la cache lo que comparten los reportes sobre estos extractos: las tablas de hechos de progresiones y de comparacion, todos los niveles del acumulado con la SC de cada mes y la matriz de comparabilidad del padron. Lo llama el precalentado (ver iniciar_precalentado) cuando llegan extractos nuevos a la carpeta compartida.
+
+    El briefing no se precalienta: usa su propio extracto de 28 dias moviles, no el de ventas de las progresiones.
+    """
+    hechos = construir_hechos(ventas, debitos, padron, 'progresiones')
+    niveles_sc_mensual(hechos, padron, NIVELES_ACUMULADO)
+    construir_hechos(ventas, debitos, padron, 'comparacion')
+
 def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_por_sector, historico_ventas, historico_volumen, historico_debitos, mes_comparable:str):
     
     '''
@@ -1768,68 +816,21 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
 
     '''
     try:
-        # Seleccionoco las columnas con las que voy a trabajar del reporte de ventas y volumen para optimizar la carga de datos
-        cols = ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Sector', 'Seccion', 'Grupo de Familia', 'Ventas c/impuesto', 'Venta en Unidades']
-        # Leo el df de ventas y volumen
+        # Leo las ventas y el volumen y calculo de una sola pasada los niveles que usa el briefing: por tienda, por tienda y sector, y el volumen por grupo de familia. Se calculan una vez por extracto (o los deja listos el precalentado)
         try:
-            df_ventas_vol = pd.read_csv(ventas_y_volumen_por_tienda, encoding='utf-16', header=1, usecols=cols, decimal=',')
+            niveles = niveles_ventas(ventas_y_volumen_por_tienda)
 
         except Exception as e:
             return f'Error a la hora de cargar las Ventas y el Volumen. ERROR: {e}'
-        
-        # Estandarizo el nombre de las columnas
-        df_ventas_vol.columns = df_ventas_vol.columns.str.lower().str.replace(' ','_')
-
-        # Renombro columnas para que tenga mas sentido
-        df_ventas_vol = df_ventas_vol.rename(columns=
-            {
-                'mes':'fecha',
-                'ventas_c/impuesto':'vct',
-                'venta_en_unidades':'vol'
-            }
-        )
-
-        # Genero una columna para obtener el valor del MES solo
-        df_ventas_vol['mes'] = df_ventas_vol['fecha'].str.split(' ').str[0]
-
-        # Genero una columna para obtener el NUMERO operacional de la tienda y lo convierto a numero
-        df_ventas_vol['numero_operacional'] = df_ventas_vol['punto_operacional'].str.split(' ').str[0].astype(int)
-
-        # Divido el df de Ventas y Volumen en uno solo de Ventas, y otro solo de Volumen!
-        df_ventas = df_ventas_vol[['año', 'fecha', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'vct', 'mes', 'numero_operacional']]
-        df_volumen = df_ventas_vol[['año', 'fecha', 'direccion', 'punto_operacional', 'sector', 'seccion', 'grupo_de_familia', 'vol', 'mes', 'numero_operacional']]
-
-        # Renombro la columna donde se encuentran los valores a "valores". Esto me servirá luego para realizar un concat
-        df_ventas = df_ventas.rename(columns={'vct':'valores'})
-        df_volumen = df_volumen.rename(columns={'vol':'valores'})
-
-        # Genero una columna categorica para distinguir cuales son los valores de las ventas , y cuales son los valores del volumen
-        df_ventas['categoria'] = 'vct'
-        df_volumen['categoria'] = 'vol'
-
-        # Genero una transformacion en la columna valores para obtener un dtype correspondiente, ya que al leer los archivos, la columna valores queda como un string y no detecta de forma correcta los puntos y las comas
-        df_ventas['valores'] = pd.to_numeric(df_ventas['valores'].str.replace('.', '').str.replace(',','.'))
-        df_volumen['valores'] = pd.to_numeric(df_volumen['valores'].str.replace('.', '').str.replace(',','.'))
-
-        # Le quito los envases al volumen
-        df_volumen = df_volumen[~df_volumen['grupo_de_familia'].isin(['ENVASES BEBIDAS', 'ENVASES PAGADOS'])]
-
-        # Una vez que ambos df estan limpios y ordenados, los agrupo para elevar su jerarquia hasta la tienda, ya que el sector, seccion y grupo de familia no son necesarios para calular las progresiones POR TIENDA
-        df_ventas_tienda = df_ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
-        df_volumen_tienda = df_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria'])['valores'].sum().reset_index()
 
         # Cargo y trabajo sobre el PADRON
-        # Cargo unicamente las columnas que me van a servir
-        cols = ['GSX', 'NOMBRE', 'Fecha apertura', 'BANDERA', 'ORGANIZACIÓN ', 'PROVINCIA', 'FIN DE CIERRE', 'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']
-
-        # Leo el Padron
+        # Leo unicamente las columnas que me van a servir
         try:
-            padron = pd.read_excel(padron, header=17, usecols=cols)
+            # La matriz tienda x mes de comparabilidad se usa en las progresiones historicas, donde cada mes tiene su propia SC
+            matriz_sc = matriz_comparable(padron)
+            padron = leer_padron(padron, 'briefing')
         except Exception as e:
             return f'Error a la hora de cargar el Padron. ERROR: {e}'
-        
-        # Estandarizo los nombres de las columnas del padron
-        padron.columns = padron.columns.str.lower().str.strip().str.replace(' ', '_').str.replace('.2', '')
 
         meses_dict = {
         'enero': 'ene',
@@ -1850,9 +851,6 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         if not columna_mes:
             raise ValueError(f"Mes '{mes_comparable}' no reconocido. Usá un nombre completo (por ejemplo: 'Octubre').")
         
-        # Renombro algunas columnas para que tengan mas sentido
-        padron = padron.rename(columns={'gsx':'numero_operacional'})
-
         # Elimino las filas que tengan NA en su numero, nombre o mes comparable
         padron = padron.dropna(subset=['numero_operacional', 'nombre', columna_mes], how='any')
 
@@ -1862,32 +860,18 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         # Trabajo sobre los Debitos TOTALES por Tienda
         # Cargo el archivo CSV
         try:
-            df_debitos_tienda = pd.read_csv(debitos_por_tienda, encoding='utf-16', header=1, decimal=',')
+            df_debitos_tienda = leer_insumo(debitos_por_tienda, 'debitos', 'briefing')
         except Exception as e:
             return f'Error a la hora de cargar los Debitos. ERROR: {e}'
 
-        # Estandarizo las columnas
-        df_debitos_tienda.columns = df_debitos_tienda.columns.str.lower().str.replace(' ', '_')
-
-        # Renombro columnas para que tengan mas sentido
-        df_debitos_tienda =df_debitos_tienda.rename(columns=
-            {
-            'cant._tickets_por_local':'valores',
-            'mes':'fecha',
-            }
-        )
-
-        # Convierto la columna de valores a numero
-        df_debitos_tienda['valores'] = pd.to_numeric(df_debitos_tienda['valores'].str.replace('.', '').str.replace(',','.'))
-
         # Genero una columna de MES
-        df_debitos_tienda['mes'] = df_debitos_tienda['fecha'].str.split(' ').str[0]
+        df_debitos_tienda['mes'] = parte_de_fecha(df_debitos_tienda['fecha'])
         
         # Genero una columna para obtener el Numero de Tienda y convertirlo a INT
-        df_debitos_tienda['numero_operacional'] = df_debitos_tienda['punto_operacional'].str.split(' ').str[0].astype(int)
+        df_debitos_tienda['numero_operacional'] = numero_operacional(df_debitos_tienda['punto_operacional'], ' ', errors='raise')
 
         # Elimino las columnas que no me sirven
-        df_debitos_tienda = df_debitos_tienda.drop(columns=['indicadores', 'fecha'])
+        df_debitos_tienda = df_debitos_tienda.drop(columns=['fecha'])
         
         # Genero una columna categorica para distinguir los debitos una vez que realice un concat con el volumen y las ventas
         df_debitos_tienda['categoria'] = 'deb'
@@ -1896,7 +880,7 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         df_debitos_tienda = df_debitos_tienda[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'valores']]
 
         # Concateno todo a NIVEL TIENDA y Realizo un Join con el Padron
-        df_tienda = pd.concat([df_ventas_tienda, df_debitos_tienda, df_volumen_tienda])
+        df_tienda = concat_dimensiones([niveles['tienda'], df_debitos_tienda])
         df_tienda['numero_operacional'] = df_tienda['numero_operacional'].astype(int)
 
         # Realizo el Join con el Padron
@@ -1911,56 +895,29 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         # Genero una copia del df con TODOS LOS VALORES para obtener sus progresiones tambien por Superficie TOTAL. Esto es util para el briefing de Maxi ya que tiene graficos a nivel total y por sup comparable
         df_tienda_no_comparable = df_tienda_join
 
-        # Pivoteo la Informacion con el objetivo de llevar los valores por Año a las columnas y asi realizar el calculo de progresiones. Esto lo hago tanto para el df con valores comparables y valores total. EN ESTE PASO ESTOY CALCULANDO LAS PROGRESIONES POR TIENDA
-        df_tienda_comparable = df_tienda_comparable.pivot_table(values='valores', index=['direccion', 'numero_operacional', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-        df_tienda_comparable['progresion'] = round((df_tienda_comparable[2025] / df_tienda_comparable[2024]) - 1, 3)
-        df_tienda_comparable = df_tienda_comparable.sort_values(by='progresion', ascending=False)
-
-        df_tienda_no_comparable = df_tienda_no_comparable.pivot_table(values='valores', index=['direccion', 'numero_operacional', 'punto_operacional', 'categoria'], columns='año', aggfunc='sum').reset_index()
-        df_tienda_no_comparable['progresion'] = round((df_tienda_no_comparable[2025] / df_tienda_no_comparable[2024]) - 1, 3)
-        df_tienda_no_comparable = df_tienda_no_comparable.sort_values(by='progresion', ascending=False)
+        # Las progresiones comparan el ultimo año de la muestra contra el anterior, asi el reporte no depende de años fijos
+        año_actual = int(df_tienda_join['año'].max())
+        año_anterior = año_actual - 1
+        años = [año_anterior, año_actual]
 
-        # Genero un DF Auxiliar en este punto para luego concatenarlo con otros y asi tener una bajada consolidada de toda la informacion utilizada con el objetivo proximo re realizar un giratorio en Excel
-        df_tienda_comparable_aux = df_tienda_comparable
-
-        # Pivoteo la Informacion con el objetivo de llevar los valores por Año a las columnas y asi realizar el calculo de progresiones. Esto lo hago tanto para el df con valores comparables y valores total. EN ESTE PASO ESTOY CALCULANDO LAS PROGRESIONES POR FORMATO
-        df_formato_comparable = df_tienda_comparable.groupby(['direccion', 'categoria'])[[2024, 2025]].sum().reset_index()
-        df_formato_comparable['progresion'] = round(df_formato_comparable[2025] / df_formato_comparable[2024] - 1, 3)
-        df_formato_comparable_final = df_formato_comparable.sort_values(['categoria'])
-
-        df_formato_no_comparable = df_tienda_no_comparable.groupby(['direccion', 'categoria'])[[2024, 2025]].sum().reset_index()
-        df_formato_no_comparable['progresion'] = round(df_formato_no_comparable[2025] / df_formato_no_comparable[2024] - 1, 3)
-        df_formato_no_comparable_final = df_formato_no_comparable.sort_values(['categoria'])
-
-        # Una vez que ya tengo calculadas las progresiones por Formato y por Tienda, me falta calcular las progresiones por TIENDA y SECTOR. Ya que en el briefing la forma de mostrar las progresiones en principio es por Tienda y Formato, y luego se le coloca la progresion TOTAL de la tienda a la derecha de todo.
+        # Una vez que ya tengo los valores por Tienda, me falta traer los valores por TIENDA y SECTOR. Ya que en el briefing la forma de mostrar las progresiones en principio es por Tienda y Formato, y luego se le coloca la progresion TOTAL de la tienda a la derecha de todo.
 
         # Comienzo por Importar los Debitos por Sector
         try:
-            df_debitos_sector = pd.read_csv(debitos_por_sector, encoding='utf-16', header=1, decimal=',')
+            df_debitos_sector = leer_insumo(debitos_por_sector, 'debitos_sector', 'briefing')
         except Exception as e:
             return f'Error a la hora de cargar los Debitos por Sector. ERROR: {e}'
 
         # Realizo las mismas transformaciones para los otros df, pero esta vez, para los debitos por sector
-        df_debitos_sector.columns = df_debitos_sector.columns.str.strip().str.lower().str.replace(' ', '_')
-        df_debitos_sector = df_debitos_sector.rename(columns=
-            {
-            'cantidad_de_tickets':'valores',
-            'mes':'fecha'
-            }
-        )
-        df_debitos_sector = df_debitos_sector.drop(columns=['indicadores'])
-        df_debitos_sector['mes'] = df_debitos_sector['fecha'].str.split(' ').str[0]
-        df_debitos_sector['numero_operacional'] = df_debitos_sector['punto_operacional'].str.split(' ').str[0]
+        df_debitos_sector['mes'] = parte_de_fecha(df_debitos_sector['fecha'])
+        df_debitos_sector['numero_operacional'] = numero_operacional(df_debitos_sector['punto_operacional'], ' ')
         df_debitos_sector['categoria'] = 'deb'
-        df_debitos_sector['valores'] = pd.to_numeric(df_debitos_sector['valores'].str.replace('.', '').str.replace(',','.'))
 
-        # Una vez que ya tengo los Debitos por Sector limpio y ordenado, me aseguro de agrupar el volumen sin envases y las ventas de igual forma, POR SECTOR
-        df_ventas_sector = df_ventas.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector'])['valores'].sum().reset_index()
-        df_volumen_sector = df_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector'])['valores'].sum().reset_index()
+        # Una vez que ya tengo los Debitos por Sector limpio y ordenado, los ordeno igual que el nivel POR SECTOR del volumen sin envases y las ventas
         df_debitos_sector = df_debitos_sector[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', 'valores']]
 
         # En este punto ya puedo concatenar los tres df y asi obtener uno solo consolidado para trabajar mas comodo
-        df_sector = pd.concat([df_ventas_sector, df_volumen_sector, df_debitos_sector])
+        df_sector = concat_dimensiones([niveles['sector'], df_debitos_sector])
         df_sector['numero_operacional'] = df_sector['numero_operacional'].astype(int) 
 
         # Realizo un Join con el Padron y asi poder Filtrar los valores comparables, ya que los calculos de las progresiones por SECTOR son SIEMPRE COMPARABLES
@@ -1968,50 +925,9 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         df_sector_join = df_sector_join[['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'provincia', 'fecha_apertura', 'fin_de_cierre', 'categoria', 'sector', columna_mes, 'valores']]
         df_sector_comparable = df_sector_join[df_sector_join[columna_mes] == 'SC']
 
-        # Pivoteo la Info, coloco los años en las columnas y asi calculo las progresiones por Categoria (VCT, VOL y DEB) y Sector
-        df_sector_comparable = df_sector_comparable.pivot_table(values='valores', index=['direccion' ,'numero_operacional', 'punto_operacional', 'categoria', 'sector'], columns='año', aggfunc='sum').reset_index()
-        df_sector_comparable['progresion'] = round((df_sector_comparable[2025] / df_sector_comparable[2024]) - 1, 3)
-
-        # Sirve luego para calcular las progresiones por SECTOR a nivel FORMATO
-        df_formato_sector_comparable = df_sector_comparable
-
-        # DF auxiliar para realizar una baja consolidada de informacion
-        df_formato_sector_comparable_aux = df_formato_sector_comparable
-
-        # Pivoteo la Informacion para mostrar las progresiones por Sector
-        df_progresiones_categoria_sectores = df_sector_comparable.pivot_table(values='progresion', index=['numero_operacional', 'punto_operacional', 'categoria'], columns='sector', aggfunc='sum').reset_index()
-
-        # Aqui vuelvo a trabajar sobre el DF que contiene las progresiones a NIVEL TIENDA ya que ahora que tengo las progresiones por sector, tengo que unir las progresiones TOTAL TIENDA a las que estan aperturadas por SECTOR. Es por esto que renombro una de sus columnas para luego realizar un concat
-        df_tienda_comparable = df_tienda_comparable.rename(columns={'progresion':'total_tienda'})
-
-        # Ahora trabajo con un df auxiliar generado arriba para obtener las progresiones por SECTOR a Nivel FORMATO cerrado.
-        df_formato_sector_comparable = df_formato_sector_comparable.groupby(['direccion', 'categoria', 'sector'])[[2024, 2025]].sum().reset_index()
-        df_formato_sector_comparable['progresion'] = round(df_formato_sector_comparable[2025] / df_formato_sector_comparable[2024] - 1, 3)
-        df_formato_sector_comparable = df_formato_sector_comparable.pivot_table(values='progresion', index=['direccion', 'categoria'], columns='sector', aggfunc='sum').reset_index()
-        df_formato_sector_comparable = df_formato_sector_comparable.fillna(0)
-
-        # Realizo un JOIN entre el DF que contiene las Progresiones a NIVEL SECTOR con el DF que contiene las progresiones a nivel TIENDA, lo limpio, ordeno y presento
-        df_progresiones_join_sector_tienda = pd.merge(df_progresiones_categoria_sectores, df_tienda_comparable[['direccion', 'numero_operacional', 'categoria', 'total_tienda']], on=['numero_operacional', 'categoria'], how='left')
-        df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.fillna(0)
-        df_progresiones_join_sector_tienda.columns = df_progresiones_join_sector_tienda.columns.str.capitalize().str.strip().str.replace('_', ' ')
-        df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.drop(columns=['Numero operacional'])
-        df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.rename(columns={'Total tienda': 'Total tienda', 'P.g.c.': 'PGC'})
-        df_progresiones_join_sector_tienda = df_progresiones_join_sector_tienda.sort_values(by='Total tienda', ascending=False)
-
-        # Trabajo ahora para ordenar y concatenar el DF con las Progresiones por Tienda y por Sector para realizar una bajada consolidada donde en una misma vista, tenga en las columnas los valores de las progresiones por VCT, DEB y VOL, aperturado por Sector y Joineado con el Total tienda de esa CATEGORIA
-        df_final_consolidado_tienda = df_tienda_comparable.drop(columns=[2024, 2025])
-        df_final_consolidado_tienda = df_final_consolidado_tienda.rename(columns={'total_tienda':'progresion'})
-        df_final_consolidado_tienda['sector'] = 'Total'
-
-        df_final_consolidado_sector = df_sector_comparable.drop(columns=[2024, 2025])
-        df_final_consolidado_sector[['direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'progresion', 'sector']]
-
-        df_final_consolidado_total = pd.concat([df_final_consolidado_sector, df_final_consolidado_tienda])
-        df_final_consolidado_total = df_final_consolidado_total.pivot_table(values='progresion', index=['direccion', 'punto_operacional'], columns=['categoria', 'sector'], aggfunc='sum').reset_index()
-
-        # Ya que ahora tengo las primeras tablas con sus progresiones, comienzo a trabajar sobre el ultimo apartado, especifico sobre el volumen y su apertura por GRUPO DE FAMILIA
-        # Agrupo el DF de Volumen que ya tenia cargado hasta GF
-        df_volumen_grupo_de_familia = df_volumen.groupby(['año', 'mes', 'direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', 'seccion', 'grupo_de_familia'])['valores'].sum().reset_index()
+        # Comienzo a trabajar sobre el ultimo apartado, especifico sobre el volumen y su apertura por GRUPO DE FAMILIA
+        # Tomo el volumen del nivel por GF que ya tenia calculado
+        df_volumen_grupo_de_familia = niveles['grupo_de_familia'][niveles['grupo_de_familia']['categoria'] == 'vol']
 
         # Lo Joineo con el Padron
         df_volumen_grupo_de_familia_join = pd.merge(df_volumen_grupo_de_familia, padron[['numero_operacional', columna_mes]], on='numero_operacional', how='left')
@@ -2019,100 +935,39 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         # Me quedo unicamente con los valores comparables
         df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_join[df_volumen_grupo_de_familia_join[columna_mes] == 'SC']
 
-        # Pivoteo la informacion para colocar los años como columnas y asi poder calcular las progresiones, el GAP y la CMG
-        df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.pivot_table(values='valores', index=['direccion', 'grupo_de_familia', 'seccion', 'categoria'], columns='año', aggfunc='sum').reset_index()
-        df_volumen_grupo_de_familia_comparable[2024] = df_volumen_grupo_de_familia_comparable[2024].fillna(0)
-        df_volumen_grupo_de_familia_comparable['GAP'] = df_volumen_grupo_de_familia_comparable[2025] - df_volumen_grupo_de_familia_comparable[2024]
-        df_volumen_grupo_de_familia_comparable['progresion'] = (df_volumen_grupo_de_familia_comparable[2025] / df_volumen_grupo_de_familia_comparable[2024]) - 1
-        df_volumen_grupo_de_familia_comparable['progresion'] = df_volumen_grupo_de_familia_comparable['progresion'].replace(np.inf, 0)
-        df_volumen_grupo_de_familia_comparable['progresion'] = df_volumen_grupo_de_familia_comparable['progresion'].replace(np.nan, 0)
-        df_volumen_grupo_de_familia_comparable.sort_values('progresion', ascending=False)
-
-        # Genero una columnas Auxiliar que contenga el Total 2024 por Formato para asi luego calcular la CMG de forma mas facil (Vectorizada) y ahorrar rendimiento
-        df_volumen_grupo_de_familia_comparable['total_2024_direccion'] = df_volumen_grupo_de_familia_comparable.groupby('direccion')[2024].transform('sum')
-        df_volumen_grupo_de_familia_comparable['Cmg'] = df_volumen_grupo_de_familia_comparable['GAP'] / df_volumen_grupo_de_familia_comparable['total_2024_direccion']
-        df_volumen_grupo_de_familia_comparable['Cmg'] = df_volumen_grupo_de_familia_comparable['Cmg'].fillna(0)
-        df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.sort_values('Cmg', ascending=False)
-        df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.rename(columns={'direccion':'Direccion','grupo_de_familia':'Grupo de familia', 'seccion':'Seccion', 'categoria':'Categoria', 'progresion':'Progresion'})
-        df_volumen_grupo_de_familia_comparable = df_volumen_grupo_de_familia_comparable.drop(columns=['total_2024_direccion'])
-
-        # Ordeno y Concateno todos los DF auxiliares que fui generando para obtener una sola bajada de informacion y en un futuro confeccionar un Giratorio
-        # Genero un DF auxiliar para realizar una bajada consolidada de informacion para generar un giratorio
-        df_tienda_comparable_aux['sector'] = ''
-        df_tienda_comparable_aux = df_tienda_comparable_aux[['direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', 2024, 2025, 'progresion']]
-        df_tienda_comparable_aux['aux'] = 'tienda'
-
-        df_formato_comparable_aux = df_formato_comparable.copy()
-        df_formato_comparable_aux['sector'] = ''
-        df_formato_comparable_aux['numero_operacional'] = ''
-        df_formato_comparable_aux['punto_operacional'] = ''
-        df_formato_comparable_aux = df_formato_comparable_aux[['direccion', 'numero_operacional', 'punto_operacional', 'categoria', 'sector', 2024, 2025, 'progresion']]
-        df_formato_comparable_aux['aux'] = 'formato'
-
-        df_formato_sector_comparable_2_aux = df_formato_sector_comparable_aux.groupby(['direccion', 'categoria', 'sector'])[[2024, 2025]].sum().reset_index()
-        df_formato_sector_comparable_2_aux['progresion'] = round(df_formato_sector_comparable_2_aux[2025] / df_formato_sector_comparable_2_aux[2024] - 1, 3)
-        df_formato_sector_comparable_2_aux['aux'] = 'formato_sector'
-        df_formato_sector_comparable_2_aux['numero_operacional'] = ''
-        df_formato_sector_comparable_2_aux['punto_operacional'] = ''
-
-        df_formato_sector_comparable_aux['aux'] = 'tienda_sector'
-
-        df_bajada_consolidada = pd.concat([df_tienda_comparable_aux, df_formato_comparable_aux, df_formato_sector_comparable_aux, df_formato_sector_comparable_2_aux])
-        
         # Finalmente comienzo a trabajar sobre las progresiones historicas de los formatos con el objetivo de Construir facilmente los graficos que se muestran en los Briefings
         # Cargo toda la Info
         try:
-            deb_acum = pd.read_csv(historico_debitos, encoding='utf-16', header=1, decimal=',')
-            cols = ['Año', 'Mes', 'Direccion', 'Punto Operacional', 'Ventas c/impuesto']
-            vct_acum = pd.read_csv(historico_ventas, encoding='utf-16', header=1, usecols=cols)
-            vol_acum = pd.read_csv(historico_volumen, encoding='utf-16', header=1)
+            deb_acum = leer_insumo(historico_debitos, 'debitos', 'historico')
+            vct_acum = leer_insumo(historico_ventas, 'ventas', 'historico')
+            vol_acum = leer_insumo(historico_volumen, 'volumen', 'historico')
         except Exception as e:
             return f'Error a la hora de cargar los Historicos. ERROR: {e}'
 
-        # Quito columnas innecesarias
-        deb_acum = deb_acum.drop(columns=['Indicadores'])
-        vol_acum = vol_acum.drop(columns=['Indicadores'])
-
-        # Renombro Columnas
-        deb_acum = deb_acum.rename(columns={'Cant. Tickets por Local':'valores'})
-        vol_acum = vol_acum.rename(columns={'VOLUMEN':'valores'})
-        vct_acum = vct_acum.rename(columns={'Ventas c/impuesto':'valores'})
-
         # Categorizo las valores de los DF's
         deb_acum['categoria'] = 'deb'
         vol_acum['categoria'] = 'vol'
         vct_acum['categoria'] = 'vct'
 
-        # Convierto sus columnas a Valores Numericos
-        vol_acum['valores'] = pd.to_numeric(vol_acum['valores'].str.replace('.','').str.replace(',', '.'))
-        vct_acum['valores'] = pd.to_numeric(vct_acum['valores'].str.replace('.','').str.replace(',', '.'))
-        deb_acum['valores'] = pd.to_numeric(deb_acum['valores'].str.replace('.', ''))
-
         # Concateno los 3 DF's
-        acum_join = pd.concat([deb_acum, vol_acum, vct_acum])
-
-        # Estandarizo los nombres de las columnas
-        acum_join.columns = acum_join.columns.str.strip().str.replace(' ', '_').str.lower()
+        acum_join = concat_dimensiones([deb_acum, vol_acum, vct_acum])
 
         # Me aseguro que su Numero Operacional sea efectivamente un numero
-        acum_join['numero_operacional'] = acum_join['punto_operacional'].str.split(' ').str[0].astype(int)
+        acum_join['numero_operacional'] = numero_operacional(acum_join['punto_operacional'], ' ', errors='raise')
 
-        # Joineo con el Padron
-        acum_join = pd.merge(acum_join, padron[['numero_operacional', columna_mes]], how='left')
-
-        # Genero un DF comparable 
-        acum_join_comparable = acum_join[acum_join[columna_mes] == 'SC']
+        # Genero un DF comparable, donde cada mes del historico usa la comparabilidad de ese mes en el padron
+        acum_join_comparable = acum_join[comparable_por_mes(acum_join['numero_operacional'], acum_join['mes'], matriz_sc)]
         acum_join_comparable = acum_join_comparable.rename(columns={'mes':'fecha'})
-        acum_join_comparable['mes'] = acum_join_comparable['fecha'].str.split(' ').str[0]
+        acum_join_comparable['mes'] = parte_de_fecha(acum_join_comparable['fecha'])
         
         # Genero un DF sup Total
         acum_join_no_comparable = acum_join
         acum_join_no_comparable = acum_join_no_comparable.rename(columns={'mes':'fecha'})
-        acum_join_no_comparable['mes'] = acum_join_no_comparable['fecha'].str.split(' ').str[0]
+        acum_join_no_comparable['mes'] = parte_de_fecha(acum_join_no_comparable['fecha'])
 
         # Realizo transformaciones y calculos a ambos df's para conseguir sus progresiones historicas por categoria
-        acum_join_comparable = acum_join_comparable.groupby(['año', 'fecha', 'mes', 'direccion', 'categoria'])['valores'].sum().reset_index()
-        acum_join_no_comparable = acum_join_no_comparable.groupby(['año', 'fecha', 'mes', 'direccion', 'categoria'])['valores'].sum().reset_index()
+        acum_join_comparable = acum_join_comparable.groupby(['año', 'fecha', 'mes', 'direccion', 'categoria'], observed=True)['valores'].sum().reset_index()
+        acum_join_no_comparable = acum_join_no_comparable.groupby(['año', 'fecha', 'mes', 'direccion', 'categoria'], observed=True)['valores'].sum().reset_index()
 
         # Genero un Diccionario Auxiliar
         meses_orden = {'Enero':1, 'Febrero':2, 'Marzo':3, 'Abril':4, 'Mayo':5, 'Junio':6, 'Julio':7, 'Agosto':8, 'Septiembre':9, 'Octubre':10, 'Noviembre':11, 'Diciembre':12}
@@ -2133,75 +988,35 @@ def briefing(ventas_y_volumen_por_tienda, debitos_por_tienda, padron, debitos_po
         acum_join_no_comparable['fecha_completa'] = pd.to_datetime(
             '01/' + acum_join_no_comparable['aux'].astype(str) + '/' + acum_join_no_comparable['año'].astype(str), format='%d/%m/%Y')
 
-        # Genero una Variable utilizando el mes comparable para limitar los registros del 2025 hasta ese mes en particular
-        fecha_tope = pd.to_datetime('01/'+ str(meses_orden[mes_comparable]) + '/' + '2025', format='%d/%m/%Y')
+        # Genero una Variable utilizando el mes comparable para limitar los registros del ultimo año del historico hasta ese mes en particular
+        año_historico = int(acum_join_no_comparable['año'].max())
+        fecha_tope = pd.to_datetime('01/'+ str(meses_orden[mes_comparable]) + '/' + str(año_historico), format='%d/%m/%Y')
 
         # Hago efectivo el limite
         acum_join_comparable = acum_join_comparable[acum_join_comparable['fecha_completa'] <= fecha_tope]
         acum_join_no_comparable = acum_join_no_comparable[acum_join_no_comparable['fecha_completa'] <= fecha_tope]
 
-        # Pivoteo la Informacion para colocar los años como columnas y calcular las progresiones
-        acum_join_comparable = acum_join_comparable.pivot_table(values='valores', columns='año', index=['direccion', 'mes', 'categoria', 'aux'], aggfunc='sum').reset_index()
-        acum_join_no_comparable = acum_join_no_comparable.pivot_table(values='valores', columns='año', index=['direccion', 'mes', 'categoria', 'aux'], aggfunc='sum').reset_index()
-
-        # Calculo las Progresiones
-        acum_join_comparable['progresion 2024'] = round((acum_join_comparable[2024] / acum_join_comparable[2023]) - 1, 3)
-        acum_join_comparable['progresion 2025'] = round((acum_join_comparable[2025] / acum_join_comparable[2024]) - 1, 3)
-
-        acum_join_no_comparable['progresion 2024'] = round((acum_join_no_comparable[2024] / acum_join_no_comparable[2023]) - 1, 3)
-        acum_join_no_comparable['progresion 2025'] = round((acum_join_no_comparable[2025] / acum_join_no_comparable[2024]) - 1, 3)
-
-        # Ordeno y Elimino columna Auxiliar
-        acum_join_comparable = acum_join_comparable.sort_values(by=['direccion', 'categoria' ,'aux'], ascending=[True, True, True])
-        acum_join_comparable = acum_join_comparable.drop(columns=['aux'])
-
-        acum_join_no_comparable = acum_join_no_comparable.sort_values(by=['direccion', 'categoria' ,'aux'], ascending=[True, True, True])
-        acum_join_no_comparable = acum_join_no_comparable.drop(columns=['aux'])
-
-        # Exporto todo a Excel
-        formatos = df_tienda_comparable['direccion'].unique().tolist()
-        categorias = ['vct', 'deb', 'vol']
-
+        # Las progresiones, tablas y workbooks de cada formato son independientes: se calculan y exportan en paralelo, un proceso por direccion
+        archivos, df_bajada_consolidada = briefing_por_direccion({
+            'tienda_sc': df_tienda_comparable,
+            'tienda_total': df_tienda_no_comparable,
+            'sector_sc': df_sector_comparable,
+            'gf_sc': df_volumen_grupo_de_familia_comparable,
+            'historico_sc': acum_join_comparable,
+            'historico_total': acum_join_no_comparable,
+        }, años, datetime.today().strftime('%d-%m-%Y'))
+
+        # Exporto todo a un ZIP
         try:
             output_zip = io.BytesIO()
 
             with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED) as zf:
 
-                for formato in formatos:
-                    # Creamos un buffer en memoria para el Excel
-                    excel_buffer = io.BytesIO()
-
-                    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-
-                        df_formato_comparable_final[df_formato_comparable_final['direccion'] == formato].to_excel(writer, sheet_name=f'Total Categoria - {formato[0:3]}', index=False)
-                        df_formato_no_comparable_final[df_formato_no_comparable_final['direccion'] == formato].to_excel(writer, sheet_name=f'Total Categoria (Sup Total) - {formato[0:3]}'[0:31], index=False)
-                        df_formato_sector_comparable[df_formato_sector_comparable['direccion'] == formato].to_excel(writer, sheet_name=f'Total Categoria x Sector - {formato[0:3]}', index=False)
-
-                        for categoria in categorias:
-                            df_filtrado = df_progresiones_join_sector_tienda[
-                                (df_progresiones_join_sector_tienda['Categoria'] == categoria) &
-                                (df_progresiones_join_sector_tienda['Direccion'] == formato)
-                            ]
-                            df_filtrado = df_filtrado.drop(columns=['Direccion'])
-                            df_filtrado.to_excel(writer, sheet_name=f'{categoria} - {formato[0:3]}', index=False)
-
-                        df_final_consolidado_total[df_final_consolidado_total['direccion'] == formato].to_excel(writer, sheet_name=f'Info Consolidada - {formato[0:3]}', index=True)
-                        df_volumen_grupo_de_familia_comparable[df_volumen_grupo_de_familia_comparable['Direccion'] == formato].to_excel(writer, sheet_name=f'GF Consolidada - {formato[0:3]}', index=False)
-                        acum_join_comparable[acum_join_comparable['direccion'] == formato].to_excel(writer, sheet_name=f'Progresiones comp - {formato[0:3]}', index=False)
-                        acum_join_no_comparable[acum_join_no_comparable['direccion'] == formato].to_excel(writer, sheet_name=f'Progresiones total - {formato[0:3]}', index=False)
-
-                    # Nombrar el archivo
-                    file_name = f"Resultados Briefing {formato.upper()} ({datetime.today().strftime('%d-%m-%Y')}).xlsx"
+                # Agregar el archivo Excel de cada formato al ZIP
+                for file_name, contenido in archivos:
+                    zf.writestr(file_name, contenido)
 
-                    # Agregar el archivo Excel al ZIP
-                    excel_buffer.seek(0)
-                    zf.writestr(file_name, excel_buffer.read())
-
-                buffer_giratorio = io.BytesIO()
-                with pd.ExcelWriter(buffer_giratorio, engine='xlsxwriter') as writer:
-                    df_bajada_consolidada.to_excel(writer, sheet_name="Base Giratorio", index=False)
-                buffer_giratorio.seek(0)
-                zf.writestr("Base Giratorio.xlsx", buffer_giratorio.read())
+                zf.writestr("Base Giratorio.xlsx", exportar_excel({"Base Giratorio": (df_bajada_consolidada, False)}).getvalue())
 
             output_zip.seek(0)
             return output_zip
@@ -2231,8 +1046,8 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
     try:
         ### COMIENZO IMPORTANDO EL REPORTE DE VENTAS, LO TRANSFORMO Y LE AGREGO INFORMACION NECESARIA PARA OBTENER EL DIA DE LA SEMANA, ETC. ###
 
-        # Cargo la Informacion de Ventas Historico en Formato Long
-        df = pd.read_csv(ventas_por_media_hora_arch, encoding='utf-16', header=1)
+        # Cargo la Informacion de Ventas Historico en Formato Long. El crosstab tiene una columna por tienda (con nombres repetidos o vacios que quedan como ".1" y "Unnamed: n", igual que en pandas) y el encabezado siempre esta despues de la fila de titulo
+        df = leer_columnar(ventas_por_media_hora_arch) if formato_columnar(ventas_por_media_hora_arch) else leer_csv_micro(ventas_por_media_hora_arch, header=1)
         # Genero Copia del DF
         df = df.copy()
         # Genero un Slicing para obtener los valores correctos de las columnas al ser el df un Multiindex
@@ -2250,43 +1065,49 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
         # Hago un reset Index y elimino el anterior que no estaba ordenado
         df = df.reset_index().drop(columns=['index'])
         # Transformo la columna de VCT a INT
-        df['vct'] = pd.to_numeric(df['vct'].str.replace('.', '').str.replace(',', '.'), errors='coerce')
-        # Genero una columna para trabajar con el mes
-        df['mes'] = df['fecha'].str.strip().str.split(' ').str[2].str.strip()
-        # Genero una columna para obtener el dia (Luego nos servira para filtrar unicamente los datos de los domingos)
-        df['dia'] = df['fecha'].str.strip().str.split(' ').str[0].astype(str)
-        # Genero una columna para obtener el NO (Numero Operacional) "ID tienda"
-        df['no'] = df['tiendas'].str.split(' ').str[0].astype(int)
+        df['vct'], errores_vct = convertir_numero_ar(df['vct'])
+        if errores_vct:
+            logger.warning(f'{errores_vct} valores de venta por media hora no se pudieron convertir a numero')
 
         # Genero listas auxiliares para confeccionar un diccionario de forma rapida y luego realizar un Mapeo
         mes = 'Enero Febrero Marzo Abril Mayo Junio Julio Agosto Septiembre Octubre Noviembre Diciembre'.split(' ')
         num_mes = '1 2 3 4 5 6 7 8 9 10 11 12'.split(' ')
         mes_orden = dict(zip(mes, num_mes))
 
-        # Genero una columna auxiliar con el numero del mes para generar luego una fecha Parseada
-        df['mes_numerico'] = df['mes'].map(mes_orden)
-        df['fecha_parsed'] = df['mes_numerico'] + '/' + df['dia'] + '/' + df['año'].astype(str)
-
-        # Convierto la fecha parseada a DateTime y asi obtengo el detalle del dia de la semana para luego filtrar la informacion unicamente de los domigos
-        df['fecha_final'] = pd.to_datetime(df['fecha_parsed'], format='%m/%d/%Y')
-        # Obtengo el detalle del nombre del dia a partir de la columna generada anteriormente
-        df['nombre_dia'] = df['fecha_final'].dt.day_name()
+        def partes_fecha(fechas: pd.DataFrame):
+            partes = pd.DataFrame(index=fechas.index)
+            # Genero una columna para trabajar con el mes
+            partes['mes'] = fechas['fecha'].str.strip().str.split(' ').str[2].str.strip()
+            # Genero una columna para obtener el dia (Luego nos servira para filtrar unicamente los datos de los domingos)
+            partes['dia'] = fechas['fecha'].str.strip().str.split(' ').str[0].astype(str)
+            # Genero una columna auxiliar con el numero del mes para generar luego una fecha Parseada
+            partes['mes_numerico'] = partes['mes'].map(mes_orden)
+            partes['fecha_parsed'] = partes['mes_numerico'] + '/' + partes['dia'] + '/' + fechas['año'].astype(str)
+            # Convierto la fecha parseada a DateTime y asi obtengo el detalle del dia de la semana para luego filtrar la informacion unicamente de los domigos
+            partes['fecha_final'] = pd.to_datetime(partes['fecha_parsed'], format='%m/%d/%Y')
+            # Obtengo el detalle del nombre del dia a partir de la columna generada anteriormente
+            partes['nombre_dia'] = partes['fecha_final'].dt.day_name()
+            return partes
+
+        # Las fechas se calculan una sola vez por cada combinacion de fecha y año, y se expanden a todas las filas
+        partes = derivar_por_unicos(df[['fecha', 'año']], partes_fecha)
+        df[['mes', 'dia']] = partes[['mes', 'dia']]
+        # Genero una columna para obtener el NO (Numero Operacional) "ID tienda"
+        df['no'] = numero_operacional(df['tiendas'], ' ', errors='raise')
+        df[['mes_numerico', 'fecha_parsed', 'fecha_final', 'nombre_dia']] = partes[['mes_numerico', 'fecha_parsed', 'fecha_final', 'nombre_dia']]
 
         # Genero un nuevo df UNICAMENTE con la informacion de los Domingos
         df_domingos = df[df['nombre_dia'] == 'Sunday']
         # Genero columna NO
-        df_domingos['no'] = df_domingos['tiendas'].str.split(' ').str[0].astype(str)
+        df_domingos['no'] = numero_operacional(df_domingos['tiendas'], ' ')
 
         # Creamos columna mes-año
-        df_domingos['mes'] = df_domingos['fecha_final'].dt.month_name()
-        df_domingos['mes'] = df_domingos['mes'].astype(str).str.lower()
+        df_domingos['mes'] = derivar_por_unicos(df_domingos['fecha_final'], lambda fechas: fechas.dt.month_name().astype(str).str.lower())
 
-        # Extraemos hora de inicio
-        df_domingos['hora_inicio'] = df_domingos['hora'].str.extract(r'Desde (\d{2}:\d{2})')[0]
-        # Convertimos a objeto time
-        df_domingos['hora_inicio'] = pd.to_datetime(df_domingos['hora_inicio'], format='%H:%M').dt.time
+        # Extraemos hora de inicio y la convertimos a objeto time (una sola vez por cada franja de media hora)
+        df_domingos['hora_inicio'] = derivar_por_unicos(df_domingos['hora'], lambda horas: pd.to_datetime(horas.str.extract(r'Desde (\d{2}:\d{2})')[0], format='%H:%M').dt.time)
         ### CARGO Y TRABAJO SOBRE EL DETALLE DE COSTO HORAS HOMBRE ###
-        costo_horas_hombre = pd.read_excel(costo_horas_hombre_arch, sheet_name='costo_ho')
+        costo_horas_hombre = leer_excel(costo_horas_hombre_arch, hoja='costo_ho')
         # Elimino las columnas que estan en Nulo
         costo_horas_hombre = costo_horas_hombre.dropna(axis=1)
         # Genero un bucle para renombrar las columnas de forma correcta. En caso de que el nombre de la columna sea datetime, le coloca el nombre del mes en ingles en minuscula. Caso contrario, coloca el nombre en minuscula
@@ -2307,7 +1128,7 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
 
         ### GENERO UN DF AUXILIAR PARA CONTABILIZAR LA CANTIDAD DE dOMINGOS POR MES ###
         # Contamos domingos por mes
-        domingos_por_mes = df_domingos.groupby('mes')['fecha_final'].nunique().reset_index()
+        domingos_por_mes = df_domingos.groupby('mes', observed=True)['fecha_final'].nunique().reset_index()
         domingos_por_mes.columns = ['mes', 'cantidad_domingos']
 
         ### CARGO Y TRABAJO SOBRE EL MARGEN ### 
@@ -2315,7 +1136,7 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
         # Cargo el Margen. El formato de descarga de Tableau me tira el reporte con Separadores de ";". Verificar que esto en la computadora del trabajo sea igual
         margen = pd.read_csv(margen_arch, sep=';')
         # Pivoteo la informacion para colocar el "Rubro" es decir el Margen y la Venta sin Tasa, para asi calcular el Ratio Margen por tienda y finalmente llevarlo al DF principal
-        margen = margen.pivot_table(values='Importe Ars', columns='RUBRO_CONCAT (grupo) 1', index=['Periodo', 'Tienda'], aggfunc='sum').reset_index()
+        margen = margen.pivot_table(values='Importe Ars', columns='RUBRO_CONCAT (grupo) 1', index=['Periodo', 'Tienda'], aggfunc='sum', observed=True).reset_index()
         # Relleno valores nulos con ceros para no tener problemas a la hora de dividir valores
         margen['VENTA SIN TASA'] = margen['VENTA SIN TASA'].fillna(0)
         # Convierto los valores a Numericos antes de realizar su division
@@ -2326,9 +1147,9 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
         # Relleno con ceros por las dudas aquellos valores nulos
         margen = margen.fillna(0)
         # genero una columna auxiliar para obtener el "numero del mes"
-        margen['mes_numerico'] = margen['Periodo'].astype(str).str.split('2025').str[1]
-        # Genero una columna auxiliar con el año
-        margen['año'] = '2025'
+        margen['mes_numerico'] = margen['Periodo'].astype(str).str[4:6]
+        # Genero una columna auxiliar con el año (el Periodo viene como AAAAMM)
+        margen['año'] = margen['Periodo'].astype(str).str[0:4]
         # Parseo todas estas columnas
         margen['fecha_parsed'] = margen['mes_numerico'] + '/01/' + margen['año']
         # Convierto la columna Parseada a Datetime
@@ -2342,7 +1163,7 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
 
         ### CAROG EL DETALLE AUTORIZADAS POR DOMINGO DE LAS TIENDAS ###
         # En este punto, ya tengo toda la informacion auxiliar para ir joineando con el DF principal, por loq ue la mayoria de transofmraciones y JOINS ocurren en este bloque de codigo
-        horas_autorizadas = pd.read_excel(horas_autorizadas_arch, sheet_name='horas_dom')
+        horas_autorizadas = leer_excel(horas_autorizadas_arch, hoja='horas_dom')
         # Elimino las columnas que estan en Nulo
         horas_autorizadas = horas_autorizadas.dropna(axis=1)
         # Genero un bucle para renombrar las columnas de forma correcta. En caso de que el nombre de la columna sea datetime, le coloca el nombre del mes en ingles en minuscula. Caso contrario, coloca el nombre en minuscula
@@ -2363,7 +1184,7 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
         # Divido la cantidad de horas autorizadas del mes, por la cantidad de domingos para obtener la cantidad de Horas Autorizadas del Mes POR DOMINGO
         horas_autorizadas['horas_por_domingo'] = round(horas_autorizadas['horas'] / horas_autorizadas['cantidad_domingos'],1)
         # Genero un DF auziliar para calcular la Hora Promedio por Domingo del pormedio de Abril y Mayo (MESES ANTERIOR A REALIZAR LA EXTENSION HORARIA)
-        horas_prom_mayo_abril = horas_autorizadas[horas_autorizadas['mes'].isin(['april', 'may'])].groupby(['no'])['horas'].mean().reset_index().rename(columns={'horas':'horas_promedio_abril_y_mayo'})
+        horas_prom_mayo_abril = horas_autorizadas[horas_autorizadas['mes'].isin(['april', 'may'])].groupby(['no'], observed=True)['horas'].mean().reset_index().rename(columns={'horas':'horas_promedio_abril_y_mayo'})
         horas_prom_mayo_abril['horas_promedio_abril_y_mayo'] = (horas_prom_mayo_abril['horas_promedio_abril_y_mayo'] / 4).round(2)
         # Concateno el DF con las horas autorizadas para poder calcular luego la el crecimiento y diferencia de horario x Domingo por Tienda
         horas_autorizadas = pd.merge(horas_autorizadas, horas_prom_mayo_abril, on='no', how='left')
@@ -2388,7 +1209,7 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
         # Genero el DF donde tengo solamente las ventas que necesito. Filtramos ventas fuera del horario normal (es decir, en horario extendido)
         ventas_horario_extendido = df_domingos[(df_domingos['hora_inicio'] < df_domingos['horario_apertura']) | (df_domingos['hora_inicio'] >= df_domingos['horario_cierre'])]
         # Ahora que tengo las ventas que quiero, unicamente me falta agruparlas para perder los detalles mas chicos. ORdeno estos valores tambien
-        ventas_horario_extendido = ventas_horario_extendido.groupby(['no', 'mes'])['vct'].sum().reset_index().sort_values(by='no')
+        ventas_horario_extendido = ventas_horario_extendido.groupby(['no', 'mes'], observed=True)['vct'].sum().reset_index().sort_values(by='no')
         # Concateno el DF que contiene la Venta Con tasa de los domingos, exclusivamente del horario extendido a las tiendas, teniendo en cuenta no solamente su NO sino el detalle del MES!
         horas_autorizadas = pd.merge(horas_autorizadas, ventas_horario_extendido, on=['no', 'mes'], how='left')
         # Relleno valores nulos con 0. Esto quiere decir que hay un conjunto de tiendas que NO tienen ventas en los horarios extendidos. Esto es precisamente porque hay tiendas que en los meses abril y mayo no tuvieron ventas
@@ -2445,7 +1266,7 @@ def analisis_horario_extendido(ventas_por_media_hora_arch, margen_arch, costo_ho
                 horas_autorizadas[col] = horas_autorizadas[col].round(1)
 
         # Pivoteo la Informacion para mostrarla en formato LONG
-        horas_autorizadas = horas_autorizadas.pivot_table(values=['horas_autorizadas', 'cantidad_domingos', 'horas_por_domingo', 'horas_promedio_abril_y_mayo', 'crecimiento_horas_domingo', 'horas_adicionales_por_domingo', 'horas_adicionales_total_mes', 'vct', 'vst', 'ratio_margen','margen', 'gastos_variables', 'costo_hora_hombre', 'gasto_de_personal', 'roc'], columns='mes_esp', index=['no', 'nombre', 'localidad', 'zona', 'gerente regional', 'horario_domingo', 'horario_anterior'], aggfunc='sum')
+        horas_autorizadas = horas_autorizadas.pivot_table(values=['horas_autorizadas', 'cantidad_domingos', 'horas_por_domingo', 'horas_promedio_abril_y_mayo', 'crecimiento_horas_domingo', 'horas_adicionales_por_domingo', 'horas_adicionales_total_mes', 'vct', 'vst', 'ratio_margen','margen', 'gastos_variables', 'costo_hora_hombre', 'gasto_de_personal', 'roc'], columns='mes_esp', index=['no', 'nombre', 'localidad', 'zona', 'gerente regional', 'horario_domingo', 'horario_anterior'], aggfunc='sum', observed=True)
 
         # Ordeno las columans de orden mayor y de orden menor
         orden_columnas_primer_nivel = [
@@ -2497,7 +1318,7 @@ def dia_de_semana(archivo_csv, mes_comparable, padron=None):
     '''
     try:
         try:
-            df = pd.read_csv(archivo_csv, header=1, encoding='utf-16', decimal=',')
+            df = leer_columnar(archivo_csv) if formato_columnar(archivo_csv) else leer_csv_micro(archivo_csv)
         except Exception as e:
             raise ValueError(f"El archivo no se cargó correctamente como DataFrame. Verificá el encoding o el formato del CSV. ERROR: {e}")
         
@@ -2508,20 +1329,10 @@ def dia_de_semana(archivo_csv, mes_comparable, padron=None):
         df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
 
         # Procesamiento de fechas
-        df['dia'] = df['dia'].str.strip()
-        df['año'] = df['dia'].str.split(' ').str[4].astype(str)
-        df['mes'] = df['dia'].str.split(' ').str[2].astype(str)
-        df['dia_de_la_semana'] = df['dia'].str.split(' ').str[0].astype(str)
-
         meses = 'Enero Febrero Marzo Abril Mayo Junio Julio Agosto Septiembre Octubre Noviembre Diciembre'.split()
         nums = list(map(str, range(1, 13)))
         mes_orden = dict(zip(meses, nums))
 
-        df['mes_numerico'] = df['mes'].map(mes_orden)
-        df['fecha_parsed'] = df['mes_numerico'] + '/' + df['dia_de_la_semana'] + '/' + df['año']
-        df['fecha_final'] = pd.to_datetime(df['fecha_parsed'], format='%m/%d/%Y')
-        df['nombre_dia'] = df['fecha_final'].dt.day_name()
-
         dias_castellano = {
             'Monday': 'Lunes',
             'Tuesday': 'Martes',
@@ -2532,25 +1343,34 @@ def dia_de_semana(archivo_csv, mes_comparable, padron=None):
             'Sunday': 'Domingo'
         }
 
-        df['dia_de_semana_castellano'] = df['nombre_dia'].map(dias_castellano)
+        def partes_fecha(dias: pd.Series):
+            partes = pd.DataFrame({'dia': dias.str.strip()})
+            partes['año'] = partes['dia'].str.split(' ').str[4].astype(str)
+            partes['mes'] = partes['dia'].str.split(' ').str[2].astype(str)
+            partes['dia_de_la_semana'] = partes['dia'].str.split(' ').str[0].astype(str)
+            partes['mes_numerico'] = partes['mes'].map(mes_orden)
+            partes['fecha_parsed'] = partes['mes_numerico'] + '/' + partes['dia_de_la_semana'] + '/' + partes['año']
+            partes['fecha_final'] = pd.to_datetime(partes['fecha_parsed'], format='%m/%d/%Y')
+            partes['nombre_dia'] = partes['fecha_final'].dt.day_name()
+            partes['dia_de_semana_castellano'] = partes['nombre_dia'].map(dias_castellano)
+            return partes
+
+        # Cada fecha distinta se procesa una sola vez y el resultado se expande a todas las filas
+        partes = derivar_por_unicos(df['dia'], partes_fecha)
+        df[partes.columns] = partes
 
         # Renombrar columnas para mejorar visualización
         df.columns = df.columns.str.replace('_', ' ').str.capitalize()
 
         # Si viene con detalle de tienda
         if 'Punto operacional' in df.columns:
-            df['no'] = df['Punto operacional'].str.split(' ').str[0].astype(int)
+            df['no'] = numero_operacional(df['Punto operacional'], ' ', errors='raise')
 
             try:
-                cols = ['GSX', 'NOMBRE', 'Fecha apertura', 'BANDERA', 'ORGANIZACIÓN ', 'PROVINCIA', 'FIN DE CIERRE',
-                        'ENE.2', 'FEB.2', 'MAR.2', 'ABR.2', 'MAY.2', 'JUN.2', 'JUL.2', 'AGO.2', 'SEP.2', 'OCT.2', 'NOV.2', 'DIC.2']
-                padron = pd.read_excel(padron, header=17, usecols=cols)
+                padron = leer_padron(padron, 'dia_de_semana')
             except Exception as e:
                 return f'Error a la hora de cargar el Padrón. ERROR: {e}'
 
-            padron.columns = padron.columns.str.lower().str.strip().str.replace(' ', '_').str.replace('.2', '')
-            padron = padron.rename(columns={'gsx': 'no'})
-
             meses_dict = {
                 'enero': 'ene', 'febrero': 'feb', 'marzo': 'mar', 'abril': 'abr',
                 'mayo': 'may', 'junio': 'jun', 'julio': 'jul', 'agosto': 'ago',
@@ -2590,7 +1410,7 @@ def marketshare(marketshare_data):
     try:
         # Cargo la Info del Share
         try:
-            df = pd.read_excel(marketshare_data)
+            df = leer_excel(marketshare_data)
 
         except Exception as e:
             return f'Error al cargar la informacion del Share. Detalle: {e}'
@@ -2664,8 +1484,8 @@ def marketshare(marketshare_data):
         df = df.melt(id_vars=['area', 'region', 'subregion', 'formato_m2', 'marca', 'formato', 'numero_operacional'], var_name='fecha', value_name='ventas_con_tasa')
 
         # Genero columnas
-        df['mes'] = df['fecha'].str.split(' ').str[0]
-        df['año'] = df['fecha'].str.split(' ').str[1]
+        df['mes'] = parte_de_fecha(df['fecha'])
+        df['año'] = parte_de_fecha(df['fecha'], 1)
 
         # Ordeno el DF
         df = df[['area', 'region', 'subregion', 'formato_m2', 'marca', 'formato', 'numero_operacional', 'fecha', 'mes', 'año', 'ventas_con_tasa']]
@@ -2747,7 +1567,8 @@ def padron_marketshare(padron_data):
 
             # Indico que columnas voy a necesitar
             cols = ['GSX', 'NOMBRE', 'Fecha apertura', 'FIN DE CIERRE','ORGANIZACIÓN ', 'DIRECTOR EXPLOTACIÓN', 'DIRECTOR OPERACIONAL', 'DIRECTOR / GERENTE REGIONAL', 'SUB REGION', 'DIRECTOR/ GERENTE TIENDA', 'Provincia Tableau', 'M² SALÓN', 'M² PGC', 'M² PFT', 'M² BAZAR', 'M² Electro', 'M² Textil', 'M² Pls', 'M² GALERIAS', 'PROVINCIA', 'M² Parcking', 'CAJAS', 'COD.POSTAL']
-            pad = pd.read_excel('data/padron.xlsx', header=17, usecols=cols)
+            # Uso el padron subido (antes se leia siempre data/padron.xlsx) desde su version ya parseada
+            pad = leer_columnar(version_padron(padron_data), columnas=cols)
 
         except Exception as e:
             return f'Error a la hora de cargar el Padron. Detalle {e}'